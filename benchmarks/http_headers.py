@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark of typical request header workloads
+
+This is what a server does with the headers of every request, build the
+headers from the raw request, check a few of them, and parse the ones that
+decide how the body and response should be handled
+
+:Example:
+    $ python benchmarks/http_headers.py
+    $ python benchmarks/http_headers.py --number 50000
+"""
+import argparse
+import timeit
+from wsgiref.headers import Headers
+
+from datatypes.http import HTTPHeaders
+
+
+REQUEST_HEADERS = [
+    ("Host", "localhost:8080"),
+    (
+        "User-Agent",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
+        " (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    ),
+    (
+        "Accept",
+        "text/html,application/xhtml+xml,application/xml;q=0.9,"
+        "image/avif,image/webp,*/*;q=0.8",
+    ),
+    ("Accept-Language", "en-US,en;q=0.9,fr;q=0.5"),
+    ("Accept-Encoding", "gzip, deflate, br"),
+    ("Content-Type", "application/json; charset=\"utf-8\""),
+    ("Content-Length", "1234"),
+    ("Cache-Control", "no-cache, max-age=0"),
+    ("Connection", "keep-alive"),
+    ("Cookie", "foo=1; bar=2"),
+    ("Authorization", "Bearer 1234567890abcdef"),
+    ("X-Forwarded-For", "10.0.0.1"),
+    ("X-Request-Id", "7f9c1b0e-3c1f-4e0a-9d3b-2f1e0c9a8b7d"),
+]
+
+
+def build():
+    return HTTPHeaders(REQUEST_HEADERS)
+
+
+def lookup(headers):
+    headers.get("content-type")
+    headers.get("CONTENT_LENGTH")
+    headers.get("Authorization")
+    "X-Request-Id" in headers
+    "If-None-Match" in headers
+
+
+def parse(headers):
+    headers.get_media_type()
+    headers.get_content_encoding()
+    headers.parse("Content-Type")
+    headers.parse_weighted("Accept")
+    headers.parse_weighted("Accept-Language")
+    headers.get_cache_control()
+    headers.is_json()
+
+
+def request():
+    headers = build()
+    lookup(headers)
+    parse(headers)
+    # the body handling, the response, and any middleware usually ask again
+    parse(headers)
+    parse(headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    headers = build()
+    benchmarks = [
+        ("wsgiref.Headers build", lambda: Headers(list(REQUEST_HEADERS))),
+        ("HTTPHeaders build", build),
+        ("HTTPHeaders lookup", lambda: lookup(headers)),
+        ("HTTPHeaders parse", lambda: parse(headers)),
+        ("HTTPHeaders request", request),
+    ]
+
+    for name, callback in benchmarks:
+        timings = timeit.repeat(
+            callback,
+            number=args.number,
+            repeat=args.repeat,
+        )
+        best = min(timings) / args.number
+        print("{:<24} {:>10.2f} us/op {:>12.0f} ops/sec".format(
+            name,
+            best * 1000000,
+            1 / best,
+        ))
+
+
+if __name__ == "__main__":
+    main()
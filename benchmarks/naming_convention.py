@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark of NamingConvention conversions
+
+Compares the per-character loop of NamingConvention.snakecase and the
+split based camelcase with compiled regex versions, all uncached, and then
+with the shared conversion cache, which is what hot paths that convert the
+same JSON keys and field names over and over actually hit
+
+:Example:
+    $ python benchmarks/naming_convention.py
+    $ python benchmarks/naming_convention.py --number 50000
+"""
+import argparse
+import re
+import timeit
+
+from datatypes.string import NamingConvention
+
+
+NAMES = [
+    "foo_bar",
+    "FooBar",
+    "fooBarChe",
+    "FooBARTest",
+    "HTTPServerError",
+    "user-id",
+    "created at",
+    "x",
+    "some_really_long_field_name_2",
+    "XMLHttpRequest",
+]
+
+
+SNAKECASE_REGEX = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+"""Where the loop would add an underscore, after a lowercase character that
+is followed by an uppercase character, or in the middle of an acronym that is
+followed by a word (eg, BARTest)"""
+
+
+SEPARATORS = str.maketrans({ch: "_" for ch in " \t\n\r\x0b\x0c-"})
+
+
+CAMELCASE_REGEX = re.compile(
+    r"[A-Z]+(?=[A-Z][a-z]|[^A-Za-z]|$)|[A-Z]?[a-z]+|[A-Z]+|[^\s\W_]+"
+)
+"""The words of a name, an acronym, a capitalized word, or a run of
+anything that isn't whitespace or punctuation"""
+
+
+def regex_snakecase(name):
+    """ASCII only version of NamingConvention.snakecase"""
+    return SNAKECASE_REGEX.sub("_", name).translate(SEPARATORS).lower()
+
+
+def regex_camelcase(name):
+    """ASCII only version of NamingConvention.camelcase"""
+    return "".join(
+        word.title() for word in CAMELCASE_REGEX.findall(name)
+    )
+
+
+INSTANCES = {name: NamingConvention(name) for name in NAMES}
+"""The loops are methods so the instances are created up front to keep
+instance creation out of the timings"""
+
+
+def loop_snakecase(name):
+    return NamingConvention.snakecase.__wrapped__(INSTANCES[name])
+
+
+def loop_camelcase(name):
+    return NamingConvention.upper_camelcase.__wrapped__(INSTANCES[name])
+
+
+def cached_snakecase(name):
+    return NamingConvention.snakecase.convert(NamingConvention, name)
+
+
+def cached_camelcase(name):
+    return NamingConvention.upper_camelcase.convert(NamingConvention, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name in NAMES:
+        for loop, regex in [
+            (loop_snakecase, regex_snakecase),
+            (loop_camelcase, regex_camelcase),
+        ]:
+            if loop(name) != regex(name):
+                print("{} mismatch on {}: {} != {}".format(
+                    regex.__name__,
+                    name,
+                    loop(name),
+                    regex(name),
+                ))
+
+    benchmarks = [
+        ("snakecase loop", loop_snakecase),
+        ("snakecase regex", regex_snakecase),
+        ("snakecase cached", cached_snakecase),
+        ("camelcase loop", loop_camelcase),
+        ("camelcase regex", regex_camelcase),
+        ("camelcase cached", cached_camelcase),
+    ]
+
+    for bench_name, callback in benchmarks:
+        timings = timeit.repeat(
+            lambda: [callback(name) for name in NAMES],
+            number=args.number,
+            repeat=args.repeat,
+        )
+        best = min(timings) / (args.number * len(NAMES))
+        print("{:<20} {:>10.2f} us/op {:>12.0f} ops/sec".format(
+            bench_name,
+            best * 1000000,
+            1 / best,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""Load generator and latency benchmark for the server module
+
+Every scenario starts a server in a ServerThread (or a ServerProcess for
+the prefork backend) and drives it with concurrent local clients, each
+client keeps its connection open when the server allows it. Requests/sec and the p50/p95/p99 latencies are reported
+for each server backend so backends can be compared and regressions caught
+
+:Example:
+    $ python benchmarks/server.py
+    $ python benchmarks/server.py --scenario json --scenario wsgi
+    $ python benchmarks/server.py --backend async --concurrency 32
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import signal
+import statistics
+import tempfile
+import threading
+import time
+import traceback
+from socketserver import ThreadingMixIn
+
+from datatypes.http import MultipartEncoder
+from datatypes.server import (
+    ServerThread,
+    PathServer,
+    CallbackServer,
+    WSGIServer,
+    ThreadingWSGIServer,
+    ThreadPoolWSGIServer,
+    PreforkMixin,
+    PreforkWSGIServer,
+    AsyncPathServer,
+    AsyncCallbackServer,
+)
+
+
+class ThreadingPathServer(ThreadingMixIn, PathServer):
+    pass
+
+
+class ThreadingCallbackServer(ThreadingMixIn, CallbackServer):
+    pass
+
+
+class ServerProcess(ServerThread):
+    """Works like ServerThread but the server is ran from the main thread of
+    a forked child process, a prefork server forks its workers and forking
+    a process that has other threads running isn't safe
+
+    The fork happens before the benchmark starts its client threads
+    """
+    @property
+    def started(self):
+        return bool(getattr(self, "pid", None))
+
+    def start(self):
+        if self.started: return
+
+        pid = os.fork()
+        if not pid:
+            code = 1
+            try:
+                self.target()
+                code = 0
+
+            except BaseException:
+                traceback.print_exc()
+
+            finally:
+                os._exit(code)
+
+        self.pid = pid
+
+    def stop(self):
+        if self.started:
+            # the prefork server stops its workers when it gets a SIGTERM
+            os.kill(self.pid, signal.SIGTERM)
+            os.waitpid(self.pid, 0)
+            self.pid = None
+
+
+PAYLOAD = {
+    "id": 1234,
+    "name": "benchmark",
+    "tags": ["foo", "bar", "che"],
+    "values": list(range(20)),
+}
+
+
+def json_callback(handler):
+    return PAYLOAD
+
+
+def multipart_callback(handler):
+    body = handler.body
+    return {
+        "fields": len(body),
+        "files": len(body.get("_files", [])),
+    }
+
+
+def application(environ, start_response):
+    body = json.dumps(PAYLOAD).encode()
+    start_response("200 OK", [
+        ("Content-Type", "application/json"),
+        ("Content-Length", str(len(body))),
+    ])
+    return [body]
+
+
+def create_scenarios(basedir, size):
+    """Create every scenario
+
+    :param basedir: str, where the static files will be written
+    :param size: int, how many bytes the static file and the uploaded
+        file will be
+    :returns: dict[str, dict], scenario name keys with "backends" (backend
+        name -> server factory) and "request" (method, path, body, headers)
+    """
+    with open(os.path.join(basedir, "static.bin"), "wb") as fp:
+        fp.write(os.urandom(size))
+
+    encoder = MultipartEncoder()
+    encoder.add_field("foo", "1")
+    encoder.add_field("bar", "2")
+    encoder.add_file(io.BytesIO(os.urandom(size)), name="file")
+    multipart_headers = dict(encoder.headers.items())
+    multipart_body = bytes(encoder)
+
+    return {
+        "static": {
+            "backends": {
+                "sync": lambda: PathServer(basedir),
+                "threading": lambda: ThreadingPathServer(basedir),
+                "async": lambda: AsyncPathServer(basedir),
+            },
+            "request": ("GET", "/static.bin", None, {}),
+        },
+        "json": {
+            "backends": {
+                "sync": lambda: CallbackServer({"GET": json_callback}),
+                "threading": lambda: ThreadingCallbackServer({
+                    "GET": json_callback,
+                }),
+                "async": lambda: AsyncCallbackServer({
+                    "GET": json_callback,
+                }),
+            },
+            "request": ("GET", "/", None, {}),
+        },
+        "multipart": {
+            "backends": {
+                "sync": lambda: CallbackServer({"POST": multipart_callback}),
+                "threading": lambda: ThreadingCallbackServer({
+                    "POST": multipart_callback,
+                }),
+                "async": lambda: AsyncCallbackServer({
+                    "POST": multipart_callback,
+                }),
+            },
+            "request": ("POST", "/", multipart_body, multipart_headers),
+        },
+        "wsgi": {
+            "backends": {
+                "sync": lambda: WSGIServer(application=application),
+                "threading": lambda: ThreadingWSGIServer(
+                    application=application,
+                ),
+                "threadpool": lambda: ThreadPoolWSGIServer(
+                    application=application,
+                ),
+                "prefork": lambda: PreforkWSGIServer(
+                    application=application,
+                ),
+            },
+            "request": ("GET", "/", None, {}),
+        },
+    }
+
+
+def benchmark(server, method, path, body=None, headers=None, **kwargs):
+    """Start server in a ServerThread, or a ServerProcess if it is a prefork
+    server, and hit it with concurrent clients
+
+    :param server: BaseServer, any server instance
+    :param method: str, the request method
+    :param path: str, the request path
+    :param body: bytes|None, the request body
+    :param headers: dict[str, str]|None, the request headers
+    :keyword requests: int, how many requests in total
+    :keyword concurrency: int, how many clients at the same time
+    :keyword warmup: int, how many requests each client makes before it is
+        timed
+    :returns: dict[str, float]
+    """
+    requests = kwargs.get("requests", 2000)
+    concurrency = kwargs.get("concurrency", 8)
+    warmup = kwargs.get("warmup", 10)
+    headers = headers or {}
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    per_client = max(1, requests // concurrency)
+
+    def client(hostname, port):
+        conn = http.client.HTTPConnection(hostname, port, timeout=30)
+        timings = []
+        failures = 0
+
+        def fetch():
+            conn.request(method, path, body=body, headers=headers)
+            res = conn.getresponse()
+            res.read()
+            if res.status >= 400:
+                raise ValueError(res.status)
+
+        try:
+            for _ in range(warmup):
+                fetch()
+
+        except Exception:
+            failures += 1
+            conn.close()
+
+        barrier.wait()
+        for _ in range(per_client):
+            start = time.perf_counter()
+            try:
+                fetch()
+                timings.append(time.perf_counter() - start)
+
+            except Exception:
+                failures += 1
+                conn.close()
+
+        conn.close()
+        with lock:
+            latencies.extend(timings)
+            errors.append(failures)
+
+    if isinstance(server, PreforkMixin):
+        server_thread = ServerProcess(server)
+
+    else:
+        server_thread = ServerThread(server)
+
+    with server_thread as s:
+        threads = [
+            threading.Thread(target=client, args=(s.hostname, s.port))
+            for _ in range(concurrency)
+        ]
+        for t in threads:
+            t.start()
+
+        barrier.wait()
+        start = time.perf_counter()
+        for t in threads:
+            t.join()
+
+        elapsed = time.perf_counter() - start
+
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100)
+
+    else:
+        quantiles = (latencies or [0.0]) * 99
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=65536,
+        help="Size in bytes of the static file and uploaded file",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["static", "json", "multipart", "wsgi"],
+        help="Only run these scenarios, defaults to all",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        help="Only run these backends (eg, sync, threading, async)",
+    )
+    args = parser.parse_args()
+
+    print("{:<10} {:<11} {:>10} {:>9} {:>9} {:>9} {:>7}".format(
+        "scenario",
+        "backend",
+        "req/sec",
+        "p50 ms",
+        "p95 ms",
+        "p99 ms",
+        "errors",
+    ))
+
+    with tempfile.TemporaryDirectory() as basedir:
+        scenarios = create_scenarios(basedir, args.size)
+        for scenario_name, scenario in scenarios.items():
+            if args.scenario and scenario_name not in args.scenario:
+                continue
+
+            for backend_name, factory in scenario["backends"].items():
+                if args.backend and backend_name not in args.backend:
+                    continue
+
+                # the handlers log every request to stderr
+                with contextlib.redirect_stderr(io.StringIO()):
+                    result = benchmark(
+                        factory(),
+                        *scenario["request"],
+                        requests=args.requests,
+                        concurrency=args.concurrency,
+                    )
+
+                print(
+                    "{:<10} {:<11} {:>10.0f} {:>9.2f} {:>9.2f} {:>9.2f}"
+                    " {:>7}".format(
+                        scenario_name,
+                        backend_name,
+                        result["rps"],
+                        result["p50"] * 1000,
+                        result["p95"] * 1000,
+                        result["p99"] * 1000,
+                        result["errors"],
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Throughput benchmark of WordTokenizer on multi-MB text
+
+Compares the character at a time scan, which is what a callback delimiter
+uses, with the regex word boundary index that a set of delimiter characters
+uses. The character scan is only run on a sample of the text since it is
+orders of magnitude slower
+
+:Example:
+    $ python benchmarks/word_tokenizer.py
+    $ python benchmarks/word_tokenizer.py --size 8 --sample 256
+"""
+import argparse
+import random
+import string
+import time
+
+from datatypes.token.word import WordTokenizer, StopWordTokenizer
+
+
+def create_text(size):
+    """Create size bytes of random words, deliminated with whitespace and
+    punctuation
+
+    :param size: int
+    :returns: str
+    """
+    rand = random.Random(size)
+    words = [
+        "".join(rand.choices(string.ascii_letters, k=rand.randint(1, 10)))
+        for _ in range(5000)
+    ]
+    delims = [" ", " ", " ", ", ", ". ", "\n", " - ", "; "]
+
+    parts = []
+    total = 0
+    while total < size:
+        part = rand.choice(words) + rand.choice(delims)
+        parts.append(part)
+        total += len(part)
+
+    return "".join(parts)
+
+
+def benchmark(tokenizer_class, text, chars):
+    """Tokenize all of text
+
+    :returns: dict[str, float]
+    """
+    start = time.perf_counter()
+    count = 0
+    for _ in tokenizer_class(text, chars):
+        count += 1
+
+    elapsed = time.perf_counter() - start
+    return {
+        "tokens": count,
+        "elapsed": elapsed,
+        "mbps": len(text) / elapsed / 1048576,
+        "tps": count / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=4,
+        help="Size in megabytes of the text that will be tokenized",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=128,
+        help="Size in kilobytes of the text the character scan tokenizes",
+    )
+    args = parser.parse_args()
+
+    text = create_text(args.size * 1048576)
+    sample = text[:args.sample * 1024]
+
+    chars = WordTokenizer.DEFAULT_CHARS
+    char_set = set(chars)
+    callback = lambda ch: ch in char_set
+
+    benchmarks = [
+        ("word scan", WordTokenizer, sample, callback),
+        ("word index", WordTokenizer, text, chars),
+        ("stopword scan", StopWordTokenizer, sample, callback),
+        ("stopword index", StopWordTokenizer, text, chars),
+    ]
+
+    print("{:<15} {:>10} {:>10} {:>10} {:>14}".format(
+        "tokenizer",
+        "MB",
+        "seconds",
+        "MB/sec",
+        "tokens/sec",
+    ))
+
+    for bench_name, tokenizer_class, bench_text, bench_chars in benchmarks:
+        result = benchmark(tokenizer_class, bench_text, bench_chars)
+        print("{:<15} {:>10.2f} {:>10.2f} {:>10.2f} {:>14.0f}".format(
+            bench_name,
+            len(bench_text) / 1048576,
+            result["elapsed"],
+            result["mbps"],
+            result["tps"],
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -87,6 +87,7 @@ from .number import (
     Hex,
     Integer, Integer as Int,
     Exponential,
+    Histogram,
     Partitions,
     Shorten,
 )
@@ -126,10 +127,14 @@ from .reflection import (
     ReflectType,
 )
 from .server import (
+    AsyncCallbackServer,
+    AsyncPathServer,
     CallbackServer,
     PathServer,
+    PreforkWSGIServer,
     ServerThread,
     ThreadingWSGIServer,
+    ThreadPoolWSGIServer,
     WSGIServer,
 )
 from .string import (
@@ -139,6 +144,7 @@ from .string import (
     NamingConvention,
     EnglishWord,
     Password,
+    HashStream,
 )
 from .token import (
     # we don't import Token because it's too generic for toplevel, if you need
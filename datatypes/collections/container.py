@@ -4,6 +4,8 @@ Container and membership like objects (eg, sets)
 
 https://docs.python.org/3/library/collections.abc.html#collections.abc.Container
 """
+from collections import deque
+import re
 
 from ..compat import *
 
@@ -202,26 +204,251 @@ class HotSet(SortedSet):
 
 
 class Trie(object):
-    """https://en.wikipedia.org/wiki/Trie"""
+    """A prefix tree that is also an Aho-Corasick automaton, so it can find
+    all the values in a string with one pass over the string no matter how
+    many values were added
+
+    :Example:
+        t = Trie("he", "she", "his", "hers")
+        t.has("her") # True, "her" is a prefix of "hers"
+        list(t.finditer("ushers")) # [(1, "she"), (2, "he"), (2, "hers")]
+        t.search("ushers") # (1, "she")
+        t.match("hers", longest=True) # "hers"
+
+    Characters are normalized with .normalize_value() (lowercased by
+    default) when values are added and when strings are searched
+
+    * https://en.wikipedia.org/wiki/Trie
+    * https://en.wikipedia.org/wiki/Aho%E2%80%93Corasick_algorithm
+    """
     def __init__(self, *values):
         self.values = {}
 
+        # the value that ends at this node and the order it was added
+        self.value = None
+        self.index = -1
+
+        # how many characters from the root this node is
+        self.depth = 0
+
+        # the failure link and the closest node on the failure chain that
+        # ends a value, these are set by .build()
+        self.fail = None
+        self.output = None
+
+        # how many values have been added to this trie
+        self.count = 0
+
         for value in values:
             self.add(value)
 
     def add(self, value):
         if value:
-            ch = value[0]
-            remainder = value[1:]
-            if ch not in self.values:
-                self.values[ch] = None
-
-            if remainder:
-                if self.values[ch] is None:
-                    self.values[ch] = type(self)(remainder)
+            node = self
+            for ch in value:
+                ch = self.normalize_value(ch)
+                child = node.values.get(ch)
+                if child is None:
+                    child = type(self)()
+                    child.depth = node.depth + 1
+                    node.values[ch] = child
+
+                node = child
+
+            if node.value is None:
+                node.value = value
+                node.index = self.count
+                self.count += 1
+
+            # the automaton has to be rebuilt
+            self.fail = None
+
+    def build(self):
+        """Set the failure links of every node, this is called automatically
+        the first time the trie is searched after values were added
+
+        The failure link of a node points to the node of the longest proper
+        suffix of that node's path that is also in the trie
+
+        The root's failure link is set last since that is what marks the
+        automaton as built, see `.get_root`
+        """
+        self.output = None
+        self.first_regex = self.get_first_regex(self.values.keys())
+
+        queue = deque()
+        for child in self.values.values():
+            child.fail = self
+            child.output = None
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in node.values.items():
+                fail = node.fail
+                while fail is not self and ch not in fail.values:
+                    fail = fail.fail
+
+                child.fail = fail.values.get(ch, self)
+                if child.fail.value is None:
+                    child.output = child.fail.output
 
                 else:
-                    self.values[ch].add(self.normalize_value(remainder))
+                    child.output = child.fail
+
+                queue.append(child)
+
+        self.fail = self
+
+    def get_first_regex(self, chars):
+        """Internal method. Compile a regex that matches any character that
+        can start a value, searching skips ahead with this when it isn't in
+        the middle of a possible match
+
+        This is case insensitive because .normalize_value() lowercases, a
+        child that normalizes differently can override this, the regex only
+        has to match at least every character that can start a value
+
+        :param chars: Iterable[str], the normalized first characters
+        :returns: re.Pattern
+        """
+        chars = "".join(re.escape(ch) for ch in chars)
+        return re.compile(f"[{chars}]", re.IGNORECASE) if chars else None
+
+    def get_root(self):
+        """Internal method. Return self after making sure the automaton is
+        built"""
+        if self.fail is None:
+            self.build()
+        return self
+
+    def finditer(self, text, start=0, stop=None):
+        """Find every value in text, including overlapping values
+
+        :param text: str
+        :param start: int, where to start searching in text
+        :param stop: int, where to stop searching in text
+        :returns: generator[tuple[int, str]], the start of the found value
+            in text and the value, in the order the values end in text
+        """
+        root = self.get_root()
+        normalize = self.normalize_value
+        node = root
+        stop = len(text) if stop is None else stop
+        i = start
+
+        while i < stop:
+            if node is root:
+                if not root.first_regex:
+                    break
+
+                m = root.first_regex.search(text, i, stop)
+                if not m:
+                    break
+
+                i = m.start()
+
+            ch = normalize(text[i])
+            while node is not root and ch not in node.values:
+                node = node.fail
+
+            node = node.values.get(ch, root)
+            i += 1
+
+            output = node if node.value is not None else node.output
+            while output is not None:
+                yield i - output.depth, output.value
+                output = output.output
+
+    def search(self, text, start=0, stop=None, longest=False):
+        """Find the leftmost value in text
+
+        :param text: str
+        :param start: int, where to start searching in text
+        :param stop: int, where to stop searching in text
+        :param longest: bool, if more than one value starts at the leftmost
+            position then the longest one wins if this is True, otherwise the
+            one that was added first wins
+        :returns: tuple[int, str]|None, the start of the found value in text
+            and the value
+        """
+        root = self.get_root()
+        normalize = self.normalize_value
+        node = root
+        best = None
+        stop = len(text) if stop is None else stop
+        i = start
+
+        while i < stop:
+            if node is root:
+                if best is not None or not root.first_regex:
+                    break
+
+                m = root.first_regex.search(text, i, stop)
+                if not m:
+                    break
+
+                i = m.start()
+
+            elif best is not None and i - node.depth > best[0]:
+                # no match that is still possible can start at or before the
+                # best match
+                break
+
+            ch = normalize(text[i])
+            while node is not root and ch not in node.values:
+                node = node.fail
+
+            node = node.values.get(ch, root)
+            i += 1
+
+            output = node if node.value is not None else node.output
+            while output is not None:
+                found = (i - output.depth, output)
+                if (
+                    best is None
+                    or found[0] < best[0]
+                    or (
+                        found[0] == best[0]
+                        and self.is_better(output, best[1], longest)
+                    )
+                ):
+                    best = found
+
+                output = output.output
+
+        return None if best is None else (best[0], best[1].value)
+
+    def match(self, text, start=0, longest=False):
+        """Find the value that text starts with
+
+        :param text: str
+        :param start: int, where in text the value has to start
+        :param longest: bool, see .search()
+        :returns: str|None, the found value
+        """
+        normalize = self.normalize_value
+        node = self
+        best = None
+        for i in range(start, len(text)):
+            node = node.values.get(normalize(text[i]))
+            if node is None:
+                break
+
+            if node.value is not None:
+                if best is None or self.is_better(node, best, longest):
+                    best = node
+
+        return None if best is None else best.value
+
+    def is_better(self, node, best, longest):
+        """Internal method. Returns True if node beats best, both nodes end
+        values that start at the same position"""
+        if longest:
+            return node.depth > best.depth
+
+        else:
+            return node.index < best.index
 
     def has(self, value):
         ret = True
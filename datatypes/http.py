@@ -16,16 +16,35 @@ import io
 import os
 import base64
 import datetime
+import logging
+import hashlib
+import threading
+import time
+import random
+import secrets
+import copy
+import email.utils
+import email.parser
+import functools
+import http.client
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
 from typing import Literal, Any
 from collections.abc import Generator
 
 from .compat import *
 from .compat import cookies as httpcookies
 from .copy import Deepcopy
+from .collections import Pool
 from .string import String, ByteString
+from .number import Exponential, Histogram
 from .config.environ import environ
 
 
+logger = logging.getLogger(__name__)
+
+
 class HTTPHeaders(Headers, Mapping):
     """handles headers, see wsgiref.Headers link for method and use information
 
@@ -61,8 +80,23 @@ class HTTPHeaders(Headers, Mapping):
         the warn-text using the method described in RFC 2047
     """
 
+    _names = {}
+    """Internal cache of normalized header names, this is shared by all
+    instances since the same handful of header names are used over and over,
+    see `._convert_string_name`"""
+
+    _names_maxsize = 2048
+
     def __init__(self, headers=None, **kwargs):
         super().__init__([])
+
+        # normalized name -> list of values, this makes lookups O(1) while
+        # ._headers keeps the order of the headers
+        self._index = {}
+
+        # normalized name -> {kind: parsed value}, see `._get_parsed`
+        self._parsed = {}
+
         self.append(headers, **kwargs)
 
     def _iter_headers(self, headers, **kwargs):
@@ -136,9 +170,22 @@ class HTTPHeaders(Headers, Mapping):
 
     def _convert_string_name(self, k):
         """converts things like FOO_BAR to Foo-Bar which is the normal form"""
-        k = String(k, self.encoding)
-        parts = k.replace('_', '-').split('-')
-        return "-".join((self._convert_string_part(part) for part in parts))
+        key = (type(self), k)
+        try:
+            return self._names[key]
+
+        except KeyError:
+            pass
+
+        name = String(k, self.encoding)
+        parts = name.replace('_', '-').split('-')
+        name = "-".join((self._convert_string_part(part) for part in parts))
+
+        if len(self._names) >= self._names_maxsize:
+            self._names.clear()
+
+        self._names[key] = name
+        return name
 
     def _convert_string_type(self, v, **kwargs):
         """Override the internal method wsgiref.headers.Headers uses to check
@@ -147,22 +194,51 @@ class HTTPHeaders(Headers, Mapping):
         Python changed this method between 3.12.11 and 3.12.13 and added
         a keyword argument
         """
-        if v is not str:
+        if type(v) is not str:
             v = String(v).raw()
 
         return super()._convert_string_type(v, **kwargs)
 
+    def _get_parsed(self, name, kind, callback):
+        """Internal method. Parsing header values is relatively expensive so
+        this caches the parsed value of `name` until the header is changed
+
+        :param name: str, the normalized header name
+        :param kind: str, the kind of parsing, a header can be parsed in
+            different ways (eg, `.parse` and `.parse_weighted`)
+        :param callback: Callable[[str], Any], called with `name` on a miss
+        :returns: Any, the parsed value
+        """
+        parsed = self._parsed.setdefault(name, {})
+        if kind not in parsed:
+            parsed[kind] = callback(name)
+
+        return parsed[kind]
+
+    def _add_index(self, name, val):
+        """Internal method. Called anytime a header is added"""
+        self._index.setdefault(name, []).append(val)
+        self._parsed.pop(name, None)
+
+    def _delete_index(self, name):
+        """Internal method. Called anytime a header is removed"""
+        self._index.pop(name, None)
+        self._parsed.pop(name, None)
+
     def get_all(self, name):
         """Get all the values for name
 
         :returns: list[str], any set values for name
         """
         name = self._convert_string_name(name)
-        return super().get_all(name)
+        return list(self._index.get(name, []))
 
     def get(self, name, default=None):
         name = self._convert_string_name(name)
-        return super().get(name, default)
+        if vals := self._index.get(name, None):
+            return vals[0]
+
+        return default
 
     def parse(self, name):
         """Parses the name header and returns main, params
@@ -177,6 +253,15 @@ class HTTPHeaders(Headers, Mapping):
         :param name: str, the header to parse
         :returns: tuple[str, dict], returns a tuple of (main, params)
         """
+        main, params = self._get_parsed(
+            self._convert_string_name(name),
+            "parse",
+            self._parse,
+        )
+        return main, dict(params)
+
+    def _parse(self, name):
+        """Internal method. The uncached `.parse`"""
         if h := self.get(name, ""):
             em = email.message.Message()
             em[name] = h
@@ -200,6 +285,15 @@ class HTTPHeaders(Headers, Mapping):
 
         https://www.rfc-editor.org/rfc/rfc9110#name-quality-values
         """
+        ret = self._get_parsed(
+            self._convert_string_name(name),
+            "parse_weighted",
+            self._parse_weighted,
+        )
+        return [(value, dict(params)) for value, params in ret]
+
+    def _parse_weighted(self, name):
+        """Internal method. The uncached `.parse_weighted`"""
         ret = []
 
         if h := self.get(name, ""):
@@ -233,17 +327,53 @@ class HTTPHeaders(Headers, Mapping):
         """Return just the params of the header `name`"""
         return self.parse(name)[1]
 
+    def get_cache_control(self) -> dict[str, str|bool]:
+        """Parse the Cache-Control header(s) into a dict of directive: value,
+        directives without a value (eg, `no-store`) will have a value of True
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-cache-control
+
+        :returns: the directive names will be lowercase
+        """
+        return dict(self._get_parsed(
+            "Cache-Control",
+            "cache_control",
+            self._get_cache_control,
+        ))
+
+    def _get_cache_control(self, name):
+        """Internal method. The uncached `.get_cache_control`"""
+        ret = {}
+        for h in self.get_all(name):
+            for part in h.split(","):
+                if part := part.strip():
+                    if "=" in part:
+                        k, v = part.split("=", 1)
+                        ret[k.strip().lower()] = v.strip().strip("\"")
+
+                    else:
+                        ret[part.lower()] = True
+
+        return ret
+
     def __delitem__(self, name):
         name = self._convert_string_name(name)
-        return super().__delitem__(name)
+        if name in self._index:
+            self._headers[:] = [kv for kv in self._headers if kv[0] != name]
+            self._delete_index(name)
 
     def __setitem__(self, name, val):
+        del self[name]
         name = self._convert_string_name(name)
-        return super().__setitem__(name, val)
+        val = self._convert_string_type(val)
+        self._headers.append((name, val))
+        self._add_index(name, val)
 
     def setdefault(self, name, val):
-        name = self._convert_string_name(name)
-        return super().setdefault(name, val)
+        if name not in self:
+            self.add_header(name, val)
+
+        return self.get(name)
 
     def add_header(self, name, val, **params):
         """This is additive, meaning if name already exists then another row
@@ -254,7 +384,8 @@ class HTTPHeaders(Headers, Mapping):
         :param **params: these can be added as header variables to val
         """
         name = self._convert_string_name(name)
-        return super().add_header(name, val, **params)
+        super().add_header(name, val, **params)
+        self._add_index(name, self._headers[-1][1])
 
     def set_header(self, name, val, **params):
         """This completely replaces any currently set value of name with val
@@ -275,7 +406,7 @@ class HTTPHeaders(Headers, Mapping):
 
     def __contains__(self, name):
         name = self._convert_string_name(name)
-        return super().__contains__(name)
+        return name in self._index
 
     def keys(self):
         return [k for k, v in self._headers]
@@ -419,9 +550,17 @@ class HTTPHeaders(Headers, Mapping):
 
         :returns: Optional[str]
         """
+        return self._get_parsed(
+            "Content-Type",
+            "content_encoding",
+            self._get_content_encoding,
+        )
+
+    def _get_content_encoding(self, name):
+        """Internal method. The uncached `.get_content_encoding`"""
         encoding = None
 
-        if ct := self.get("Content-Type"):
+        if ct := self.get(name):
             em = email.message.Message()
             em.add_header("content-type", ct)
             encoding = em.get_content_charset()
@@ -431,9 +570,17 @@ class HTTPHeaders(Headers, Mapping):
     def get_media_type(self) -> str:
         """Get the media type (eg, text/plain) from the Content-Type header
         """
+        return self._get_parsed(
+            "Content-Type",
+            "media_type",
+            self._get_media_type,
+        )
+
+    def _get_media_type(self, name):
+        """Internal method. The uncached `.get_media_type`"""
         media_type = ""
 
-        if ct := self.get("Content-Type"):
+        if ct := self.get(name):
             em = email.message.Message()
             em.add_header("content-type", ct)
             media_type = em.get_content_type()
@@ -711,6 +858,13 @@ class HTTPResponse(object):
         self.content = content
         self.code = code
 
+        # True if this response was served from an HTTPCache
+        self.cached = False
+
+        # HTTPTimings of the request attempt that created this response, None
+        # if the response didn't come from the network
+        self.timings = None
+
     def json(self) -> Any:
         return json.loads(self.content)
 
@@ -731,6 +885,724 @@ class HTTPResponse(object):
             yield content
 
 
+class HTTPCacheEntry(object):
+    """Internal class. Holds everything HTTPCache needs to know about a
+    stored response to decide if it is fresh or needs to be revalidated
+
+    This is pickled by `DiskHTTPCache` so it only holds builtin values
+    """
+    def __init__(self, code, content, headers, request_headers=None):
+        """
+        :param code: int, the response http code
+        :param content: bytes, the response body
+        :param headers: Mapping, the response headers
+        :param request_headers: Mapping, the headers of the request that
+            produced this response, used to match the `Vary` header
+        """
+        self.code = code
+        self.content = content
+        self.headers = list(HTTPHeaders(headers).items())
+        self.stored = time.time()
+
+        self.vary = {}
+        if vary := self.get_headers().get("Vary", ""):
+            request_headers = HTTPHeaders(request_headers)
+            for name in vary.split(","):
+                if name := name.strip():
+                    self.vary[name] = request_headers.get(name, "")
+
+    def get_headers(self) -> HTTPHeaders:
+        return HTTPHeaders(self.headers)
+
+    def get_timestamp(self, headers: HTTPHeaders, name: str) -> float|None:
+        """Internal method. Parse the http-date header `name` into a unix
+        timestamp, returns None if the header is missing or invalid"""
+        if h := headers.get(name, ""):
+            try:
+                return email.utils.parsedate_to_datetime(h).timestamp()
+
+            except (TypeError, ValueError):
+                pass
+
+    def lifetime(self) -> float:
+        """Return how many seconds this response is fresh for
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-calculating-freshness-lifet
+        """
+        headers = self.get_headers()
+        cc = headers.get_cache_control()
+
+        if "no-cache" in cc:
+            return 0.0
+
+        if "max-age" in cc:
+            try:
+                return float(cc["max-age"])
+
+            except ValueError:
+                return 0.0
+
+        date = self.get_timestamp(headers, "Date") or self.stored
+
+        if "Expires" in headers:
+            # an invalid Expires value means it is already expired
+            expires = self.get_timestamp(headers, "Expires") or 0.0
+            return max(0.0, expires - date)
+
+        if modified := self.get_timestamp(headers, "Last-Modified"):
+            # heuristic freshness, 10% of the time since the last modification
+            # https://www.rfc-editor.org/rfc/rfc9111#name-calculating-heuristic-fresh
+            return max(0.0, (date - modified) * 0.1)
+
+        return 0.0
+
+    def age(self) -> float:
+        """Return how many seconds old this response is
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-calculating-age
+        """
+        try:
+            age = float(self.get_headers().get("Age", 0))
+
+        except ValueError:
+            age = 0.0
+
+        return age + (time.time() - self.stored)
+
+    def is_fresh(self) -> bool:
+        return self.age() < self.lifetime()
+
+    def has_validators(self) -> bool:
+        headers = self.get_headers()
+        return "ETag" in headers or "Last-Modified" in headers
+
+    def matches(self, request_headers: Mapping) -> bool:
+        """Return True if this entry can be used to answer a request with
+        `request_headers`
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-calculating-cache-keys-with
+        """
+        if "*" in self.vary:
+            return False
+
+        request_headers = HTTPHeaders(request_headers)
+        for name, value in self.vary.items():
+            if request_headers.get(name, "") != value:
+                return False
+
+        return True
+
+    def validate(self, request_headers: HTTPHeaders):
+        """Add the conditional headers to `request_headers` so the server
+        can respond with a 304 if this entry is still valid"""
+        headers = self.get_headers()
+        if etag := headers.get("ETag", ""):
+            request_headers["If-None-Match"] = etag
+
+        if modified := headers.get("Last-Modified", ""):
+            request_headers["If-Modified-Since"] = modified
+
+    def refresh(self, headers: Mapping):
+        """Update this entry with the headers of a 304 response
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-freshening-stored-responses
+        """
+        stored_headers = self.get_headers()
+        for name, value in HTTPHeaders(headers).items():
+            if name != "Content-Length":
+                stored_headers[name] = value
+
+        self.headers = list(stored_headers.items())
+        self.stored = time.time()
+
+    def create_response(self, request, response=None, **kwargs):
+        """Create the response instance the client will return
+
+        :param request: urllib.request.Request
+        :param response: the raw response if the server was actually
+            contacted to revalidate this entry
+        :keyword response_class: HTTPResponse
+        :returns: HTTPResponse
+        """
+        res = kwargs.get("response_class", HTTPResponse)(
+            self.code,
+            self.content,
+            self.get_headers(),
+            request,
+            response,
+        )
+        res.cached = True
+        return res
+
+
+class HTTPCache(object):
+    """Private (client side) HTTP cache that can be passed to HTTPClient
+
+    This honors the `Cache-Control` request and response directives and will
+    revalidate stale responses using `ETag` and `Last-Modified` so the
+    server can respond with a cheap 304
+
+    https://www.rfc-editor.org/rfc/rfc9111
+
+    Child classes need to implement the `.get`, `.set`, and `.delete`
+    storage methods, see `MemoryHTTPCache` and `DiskHTTPCache`
+
+    :Example:
+        c = HTTPClient("http://example.com", cache=MemoryHTTPCache())
+        c.get("/foo") # makes the request
+        c.get("/foo") # served from the cache if still fresh
+    """
+    cacheable_methods = set(["GET", "HEAD"])
+
+    cacheable_codes = set([200, 203, 204, 300, 301, 308, 404, 405, 410, 414])
+    """Responses that are cacheable by default
+
+    https://www.rfc-editor.org/rfc/rfc9110#name-overview-of-status-codes
+    """
+
+    entry_class = HTTPCacheEntry
+
+    def get_key(self, method: str, url: str) -> str:
+        return "{} {}".format(method.upper(), url)
+
+    def get_entry(
+        self,
+        method: str,
+        url: str,
+        request_headers: Mapping,
+    ) -> HTTPCacheEntry|None:
+        """Return the stored entry for the request if it exists"""
+        if entry := self.get(self.get_key(method, url)):
+            if entry.matches(request_headers):
+                return entry
+
+    def set_entry(self, method: str, url: str, entry: HTTPCacheEntry):
+        self.set(self.get_key(method, url), entry)
+
+    def create_entry(self, code, content, headers, request_headers):
+        return self.entry_class(code, content, headers, request_headers)
+
+    def invalidate(self, url: str):
+        """Remove all the stored responses for `url`, this is called when an
+        unsafe method (eg, POST) succeeds
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-invalidating-stored-respons
+        """
+        for method in self.cacheable_methods:
+            self.delete(self.get_key(method, url))
+
+    def is_storable(
+        self,
+        method: str,
+        code: int,
+        request_headers: HTTPHeaders,
+        response_headers: HTTPHeaders,
+    ) -> bool:
+        """Return True if the response can be stored in the cache
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-storing-responses-in-caches
+        """
+        if method.upper() not in self.cacheable_methods:
+            return False
+
+        if code not in self.cacheable_codes:
+            return False
+
+        if "no-store" in request_headers.get_cache_control():
+            return False
+
+        cc = response_headers.get_cache_control()
+        if "no-store" in cc:
+            return False
+
+        return (
+            "max-age" in cc
+            or "no-cache" in cc
+            or "Expires" in response_headers
+            or "ETag" in response_headers
+            or "Last-Modified" in response_headers
+        )
+
+    def get(self, key: str) -> HTTPCacheEntry|None:
+        raise NotImplementedError()
+
+    def set(self, key: str, entry: HTTPCacheEntry):
+        raise NotImplementedError()
+
+    def delete(self, key: str):
+        raise NotImplementedError()
+
+
+class MemoryHTTPCache(HTTPCache):
+    """An HTTPCache that holds the `maxsize` most used responses in memory"""
+    def __init__(self, maxsize=1000):
+        self.pool = Pool(maxsize=maxsize)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.pool.get(key)
+
+    def set(self, key, entry):
+        with self.lock:
+            # Pool evicts when it is full even if key already exists
+            self.pool.pop(key, None)
+            self.pool[key] = entry
+
+    def delete(self, key):
+        with self.lock:
+            self.pool.pop(key, None)
+
+
+class DiskHTTPCache(HTTPCache):
+    """An HTTPCache that stores responses in Cachepath files so they can be
+    shared between processes and survive restarts"""
+    def __init__(self, dir="", prefix="http"):
+        """
+        :param dir: str, the directory the cache files will be stored in,
+            defaults to environ.CACHE_DIR
+        :param prefix: str, the Cachepath key prefix
+        """
+        self.dir = dir
+        self.prefix = prefix
+
+    def get_path(self, key):
+        from .path import Cachepath # avoid circular dependency
+        return Cachepath(
+            hashlib.md5(ByteString(key)).hexdigest(),
+            prefix=self.prefix,
+            dir=self.dir,
+        )
+
+    def get(self, key):
+        if cp := self.get_path(key):
+            try:
+                return cp.read()
+
+            except (EOFError, pickle.UnpicklingError):
+                # a partially written or corrupted file is a cache miss
+                pass
+
+    def set(self, key, entry):
+        self.get_path(key).write(entry)
+
+    def delete(self, key):
+        self.get_path(key).delete()
+
+
+class HTTPRetry(object):
+    """Retry and hedging policy that can be passed to HTTPClient
+
+    Failed requests (connection errors, timeouts, and `.retry_codes`
+    responses) are retried with exponential backoff and full jitter. Only
+    idempotent methods are retried by default and retries are limited by a
+    retry budget so a struggling upstream doesn't get hammered with retries
+
+    If `hedge` is True, a duplicate request will be sent if the original
+    request hasn't responded after the `hedge_percentile` latency and the
+    first response will be kept
+
+    https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    https://research.google/pubs/the-tail-at-scale/
+
+    :Example:
+        retry = HTTPRetry(3, hedge=True)
+        c = HTTPClient("http://example.com", retry=retry)
+        c.get("/foo")
+        print(retry.counters) # {"requests": 1, "retries": 0, ...}
+    """
+    idempotent_methods = set([
+        "GET",
+        "HEAD",
+        "OPTIONS",
+        "TRACE",
+        "PUT",
+        "DELETE",
+    ])
+    """https://www.rfc-editor.org/rfc/rfc9110#name-idempotent-methods"""
+
+    retry_codes = set([408, 429, 500, 502, 503, 504])
+
+    def __init__(
+        self,
+        retries: int = 3,
+        *,
+        backoff: float = 0.1,
+        rate: int|float = 1.0,
+        max_backoff: float = 10.0,
+        budget: float = 0.1,
+        budget_burst: int = 10,
+        methods: Iterable[str]|None = None,
+        hedge: bool = False,
+        hedge_delay: float = 0.1,
+        hedge_percentile: int = 95,
+        samples: int = 1000,
+    ):
+        """
+        :param retries: how many times a failed request will be retried
+        :keyword backoff: the initial backoff in seconds
+        :keyword rate: the backoff growth rate, see `number.Exponential`
+        :keyword max_backoff: no backoff will be longer than this
+        :keyword budget: every request adds this much to the retry budget,
+            so 0.1 means roughly 10% of requests can be retried
+        :keyword budget_burst: the maximum size of the retry budget
+        :keyword methods: the methods that will be retried and hedged,
+            defaults to `.idempotent_methods`
+        :keyword hedge: True to send hedged requests
+        :keyword hedge_delay: the hedge delay in seconds until enough
+            latencies have been recorded to find `hedge_percentile`
+        :keyword hedge_percentile: the latency percentile a request has to
+            exceed before it is hedged
+        :keyword samples: how many latencies to keep
+        """
+        self.retries = retries
+        self.delays = [
+            min(delay, max_backoff)
+            for delay in Exponential(backoff, rate).growth(retries)
+        ]
+        self.max_backoff = max_backoff
+
+        self.budget = budget
+        self.budget_burst = budget_burst
+        self.tokens = float(budget_burst)
+
+        if methods:
+            self.methods = set(m.upper() for m in methods)
+
+        else:
+            self.methods = self.idempotent_methods
+
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.latencies = deque(maxlen=samples)
+        self.executor = None
+
+        self.counters = {
+            "requests": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedges_won": 0,
+        }
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, count: int = 1):
+        with self.lock:
+            self.counters[name] += count
+
+    def is_retryable(self, method: str) -> bool:
+        return method.upper() in self.methods
+
+    def should_retry(
+        self,
+        response: HTTPResponse|None = None,
+        error: Exception|None = None,
+    ) -> bool:
+        """Return True if the attempt that produced `response` or `error`
+        failed in a way that another attempt might fix"""
+        if error:
+            return isinstance(error, OSError)
+
+        return response.code in self.retry_codes
+
+    def deposit(self):
+        """Called for every request, adds to the retry budget"""
+        with self.lock:
+            self.counters["requests"] += 1
+            self.tokens = min(self.budget_burst, self.tokens + self.budget)
+
+    def withdraw(self) -> bool:
+        """Called before every retry, returns False if the retry budget is
+        exhausted and the request shouldn't be retried"""
+        with self.lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                self.counters["retries"] += 1
+                return True
+
+            return False
+
+    def get_delay(
+        self,
+        attempt: int,
+        response: HTTPResponse|None = None,
+    ) -> float:
+        """Return how many seconds to wait before retrying `attempt`, this
+        uses full jitter and will honor a `Retry-After` delay"""
+        delay = random.uniform(0, self.delays[attempt])
+
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 0))
+
+            except ValueError:
+                retry_after = 0.0
+
+            delay = max(delay, min(retry_after, self.max_backoff))
+
+        return delay
+
+    def measure(self, callback, *args, **kwargs) -> HTTPResponse:
+        """Run `callback` and record how long it took"""
+        start = time.monotonic()
+        res = callback(*args, **kwargs)
+        self.latencies.append(time.monotonic() - start)
+        return res
+
+    def get_hedge_delay(self) -> float:
+        """Return how many seconds to wait for a response before sending the
+        hedged request"""
+        latencies = list(self.latencies)
+        if len(latencies) < 20:
+            return self.hedge_delay
+
+        latencies.sort()
+        index = int(len(latencies) * self.hedge_percentile / 100)
+        return latencies[min(index, len(latencies) - 1)]
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if not self.executor:
+                self.executor = ThreadPoolExecutor(
+                    thread_name_prefix=self.__class__.__name__,
+                )
+
+            return self.executor
+
+    def close(self):
+        """Shut down the thread pool used for hedged requests, a hedged
+        request that lost is not waited on"""
+        with self.lock:
+            executor = self.executor
+            self.executor = None
+
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class HTTPTimings(object):
+    """The timings of one request attempt, every phase is in seconds and is
+    0.0 if the phase didn't happen (eg, `.connect` will be 0.0 when the
+    connection was reused and `.tls` will be 0.0 for http urls)
+
+    https://developer.chrome.com/docs/devtools/network/reference#timing-explanation
+    """
+    phases = ["dns", "connect", "tls", "send", "wait", "receive"]
+
+    @property
+    def ttfb(self):
+        """Time to first byte, everything from the start of the request until
+        the response status line and headers have been read"""
+        return self.dns + self.connect + self.tls + self.send + self.wait
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.total = 0.0
+        for phase in self.phases:
+            setattr(self, phase, 0.0)
+
+    def finish(self):
+        """Mark the request as done, this sets `.total`"""
+        self.total = time.monotonic() - self.start
+
+    def as_dict(self):
+        """
+        :returns: dict[str, float], phase name keys with "ttfb" and "total"
+        """
+        ret = {phase: getattr(self, phase) for phase in self.phases}
+        ret["ttfb"] = self.ttfb
+        ret["total"] = self.total
+        return ret
+
+    def __repr__(self):
+        return "<{} {}>".format(
+            type(self).__name__,
+            ", ".join(f"{k}={v:.6f}" for k, v in self.as_dict().items()),
+        )
+
+
+class HTTPTimingMixin(object):
+    """Internal class. Gives an http.client connection the ability to fill
+    in an HTTPTimings instance as it connects, sends, and waits"""
+    def __init__(self, *args, timings=None, **kwargs):
+        self.timings = timings if timings else HTTPTimings()
+        super().__init__(*args, **kwargs)
+
+        # http.client creates the socket with this, replacing it times the
+        # dns lookup and tcp handshake without changing how .connect works
+        self._create_connection = self.create_connection
+
+    def create_connection(self, address, timeout=None, source_address=None):
+        """Internal method. Works like `socket.create_connection` but the
+        host is resolved first so the dns lookup and the tcp handshake are
+        timed separately
+
+        :param address: tuple[str, int], the host and port
+        :param timeout: float|None, if this isn't a number or None (eg, it
+            is socket's global default sentinel) the socket's default timeout
+            is used
+        :param source_address: tuple[str, int]|None, bind to this address
+            before connecting
+        :returns: socket.socket
+        """
+        host, port = address
+        start = time.monotonic()
+        try:
+            addrinfos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+        finally:
+            self.timings.dns = time.monotonic() - start
+
+        start = time.monotonic()
+        try:
+            error = None
+            for family, socktype, proto, _, sockaddr in addrinfos:
+                sock = None
+                try:
+                    sock = socket.socket(family, socktype, proto)
+                    if timeout is None or isinstance(timeout, (int, float)):
+                        sock.settimeout(timeout)
+
+                    if source_address:
+                        sock.bind(source_address)
+
+                    sock.connect(sockaddr)
+                    return sock
+
+                except OSError as e:
+                    error = e
+                    if sock is not None:
+                        sock.close()
+
+            raise error or OSError(f"Could not resolve {host}")
+
+        finally:
+            self.timings.connect = time.monotonic() - start
+
+    def request(self, *args, **kwargs):
+        timings = self.timings
+        start = time.monotonic()
+        super().request(*args, **kwargs)
+        # request will connect if it isn't already connected so we remove
+        # the connection phases to get just the time it took to send
+        timings.send = max(
+            0.0,
+            (time.monotonic() - start)
+            - timings.connect
+            - timings.tls
+        )
+
+    def getresponse(self):
+        start = time.monotonic()
+        try:
+            return super().getresponse()
+
+        finally:
+            self.timings.wait = time.monotonic() - start
+
+
+class HTTPTimingConnection(HTTPTimingMixin, http.client.HTTPConnection):
+    pass
+
+
+class HTTPTimingHandler(urllib.request.HTTPHandler):
+    """urllib handler that uses HTTPTimingConnection so the request's
+    `.timings` gets filled in"""
+    def http_open(self, req):
+        return self.do_open(
+            functools.partial(
+                HTTPTimingConnection,
+                timings=getattr(req, "timings", None),
+            ),
+            req,
+        )
+
+
+if hasattr(http.client, "HTTPSConnection"):
+    class HTTPSTimingConnection(HTTPTimingMixin, http.client.HTTPSConnection):
+        def connect(self):
+            """Everything the connection does after the tcp handshake is
+            counted as the tls handshake"""
+            start = time.monotonic()
+            super().connect()
+            self.timings.tls = max(
+                0.0,
+                time.monotonic() - start - self.timings.connect,
+            )
+
+
+    class HTTPSTimingHandler(urllib.request.HTTPSHandler):
+        def https_open(self, req):
+            return self.do_open(
+                functools.partial(
+                    HTTPSTimingConnection,
+                    timings=getattr(req, "timings", None),
+                ),
+                req,
+                context=self._context,
+            )
+
+
+class HTTPStats(object):
+    """Aggregate request timings per host
+
+    Every phase of HTTPTimings (plus "ttfb" and "total") gets its own
+    Histogram for each host
+
+    :Example:
+        c = HTTPClient("http://example.com")
+        c.get("/")
+        c.stats.get("example.com")["total"].percentile(99)
+    """
+    histogram_class = Histogram
+
+    def __init__(self):
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def add(self, host, timings):
+        """Add timings to the histograms of host
+
+        :param host: str, the host (and port if present) of the request
+        :param timings: HTTPTimings
+        """
+        histograms = self.hosts.get(host)
+        if histograms is None:
+            with self.lock:
+                histograms = self.hosts.setdefault(host, {})
+
+        for phase, value in timings.as_dict().items():
+            if phase not in histograms:
+                with self.lock:
+                    histograms.setdefault(phase, self.histogram_class())
+
+            histograms[phase].add(value)
+
+    def get(self, host):
+        """
+        :param host: str
+        :returns: dict[str, Histogram], empty if there are no requests for
+            host
+        """
+        return self.hosts.get(host, {})
+
+    def as_dict(self):
+        """
+        :returns: dict[str, dict[str, dict]], host keys with phase keys whose
+            values are the Histogram summaries
+        """
+        return {
+            host: {
+                phase: histogram.as_dict()
+                for phase, histogram in histograms.items()
+            } for host, histograms in self.hosts.items()
+        }
+
+    def clear(self):
+        with self.lock:
+            self.hosts = {}
+
+
 class HTTPClient(object):
     """A Generic HTTP request client
 
@@ -771,9 +1643,28 @@ class HTTPClient(object):
             usually don't change all that much
         :keyword json: bool, if True then try and do a json request when
             possible
+        :keyword cache: HTTPCache, if passed in then responses will be
+            cached and revalidated according to RFC 9111
+        :keyword retry: HTTPRetry, if passed in then failed requests will be
+            retried and slow requests can be hedged
+        :keyword events: Events, if passed in then a "response" event will be
+            broadcast after every request attempt and an "error" event when
+            an attempt couldn't connect, both events have `client`, `request`,
+            and `timings` keys, plus `response` or `error`
+        :keyword stats: HTTPStats, where the timings of every request attempt
+            will be aggregated by host
+        :keyword opener: urllib.request.OpenerDirector, if passed in then its
+            handlers (eg, proxy, cookie, and auth handlers) will be used for
+            every request, see `.get_opener`
         """
         self.base_url = self.get_base_url(base_url)
         self.query = {}
+        self.cache = kwargs.get("cache", None)
+        self.retry = kwargs.get("retry", None)
+        self.events = kwargs.get("events", None)
+        self.stats = kwargs.get("stats", None) or HTTPStats()
+        self.base_opener = kwargs.get("opener", None)
+        self.opener = None
 
         self.headers = HTTPHeaders()
         if kwargs.get("json", False):
@@ -781,6 +1672,18 @@ class HTTPClient(object):
 
         self.headers.update(kwargs.get("headers", None))
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_val, trace):
+        self.close()
+
+    def close(self):
+        """Release the resources the client holds (eg, the thread pool of
+        `.retry`)"""
+        if self.retry:
+            self.retry.close()
+
     def get(self, uri, query=None, **kwargs):
         """make a GET request"""
         return self.fetch("get", uri, query, **kwargs)
@@ -875,32 +1778,312 @@ class HTTPClient(object):
         )
         req = request_class(fetch_url, **fetch_kwargs)
 
+        if self.cache:
+            res = self.get_fetch_cache_response(req, timeout, response_class)
+
+        else:
+            res = self.get_fetch_response(req, timeout, response_class)
+
+        return res
+
+    def get_fetch_response(self, request, timeout, response_class):
+        """Internal method. Make the request, retrying and hedging it if
+        `.retry` is set
+
+        :param request: urllib.request.Request
+        :param timeout: float
+        :param response_class: type[HTTPResponse]
+        :returns: HTTPResponse
+        """
+        if self.retry and self.retry.is_retryable(request.get_method()):
+            res = self.get_retry_response(request, timeout, response_class)
+
+        else:
+            res = self.get_attempt_response(request, timeout, response_class)
+
+        return res
+
+    def get_retry_response(self, request, timeout, response_class):
+        """Internal method. Make the request using the `.retry` policy"""
+        retry = self.retry
+        retry.deposit()
+
+        attempt = 0
+        while True:
+            res = error = None
+            try:
+                if retry.hedge:
+                    res = self.get_hedge_response(
+                        request,
+                        timeout,
+                        response_class,
+                    )
+
+                else:
+                    res = retry.measure(
+                        self.get_attempt_response,
+                        request,
+                        timeout,
+                        response_class,
+                    )
+
+            except OSError as e:
+                error = e
+
+            if (
+                attempt < retry.retries
+                and retry.should_retry(res, error)
+                and retry.withdraw()
+            ):
+                delay = retry.get_delay(attempt, res)
+                logger.debug(
+                    "Retrying %s %s in %0.3f seconds",
+                    request.get_method(),
+                    request.full_url,
+                    delay,
+                )
+                time.sleep(delay)
+                attempt += 1
+
+            elif error:
+                raise error
+
+            else:
+                return res
+
+    def get_hedge_response(self, request, timeout, response_class):
+        """Internal method. Make the request and if it takes longer than
+        the hedge delay then make it again and keep the first response"""
+        retry = self.retry
+        executor = retry.get_executor()
+        # copy the request before the primary request starts modifying it
+        hedge_request = self.copy_request(request)
+
+        primary = executor.submit(
+            retry.measure,
+            self.get_attempt_response,
+            request,
+            timeout,
+            response_class,
+        )
+        done, _ = wait([primary], timeout=retry.get_hedge_delay())
+        if done:
+            return primary.result()
+
+        retry.increment("hedges")
+        hedge = executor.submit(
+            retry.measure,
+            self.get_attempt_response,
+            hedge_request,
+            timeout,
+            response_class,
+        )
+
+        error = None
+        for future in as_completed([primary, hedge]):
+            try:
+                res = future.result()
+
+            except OSError as e:
+                error = e
+
+            else:
+                if future is hedge:
+                    retry.increment("hedges_won")
+
+                return res
+
+        raise error
+
+    def copy_request(self, request):
+        """Internal method. urllib handlers modify the request's headers so
+        concurrent requests can't share the same request instance"""
+        r = copy.copy(request)
+        r.headers = dict(request.headers)
+        r.unredirected_hdrs = dict(request.unredirected_hdrs)
+        return r
+
+    def get_attempt_response(self, request, timeout, response_class):
+        """Internal method. Actually make the request and wrap the raw
+        response in `response_class`
+
+        :param request: urllib.request.Request
+        :param timeout: float
+        :param response_class: type[HTTPResponse]
+        :returns: HTTPResponse
+        """
+        # the timing handlers will fill this in as the request progresses
+        timings = HTTPTimings()
+        request.timings = timings
+
         try:
             # https://docs.python.org/3/library/urllib.request.html#urllib.request.urlopen
-            res = urlopen(req, timeout=timeout)
+            res = self.get_opener().open(request, timeout=timeout)
+            start = time.monotonic()
+            content = res.read()
+            timings.receive = time.monotonic() - start
             res = response_class(
                 res.code,
-                res.read(),
+                content,
                 res.headers,
-                req,
+                request,
                 res
             )
 
         except HTTPError as e:
+            # an HTTPError can also function as a non-exceptional file-like
+            # return value (the same thing that urlopen() returns).
+            # If you don't read the error it will leave a dangling socket
+            start = time.monotonic()
+            content = e.read()
+            timings.receive = time.monotonic() - start
             res = response_class(
                 e.code,
-                # an HTTPError can also function as a non-exceptional file-like
-                # return value (the same thing that urlopen() returns).
-                # If you don't read the error it will leave a dangling socket
-                e.read(),
-                {},
-                req,
+                content,
+                e.headers or {},
+                request,
                 e
             )
 
         except URLError as e:
+            timings.finish()
+            if self.events:
+                self.events.broadcast(
+                    "error",
+                    client=self,
+                    request=request,
+                    error=e,
+                    timings=timings,
+                )
+
             raise
 
+        timings.finish()
+        res.timings = timings
+        self.stats.add(request.host, timings)
+        if self.events:
+            self.events.broadcast(
+                "response",
+                client=self,
+                request=request,
+                response=res,
+                timings=timings,
+            )
+
+        return res
+
+    def get_opener(self):
+        """Internal method. Build the urllib opener that times each request
+
+        If an opener was passed into the client then the opener is built
+        from its handlers so proxy, cookie, and auth handlers still apply,
+        only the stock http and https handlers are swapped for the timing
+        handlers
+
+        https://docs.python.org/3/library/urllib.request.html#urllib.request.build_opener
+
+        :returns: urllib.request.OpenerDirector
+        """
+        if self.opener is None:
+            if self.base_opener is None:
+                handlers = [HTTPTimingHandler]
+                if hasattr(http.client, "HTTPSConnection"):
+                    handlers.append(HTTPSTimingHandler)
+
+                self.opener = urllib.request.build_opener(*handlers)
+
+            else:
+                opener = urllib.request.OpenerDirector()
+                for handler in self.base_opener.handlers:
+                    opener.add_handler(self.get_timing_handler(handler))
+
+                self.opener = opener
+
+        return self.opener
+
+    def get_timing_handler(self, handler):
+        """Internal method. Return the timing version of a handler from the
+        client's opener, the handler is copied because adding a handler to
+        an opener makes the opener its parent
+
+        :param handler: urllib.request.BaseHandler
+        :returns: urllib.request.BaseHandler
+        """
+        if type(handler) is urllib.request.HTTPHandler:
+            return HTTPTimingHandler(debuglevel=handler._debuglevel)
+
+        if (
+            hasattr(http.client, "HTTPSConnection")
+            and type(handler) is urllib.request.HTTPSHandler
+        ):
+            return HTTPSTimingHandler(
+                debuglevel=handler._debuglevel,
+                context=handler._context,
+            )
+
+        return copy.copy(handler)
+
+    def get_fetch_cache_response(self, request, timeout, response_class):
+        """Internal method. Wraps `.get_fetch_response` with `.cache`, fresh
+        responses are returned without contacting the server and stale
+        responses are revalidated
+
+        https://www.rfc-editor.org/rfc/rfc9111#name-constructing-responses-from
+        """
+        method = request.get_method()
+        url = request.full_url
+        request_headers = HTTPHeaders(request.header_items())
+
+        if method not in self.cache.cacheable_methods:
+            res = self.get_fetch_response(request, timeout, response_class)
+            if res.code < 400:
+                self.cache.invalidate(url)
+
+            return res
+
+        entry = self.cache.get_entry(method, url, request_headers)
+        if entry:
+            cc = request_headers.get_cache_control()
+            if "no-cache" not in cc and entry.is_fresh():
+                return entry.create_response(
+                    request,
+                    response_class=response_class,
+                )
+
+            if entry.has_validators():
+                conditional_headers = HTTPHeaders()
+                entry.validate(conditional_headers)
+                for name, value in conditional_headers.items():
+                    request.add_header(name, value)
+
+        res = self.get_fetch_response(request, timeout, response_class)
+
+        if res.code == 304 and entry:
+            entry.refresh(res.headers)
+            self.cache.set_entry(method, url, entry)
+            res = entry.create_response(
+                request,
+                res.response,
+                response_class=response_class,
+            )
+
+        elif self.cache.is_storable(
+            method,
+            res.code,
+            request_headers,
+            res.headers,
+        ):
+            self.cache.set_entry(
+                method,
+                url,
+                self.cache.create_entry(
+                    res.code,
+                    res.content,
+                    res.headers,
+                    request_headers,
+                ),
+            )
+
         return res
 
     def get_base_url(self, base_url):
@@ -1107,7 +2290,11 @@ class HTTPClient(object):
 
         data = None
 
-        if body:
+        if isinstance(body, MultipartEncoder):
+            headers.update(body.headers)
+            data = body
+
+        elif body:
             if headers.is_json():
                 headers, data = self.get_request_json(body, headers)
 
@@ -1265,7 +2452,8 @@ class MultipartPart(object):
                 body = self.get_file()
 
             else:
-                body = str(self.body, self.part.get_charset())
+                charset = self.headers.get_content_encoding()
+                body = str(self.body, charset or environ.ENCODING)
 
             return params["name"], body
 
@@ -1280,6 +2468,229 @@ class MultipartPart(object):
         return fp
 
 
+class SpooledMultipartPart(MultipartPart):
+    """Internal class. Used in MultipartDecoder.__iter__ to return sections
+    of the body, the part's body is held in memory until it is bigger than
+    `spool_size` and then it is moved to a TempFilepath"""
+    @property
+    def headers(self) -> HTTPHeaders:
+        return self._headers
+
+    @property
+    def body(self) -> bytes:
+        self.fp.seek(0)
+        return self.fp.read()
+
+    def __init__(self, headers: HTTPHeaders, spool_size: int):
+        self.part = None
+        self._headers = headers
+        self.spool_size = spool_size
+        self.size = 0
+        self.path = None
+        self.fp = io.BytesIO()
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.path is None and self.size > self.spool_size:
+            from .path import TempFilepath # avoid circular dependency
+            self.path = TempFilepath()
+            fp = self.path.open("wb+")
+            fp.write(self.fp.getvalue())
+            self.fp = fp
+
+        self.fp.write(data)
+
+    def get_file(self) -> io.IOBase:
+        """Return the file object holding the body, if the body was spooled
+        to disk then `.name` will be the temp file's path"""
+        fp = self.fp
+        fp.seek(0)
+        fp.media_type = self.headers.get_media_type()
+        value, params = self.headers.parse("Content-Disposition")
+        if "filename" in params:
+            fp.filename = params["filename"]
+            if self.path is None:
+                fp.name = params["filename"]
+
+        return fp
+
+    def close(self):
+        """Close the body's file object and if the body was spooled to disk
+        remove the temp file"""
+        self.fp.close()
+        if path := self.path:
+            self.path = None
+            path.rm()
+            try:
+                # TempFilepath created its own directory to hold the file
+                os.rmdir(path.basedir)
+
+            except OSError:
+                pass
+
+
+class MultipartDecoder(Iterable):
+    """Incremental multipart decoder, this reads the body from a file-like
+    stream and yields each part as soon as it is complete. Only a bounded
+    buffer of the stream is ever held in memory and any part bigger than
+    `spool_size` will be spooled to a TempFilepath
+
+    The parts stay open after they are yielded so their file objects can be
+    used, call `.close` when done with them to remove any spooled temp files
+
+    :Example:
+        with MultipartDecoder(handler.headers, handler.rfile) as m:
+            for part in m:
+                print(part.headers)
+                fp = part.get_file()
+    """
+    chunk_size = 65536
+    """How many bytes will be read from the stream at a time"""
+
+    spool_size = 1048576
+    """Parts bigger than this will be moved from memory to disk"""
+
+    max_header_size = 65536
+    """The headers of a part can't be bigger than this"""
+
+    def __init__(
+        self,
+        headers: Mapping,
+        stream: io.IOBase,
+        *,
+        length: int|None = None,
+        chunk_size: int = 0,
+        spool_size: int = 0,
+    ):
+        """
+        :param headers: the headers of the multipart body, these need the
+            `Content-Type` header with the boundary
+        :param stream: the body will be read from here
+        :keyword length: the length of the body, if None then the stream
+            will be read until it is exhausted
+        :keyword chunk_size: see `.chunk_size`
+        :keyword spool_size: see `.spool_size`
+        """
+        if not isinstance(headers, HTTPHeaders):
+            headers = HTTPHeaders(headers)
+
+        media_type, params = headers.parse("Content-Type")
+        if "boundary" not in params:
+            raise ValueError("Multipart Content-Type has no boundary")
+
+        self.headers = headers
+        self.subtype = media_type.split("/", 1)[-1]
+        self.boundary = params["boundary"]
+        self.stream = stream
+        self.remaining = length
+        self.parts = []
+
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+        if spool_size:
+            self.spool_size = spool_size
+
+    def read(self) -> bytes:
+        """Internal method. Read the next chunk of the stream, returns empty
+        bytes when the body is exhausted"""
+        size = self.chunk_size
+        if self.remaining is not None:
+            size = min(size, self.remaining)
+            if size <= 0:
+                return b""
+
+        chunk = self.stream.read(size)
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close all the parts that have been yielded"""
+        parts = self.parts
+        self.parts = []
+        for part in parts:
+            part.close()
+
+    def create_part(self, headers: HTTPHeaders, **kwargs):
+        return kwargs.get("part_class", SpooledMultipartPart)(
+            headers,
+            self.spool_size,
+        )
+
+    def __iter__(self) -> Generator[SpooledMultipartPart]:
+        # the delimiter is always at the start of a line, this supports both
+        # CRLF and LF line endings, buf starts with a newline so the first
+        # delimiter doesn't need to be special cased
+        delim = b"\n--" + self.boundary.encode("ascii")
+        keep = len(delim)
+        header_end = re.compile(rb"\r?\n\r?\n")
+        buf = b"\n"
+
+        # skip the preamble
+        while (i := buf.find(delim)) < 0:
+            if chunk := self.read():
+                buf = buf[-keep:] + chunk
+
+            else:
+                return
+
+        buf = buf[i + keep:]
+
+        while True:
+            while len(buf) < 2 and (chunk := self.read()):
+                buf += chunk
+
+            if buf.startswith(b"--"):
+                # closing delimiter, discard the epilogue
+                while self.read():
+                    pass
+
+                return
+
+            while not (m := header_end.search(buf)):
+                if len(buf) > self.max_header_size:
+                    raise IOError("Multipart part headers are too big")
+
+                if chunk := self.read():
+                    buf += chunk
+
+                else:
+                    raise IOError("Multipart body ended in part headers")
+
+            # the first line is the rest of the delimiter line
+            headerbytes = buf[:m.start()].partition(b"\n")[2]
+            buf = buf[m.end():]
+            part = self.create_part(HTTPHeaders(
+                email.parser.BytesHeaderParser().parsebytes(headerbytes)
+            ))
+            self.parts.append(part)
+
+            while (i := buf.find(delim)) < 0:
+                if len(buf) > keep:
+                    part.write(buf[:-keep])
+                    buf = buf[-keep:]
+
+                if chunk := self.read():
+                    buf += chunk
+
+                else:
+                    raise IOError("Multipart body ended before the boundary")
+
+            # the newline before the delimiter belongs to the delimiter
+            part.write(buf[:i - 1] if buf[i - 1:i] == b"\r" else buf[:i])
+            buf = buf[i + keep:]
+            part.fp.seek(0)
+            yield part
+
+
 class Multipart(Iterable):
     """Handles encoding and decoding a multipart/form-data body
 
@@ -1547,3 +2958,192 @@ class Multipart(Iterable):
     def __bytes__(self) -> bytes:
         return self.as_bytes()
 
+
+class MultipartEncoder(Iterable):
+    """Streaming multipart encoder, iterating the instance yields the body
+    in chunks and files are read lazily `chunk_size` bytes at a time so
+    the whole body never has to be in memory
+
+    If the size of every part is known then `.headers` will have a
+    `Content-Length` header, otherwise it will have a
+    `Transfer-Encoding: chunked` header. An instance can be passed
+    directly to `HTTPClient.post`
+
+    https://www.rfc-editor.org/rfc/rfc7578
+
+    :Example:
+        m = MultipartEncoder("form-data")
+        m.add_field("<NAME>", "<VALUE>")
+        m.add_file("<PATH>", name="<NAME>")
+
+        c = HTTPClient("http://example.com")
+        c.post("/upload", m)
+    """
+    chunk_size = 65536
+    """How many bytes of a file will be read at a time"""
+
+    @property
+    def headers(self) -> HTTPHeaders:
+        """Return the headers needed for the entire multipart body"""
+        headers = HTTPHeaders()
+        headers.add_header(
+            "Content-Type",
+            f"multipart/{self.subtype}",
+            boundary=self.boundary,
+        )
+
+        length = self.length
+        if length is None:
+            headers["Transfer-Encoding"] = "chunked"
+
+        else:
+            headers["Content-Length"] = length
+
+        return headers
+
+    @property
+    def length(self) -> int|None:
+        """Return the total size of the body in bytes, None if the size of
+        one of the parts isn't known"""
+        length = len(self.get_end_bytes())
+        for headerbytes, body, size in self.parts:
+            if size is None:
+                return None
+
+            length += len(headerbytes) + size + 2
+
+        return length
+
+    def __init__(
+        self,
+        subtype: str = "form-data",
+        *,
+        boundary: str|None = None,
+        chunk_size: int = 0,
+    ):
+        """
+        :param subtype: the `multipart/<SUBTYPE>`
+        :keyword boundary: if not passed in then a random boundary will be
+            created
+        :keyword chunk_size: see `.chunk_size`
+        """
+        self.subtype = subtype
+        self.boundary = boundary or "=" * 15 + secrets.token_hex(16)
+        self.encoding = environ.ENCODING
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+        # each part is a tuple of (headerbytes, body, size)
+        self.parts = []
+
+    def add_field(self, name: str, value):
+        """Add a form-data field with `name` and `value`, see
+        `Multipart.add_field`"""
+        self.add_part(
+            f"text/plain; charset=\"{self.encoding}\"",
+            String(value).encode(self.encoding),
+            {
+                "Content-Disposition": f"form-data; name=\"{name}\"",
+            },
+        )
+
+    def add_fields(self, fields: Mapping):
+        """Add a mapping of fields"""
+        for k, v in fields.items():
+            self.add_field(k, v)
+
+    def add_file(self, path: str|io.IOBase, *, name: str = ""):
+        """Add a file to the body, the file won't be read until the body is
+        iterated, see `Multipart.add_file`"""
+        if isinstance(path, io.IOBase):
+            basename = os.path.basename(getattr(path, "name", "") or "")
+            size = self.get_file_size(path)
+
+        else:
+            basename = os.path.basename(path)
+            size = os.path.getsize(path)
+
+        if name:
+            disposition = (
+                f"form-data; name=\"{name}\";"
+                f" filename=\"{basename}\""
+            )
+
+        else:
+            disposition = f"attachment; filename=\"{basename}\""
+
+        self._add_part(
+            Multipart.get_file_media_type(basename),
+            path,
+            size,
+            {"Content-Disposition": disposition},
+        )
+
+    def add_part(
+        self,
+        media_type: str,
+        body: bytes,
+        headers: Mapping|None = None,
+    ):
+        """Add any part to the body, see `Multipart.add_part`"""
+        body = ByteString(body, self.encoding)
+        self._add_part(media_type, bytes(body), len(body), headers or {})
+
+    def _add_part(self, media_type, body, size, headers):
+        """Internal method. Build the part's boundary and headers, these
+        are small so they are encoded up front"""
+        lines = [f"--{self.boundary}", f"Content-Type: {media_type}"]
+        for header_name, header_value in headers.items():
+            lines.append(f"{header_name}: {header_value}")
+
+        headerbytes = ("\r\n".join(lines) + "\r\n\r\n").encode(self.encoding)
+        self.parts.append((headerbytes, body, size))
+
+    def get_file_size(self, fp: io.IOBase) -> int|None:
+        """Internal method. Returns how many bytes are left to be read in
+        `fp`, None if that can't be found"""
+        try:
+            return os.fstat(fp.fileno()).st_size - fp.tell()
+
+        except (OSError, AttributeError, io.UnsupportedOperation):
+            if fp.seekable():
+                position = fp.tell()
+                size = fp.seek(0, os.SEEK_END) - position
+                fp.seek(position)
+                return size
+
+    def get_end_bytes(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode(self.encoding)
+
+    def iter_file(self, fp: io.IOBase) -> Generator[bytes]:
+        while chunk := fp.read(self.chunk_size):
+            if isinstance(chunk, str):
+                chunk = chunk.encode(self.encoding)
+
+            yield chunk
+
+    def __iter__(self) -> Generator[bytes]:
+        for headerbytes, body, size in self.parts:
+            yield headerbytes
+
+            if isinstance(body, bytes):
+                yield body
+
+            elif isinstance(body, io.IOBase):
+                # rewind so the body can be iterated more than once (eg, when
+                # the request is retried)
+                position = body.tell() if body.seekable() else None
+                yield from self.iter_file(body)
+                if position is not None:
+                    body.seek(position)
+
+            else:
+                with open(body, "rb") as fp:
+                    yield from self.iter_file(fp)
+
+            yield b"\r\n"
+
+        yield self.get_end_bytes()
+
+    def __bytes__(self) -> bytes:
+        return b"".join(self)
@@ -2,6 +2,8 @@
 import re
 from configparser import RawConfigParser
 import math
+import bisect
+import threading
 
 from .compat import *
 from .string import String
@@ -210,6 +212,143 @@ class Exponential(object):
         return ret
 
 
+class Histogram(object):
+    """Bucketed distribution of values (eg, request latencies in seconds)
+    that can answer count, mean, and percentile questions in constant memory
+
+    Each bucket holds how many values were less than or equal to its upper
+    bound, values bigger than the last bound go into an overflow bucket. The
+    default bounds grow exponentially from 0.5ms to around 2 minutes which is
+    a good fit for network and server latencies
+
+    https://prometheus.io/docs/practices/histograms/
+
+    :Example:
+        h = Histogram()
+        h.add(0.25)
+        h.add(1.5)
+        h.percentile(50) # 0.256
+    """
+    def __init__(self, bounds=None):
+        """
+        :param bounds: Sequence[int|float], the sorted upper bound of each
+            bucket
+        """
+        if bounds is None:
+            bounds = Exponential(0.0005, 1.0).growth(19)
+
+        self.bounds = list(bounds)
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Reset the histogram to no values"""
+        with self.lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = None
+
+    def add(self, value):
+        """Add value to the histogram
+
+        :param value: int|float
+        """
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+
+            if self.min is None or value < self.min:
+                self.min = value
+
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def mean(self):
+        """
+        :returns: float, the average of all the added values
+        """
+        return (self.total / self.count) if self.count else 0.0
+
+    def percentile(self, percent):
+        """Get the upper bound of the bucket that contains the value at
+        percent
+
+        :param percent: int|float, between 0 and 100 (eg, 99 for p99)
+        :returns: int|float, the value will never be more than the biggest
+            value that was added
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(self.count * (percent / 100)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+
+                break
+
+        return self.max
+
+    def buckets(self):
+        """Iterate the buckets
+
+        :returns: Generator[tuple[int|float, int]], the bucket upper bound
+            and how many values are in the bucket, the overflow bucket's bound
+            is infinity
+        """
+        bounds = self.bounds + [math.inf]
+        for bound, count in zip(bounds, self.counts):
+            yield bound, count
+
+    def update(self, other):
+        """Merge the values of other into this histogram
+
+        :param other: Histogram, must have the same bounds as this instance
+        """
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different bounds")
+
+        with self.lock:
+            for index, count in enumerate(other.counts):
+                self.counts[index] += count
+
+            self.count += other.count
+            self.total += other.total
+
+            if other.min is not None:
+                if self.min is None or other.min < self.min:
+                    self.min = other.min
+
+                if self.max is None or other.max > self.max:
+                    self.max = other.max
+
+    def as_dict(self):
+        """Summarize the histogram
+
+        :returns: dict[str, int|float]
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+    def __len__(self):
+        return self.count
+
+
 class BooleanMeta(type):
     """This class enables Boolean to quack like a boolean
 
@@ -5,7 +5,6 @@ import fnmatch
 import stat
 import codecs
 import shutil
-import hashlib
 from collections import deque, defaultdict
 import site
 import tempfile
@@ -21,6 +20,7 @@ import pickle
 from contextlib import contextmanager
 import errno
 import gzip
+import mmap
 #import zipfile
 #import tarfile
 
@@ -32,7 +32,7 @@ except ImportError:
 
 from .compat import *
 from .config.environ import environ
-from .string import String, ByteString
+from .string import String, ByteString, HashStream
 from .collections import ListIterator
 from .copy import Deepcopy
 from .http import HTTPClient
@@ -2103,6 +2103,29 @@ class Filepath(Path):
         kwargs.setdefault("errors", self.errors)
         return self.open(mode, **kwargs)
 
+    @contextmanager
+    def open_mmap(self):
+        """Memory map the file read only
+
+        The memory map can be handed to a tokenizer (eg, Scanner) which will
+        decode it a window at a time so the file is never read into memory
+        all at once
+
+        :Example:
+            with Filepath("<PATH>").open_mmap() as m:
+                scanner = Scanner(m)
+
+        :returns: mmap.mmap|bytes, an empty file can't be memory mapped so
+            empty bytes are returned for an empty file
+        """
+        with self.open("rb") as fp:
+            if self.empty():
+                yield b""
+
+            else:
+                with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    yield m
+
     def __call__(self, mode="", **kwargs):
         """Allow an easier interface for opening a writing file descriptor
 
@@ -2388,13 +2411,7 @@ class Filepath(Path):
 
     def checksum(self):
         """return md5 hash of a file"""
-        h = hashlib.md5()
-        blocksize = 65536
-        # http://stackoverflow.com/a/21565932/5006
-        with self.open(mode="rb") as fp:
-            for block in iter(lambda: fp.read(blocksize), b""):
-                h.update(block)
-        return h.hexdigest()
+        return HashStream(self).md5()
 
     def hash(self): return self.checksum()
     def md5(self): return self.checksum()
@@ -1,25 +1,38 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+import os
+import socket
+import datetime
+import email.utils
+import signal
+import time
 from wsgiref.simple_server import (
     WSGIServer as WSGIHTTPServer,
     WSGIRequestHandler,
 )
 import runpy
-from threading import Thread
+from threading import Thread, Event, Lock, current_thread, main_thread
+import queue
 import weakref
 from socketserver import ThreadingMixIn
 from types import NoneType
 import io
 import inspect
+import tempfile
+from http import HTTPStatus
 import asyncio
+import itertools
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 from .compat import *
 from .config.environ import environ
 from .url import Host, Url
 from .path import Dirpath
 from .decorators import property as cachedproperty
-from .http import Multipart
+from .http import HTTPHeaders, MultipartDecoder
+from .number import Histogram
 
 
 logger = logging.getLogger(__name__)
@@ -172,39 +185,53 @@ class BaseServer(HTTPServer):
 
     def get_body(self, handler):
         content_len = int(handler.headers.get('content-length', 0))
-        if body := handler.rfile.read(content_len):
-            ct = handler.headers.get("content-type", "")
+        ct = handler.headers.get("content-type", "")
+        if content_len and "multipart" in ct:
+            body = self.get_multipart_body(handler, content_len)
+
+        elif body := handler.rfile.read(content_len):
             if ct:
                 if "json" in ct:
                     body = json.loads(body)
 
-                elif "multipart" in ct:
-                    fs = []
-                    b = {}
-                    for p in Multipart.decode(handler.headers, body):
-                        if p.headers.is_json():
-                            b.update(json.loads(p.body))
+                else:
+                    body = Url.parse_query(body)
 
-                        elif p.headers.is_urlencoded():
-                            b.update(Url.parse_query(p.body))
+        else:
+            body = {}
 
-                        else:
-                            if field := p.get_field():
-                                b[field[0]] = field[1]
+        return body
 
-                            else:
-                                fs.append(p.get_file())
+    def get_multipart_body(self, handler, content_len):
+        """Decode the multipart body incrementally from the request stream
+        so big uploads are spooled to disk instead of held in memory
+
+        The decoder is set on the handler as `.multipart_decoder` so the
+        spooled files can be removed when the request is finished"""
+        fs = []
+        body = {}
+        parts = MultipartDecoder(
+            handler.headers,
+            handler.rfile,
+            length=content_len,
+        )
+        handler.multipart_decoder = parts
+        for p in parts:
+            if p.headers.is_json():
+                body.update(json.loads(p.body))
 
-                    body = b
+            elif p.headers.is_urlencoded():
+                body.update(Url.parse_query(p.body))
 
-                    if fs:
-                        body["_files"] = fs
+            else:
+                if field := p.get_field():
+                    body[field[0]] = field[1]
 
                 else:
-                    body = Url.parse_query(body)
+                    fs.append(p.get_file())
 
-        else:
-            body = {}
+        if fs:
+            body["_files"] = fs
 
         return body
 
@@ -237,6 +264,226 @@ class PathHandler(SimpleHTTPRequestHandler):
                 t += "; charset={}".format(self.encoding)
         return t
 
+    def send_head(self):
+        """Overrides parent to send files with ETag, Range, and precompressed
+        gzip support, directories and errors are still handled by the parent
+
+        https://github.com/python/cpython/blob/3.12/Lib/http/server.py
+        """
+        self.file_range = None
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            if parse.urlsplit(self.path).path.endswith("/"):
+                for index in ["index.html", "index.htm"]:
+                    index = os.path.join(path, index)
+                    if os.path.isfile(index):
+                        return self.send_file_head(index)
+
+        elif not path.endswith("/") and os.path.isfile(path):
+            return self.send_file_head(path)
+
+        return super().send_head()
+
+    def send_file_head(self, path):
+        """Send the headers for the file at path
+
+        :param path: str, the requested file, if the client accepts gzip and
+            there is a path.gz file then that file will be served instead
+        :returns: io.BufferedReader|None, the open file that should be sent,
+            None if there is no body to send
+        """
+        headers = HTTPHeaders(self.headers)
+        ctype = self.guess_type(path)
+        extra_headers = {}
+
+        gzpath = path + ".gz"
+        if os.path.isfile(gzpath):
+            extra_headers["Vary"] = "Accept-Encoding"
+            for name, params in headers.parse_weighted("Accept-Encoding"):
+                if name.lower() in ("gzip", "x-gzip") and params["q"] > 0:
+                    extra_headers["Content-Encoding"] = "gzip"
+                    path = gzpath
+                    break
+
+        try:
+            f = open(path, "rb")
+
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        try:
+            fs = os.fstat(f.fileno())
+            extra_headers["ETag"] = self.get_etag(fs)
+            extra_headers["Last-Modified"] = self.date_time_string(
+                fs.st_mtime
+            )
+
+            if self.is_not_modified(headers, extra_headers["ETag"], fs):
+                self.send_response(304)
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                f.close()
+                return None
+
+            try:
+                file_range = self.get_file_range(
+                    headers,
+                    extra_headers,
+                    fs,
+                )
+
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{fs.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                f.close()
+                return None
+
+            if file_range:
+                start, end = file_range
+                self.send_response(206)
+                self.send_header(
+                    "Content-Range",
+                    f"bytes {start}-{end}/{fs.st_size}",
+                )
+                self.file_range = (start, end - start + 1)
+
+            else:
+                self.send_response(200)
+                self.file_range = (0, fs.st_size)
+
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(self.file_range[1]))
+            self.send_header("Accept-Ranges", "bytes")
+            for name, value in extra_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return f
+
+        except:
+            f.close()
+            raise
+
+    def get_etag(self, fs):
+        """Generate a strong ETag from the file's identity, any change to the
+        file will change at least one of inode, size, or modified time
+
+        :param fs: os.stat_result
+        :returns: str
+        """
+        return '"{:x}-{:x}-{:x}"'.format(fs.st_ino, fs.st_size, fs.st_mtime_ns)
+
+    def is_not_modified(self, headers, etag, fs):
+        """Returns True if the client's cached copy of the file is still good
+
+        https://www.rfc-editor.org/rfc/rfc9110#name-if-none-match
+        https://www.rfc-editor.org/rfc/rfc9110#name-if-modified-since
+
+        :param headers: HTTPHeaders, the request headers
+        :param etag: str, the file's current ETag
+        :param fs: os.stat_result
+        :returns: bool
+        """
+        if inm := headers.get("If-None-Match", ""):
+            for tag in inm.split(","):
+                tag = tag.strip()
+                if tag == "*" or tag.removeprefix("W/") == etag:
+                    return True
+
+            return False
+
+        if ims := headers.get("If-Modified-Since", ""):
+            try:
+                ims = email.utils.parsedate_to_datetime(ims)
+
+            except (TypeError, IndexError, OverflowError, ValueError):
+                return False
+
+            if ims.tzinfo is None:
+                ims = ims.replace(tzinfo=datetime.timezone.utc)
+
+            return int(fs.st_mtime) <= ims.timestamp()
+
+        return False
+
+    def get_file_range(self, headers, extra_headers, fs):
+        """Parse the Range header, only a single bytes range is supported,
+        anything else will be ignored and the whole file will be sent
+
+        https://www.rfc-editor.org/rfc/rfc9110#name-range-requests
+
+        :param headers: HTTPHeaders, the request headers
+        :param extra_headers: dict[str, str], the ETag and Last-Modified
+            response headers, used to check If-Range
+        :param fs: os.stat_result
+        :returns: tuple[int, int]|None, the inclusive (start, end) of the
+            range or None if the whole file should be sent
+        :raises: ValueError, if the range can't be satisfied
+        """
+        rng = headers.get("Range", "")
+        if not rng.startswith("bytes=") or "," in rng:
+            return None
+
+        if if_range := headers.get("If-Range", ""):
+            if if_range not in (
+                extra_headers["ETag"],
+                extra_headers["Last-Modified"],
+            ):
+                return None
+
+        size = fs.st_size
+        start, _, end = rng[6:].strip().partition("-")
+        try:
+            start = int(start) if start else None
+            end = int(end) if end else None
+
+        except ValueError:
+            # an unparseable range is ignored
+            return None
+
+        if start is None:
+            # suffix range, the last N bytes of the file
+            if not end:
+                raise ValueError(rng)
+
+            start = max(0, size - end)
+            end = size - 1
+
+        elif end is None or end >= size:
+            end = size - 1
+
+        if start > end:
+            raise ValueError(rng)
+
+        return start, end
+
+    def copyfile(self, source, outputfile):
+        """Overrides parent to send files from the kernel with sendfile when
+        writing straight to a socket
+
+        https://docs.python.org/3/library/socket.html#socket.socket.sendfile
+        """
+        if not self.file_range:
+            return super().copyfile(source, outputfile)
+
+        offset, count = self.file_range
+        if isinstance(self.connection, socket.socket):
+            self.connection.sendfile(source, offset, count)
+
+        else:
+            source.seek(offset)
+            while count > 0:
+                chunk = source.read(min(count, 65536))
+                if not chunk:
+                    break
+
+                outputfile.write(chunk)
+                count -= len(chunk)
+
 
 class PathServer(BaseServer):
     """A server that serves files from a path
@@ -270,7 +517,187 @@ class PathServer(BaseServer):
         )
 
 
-class CallbackHandler(SimpleHTTPRequestHandler):
+class BodyReader(io.RawIOBase):
+    """Internal class. Reads at most the request body from the connection so
+    a handler can never read into the next request on a keep-alive
+    connection"""
+    def __init__(self, rfile, length):
+        """
+        :param rfile: io.BufferedReader, the connection
+        :param length: int, the Content-Length of the request
+        """
+        self.rfile = rfile
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.remaining <= 0:
+            return 0
+
+        data = self.rfile.read1(min(len(b), self.remaining))
+        n = len(data)
+        b[:n] = data
+        self.remaining = (self.remaining - n) if n else 0
+        return n
+
+    def discard(self, chunk_size=65536):
+        """Read and throw away whatever body the handler didn't read"""
+        while self.remaining > 0:
+            data = self.rfile.read(min(chunk_size, self.remaining))
+            self.remaining = (self.remaining - len(data)) if data else 0
+
+
+class KeepAliveMixin(object):
+    """Lets a http.server request handler keep the connection open between
+    requests (HTTP/1.1 persistent connections)
+
+    A response can only be followed by another request on the same
+    connection if the client can find the end of the response body, so if a
+    response is sent without a Content-Length or Transfer-Encoding header the
+    connection will be closed after it
+
+    https://www.rfc-editor.org/rfc/rfc9112#name-persistence
+    https://www.rfc-editor.org/rfc/rfc9112#name-message-body-length
+    """
+    protocol_version = "HTTP/1.1"
+
+    disable_nagle_algorithm = True
+    """The headers and body are written separately, so with Nagle's
+    algorithm every small response on a kept alive connection would wait
+    for the client's delayed ACK"""
+
+    keepalive_timeout = 5.0
+    """How many seconds to wait for the next request on an idle connection,
+    see `.is_keepalive_server`"""
+
+    max_discard_size = 1048576
+    """If more than this many bytes of a request body weren't read by the
+    handler the connection is closed instead of reading and throwing them
+    away"""
+
+    keepalive_waiting = False
+
+    body_reader = None
+
+    multipart_decoder = None
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        self.finish_body()
+        while not self.close_connection:
+            self.connection.settimeout(self.keepalive_timeout)
+            self.keepalive_waiting = True
+            self.handle_one_request()
+            self.finish_body()
+
+    def parse_request(self):
+        if self.keepalive_waiting:
+            # the next request has started so go back to the normal timeout
+            self.keepalive_waiting = False
+            self.connection.settimeout(self.timeout)
+
+        ret = super().parse_request()
+        if ret:
+            if not self.is_keepalive_server():
+                self.close_connection = True
+
+            if "Transfer-Encoding" in self.headers:
+                # there's no way to find the start of the next request
+                self.close_connection = True
+
+            try:
+                length = int(self.headers.get("Content-Length", 0) or 0)
+
+            except ValueError:
+                length = 0
+                self.close_connection = True
+
+            self.body_reader = BodyReader(self.rfile, length)
+            self.connection_rfile = self.rfile
+            self.rfile = io.BufferedReader(self.body_reader)
+
+        return ret
+
+    def finish_body(self):
+        """Internal method. Make sure the whole request body has been read
+        so the connection is at the start of the next request"""
+        self.close_files()
+
+        if body_reader := self.body_reader:
+            self.body_reader = None
+            self.rfile = self.connection_rfile
+
+            if not self.close_connection:
+                if body_reader.remaining > self.max_discard_size:
+                    self.close_connection = True
+
+                else:
+                    body_reader.discard()
+
+    def close_files(self):
+        """Internal method. Close the files of a multipart request body and
+        remove any of them that were spooled to disk"""
+        if decoder := self.multipart_decoder:
+            self.multipart_decoder = None
+            decoder.close()
+
+    def is_keepalive_server(self):
+        """Return True if the server can handle other connections while this
+        connection waits for its next request
+
+        A server that handles one connection at a time (eg, a plain
+        CallbackServer) would be blocked by one idle client, so its
+        connections are closed after every response
+
+        :returns: bool
+        """
+        return isinstance(
+            self.server,
+            (ThreadingMixIn, ThreadPoolMixin, AsyncMixin),
+        )
+
+    def send_response_only(self, code, message=None):
+        self.response_code = code
+        self.response_framed = False
+        self.response_chunked = False
+        self.response_connection = False
+        return super().send_response_only(code, message)
+
+    def send_header(self, keyword, value):
+        name = keyword.lower()
+        if name == "content-length":
+            self.response_framed = True
+
+        elif name == "transfer-encoding":
+            self.response_framed = True
+            self.response_chunked = "chunked" in value.lower()
+
+        elif name == "connection":
+            self.response_connection = True
+
+        return super().send_header(keyword, value)
+
+    def end_headers(self):
+        if self.response_code >= 200:
+            if (
+                not self.response_framed
+                and self.command != "HEAD"
+                and self.response_code not in (204, 304)
+            ):
+                # the client can only find the end of the body if we close
+                # the connection
+                self.close_connection = True
+
+            if self.close_connection and not self.response_connection:
+                self.send_header("Connection", "close")
+
+        return super().end_headers()
+
+
+class CallbackHandler(KeepAliveMixin, SimpleHTTPRequestHandler):
     """This is the handler that makes the CallbackServer work
 
     https://docs.python.org/3/library/http.server.html#http.server.BaseHTTPRequestHandler
@@ -326,6 +753,13 @@ class CallbackHandler(SimpleHTTPRequestHandler):
 
         super().__init__(*args, **kwargs)
 
+    def finish_body(self):
+        super().finish_body()
+        # a kept alive connection uses this handler for its next request
+        # so the cached values of this request can't be reused
+        self.__dict__.pop("_query", None)
+        self.__dict__.pop("_body", None)
+
     def do_HEAD(self):
         """Here because this exists on parent class and if it isn't overridden
         then all HEAD requests would ignore .callbacks
@@ -371,11 +805,7 @@ class CallbackHandler(SimpleHTTPRequestHandler):
                     "Handling %s with async callable",
                     self.command,
                 )
-                # the fact we have to bring up an entire async await loop and
-                # then tear it down each request when we have an async callable
-                # is wildly impractical but is the only way to support async
-                # callbacks right now
-                body = asyncio.run(callback(self))
+                body = self.run_async_callback(callback)
 
             else:
                 body = callback(self)
@@ -386,6 +816,18 @@ class CallbackHandler(SimpleHTTPRequestHandler):
         else:
             self.do_success(body)
 
+    def run_async_callback(self, callback):
+        """Run the async callback and return what it returns
+
+        :param callback: Callable[[CallbackHandler], Awaitable]
+        :returns: Any
+        """
+        # the fact we have to bring up an entire async await loop and
+        # then tear it down each request when we have an async callable
+        # is wildly impractical but is the only way to support async
+        # callbacks right now, see AsyncCallbackServer
+        return asyncio.run(callback(self))
+
     def do_success(self, body):
         """Called from `.do` on a successful request"""
         code = 200
@@ -405,6 +847,10 @@ class CallbackHandler(SimpleHTTPRequestHandler):
             body = body.read()
             ct = "application/octet-stream"
 
+        elif isinstance(body, Iterator):
+            self.do_stream(body)
+            return
+
         else:
             body = bytes(json.dumps(body), self.encoding)
             ct = "application/json"
@@ -414,11 +860,74 @@ class CallbackHandler(SimpleHTTPRequestHandler):
             self.send_response(code)
             if ct:
                 self.send_header("Content-Type", ct)
+
+            if body is not None:
+                self.send_header("Content-Length", len(body))
+
             self.end_headers()
 
-        if body is not None:
+        if body is not None and self.command != "HEAD":
             self.wfile.write(body)
 
+    def do_stream(self, body):
+        """Called from `.do_success` when the callback returned a generator
+        or iterator, each chunk is written to the client as it is produced
+
+        If the callback didn't send its own headers the response will use
+        chunked transfer encoding so the connection can be kept open. A
+        callback that wants to do server-sent events could look like:
+
+            def do_GET(handler):
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/event-stream")
+                handler.send_header("Transfer-Encoding", "chunked")
+                handler.end_headers()
+                for i in range(10):
+                    yield f"data: {i}\\n\\n"
+
+        https://www.rfc-editor.org/rfc/rfc9112#name-chunked-transfer-coding
+        https://html.spec.whatwg.org/multipage/server-sent-events.html
+
+        :param body: Iterator[str|bytes]
+        """
+        # a generator callback doesn't run until the first chunk is asked for
+        # so get it now in case the callback sends its own headers
+        try:
+            body = itertools.chain([next(body)], body)
+
+        except StopIteration:
+            body = []
+
+        except Exception as e:
+            self.do_error(e)
+            return
+
+        if not self.headers_sent:
+            self.code = 200
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            if self.request_version != "HTTP/1.0":
+                self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        if self.command == "HEAD":
+            return
+
+        chunked = self.response_chunked
+        for chunk in body:
+            if not isinstance(chunk, bytes):
+                chunk = bytes(str(chunk), self.encoding)
+
+            if chunk:
+                if chunked:
+                    chunk = b"%X\r\n%s\r\n" % (len(chunk), chunk)
+
+                self.wfile.write(chunk)
+                self.wfile.flush()
+
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+
     def do_error(self, e):
         """Called from `.do` on an unsuccessful request"""
         if not self.headers_sent:
@@ -640,3 +1149,1041 @@ class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
     """
     pass
 
+
+
+class ThreadPoolMixin(object):
+    """Handle requests with a fixed number of worker threads pulling
+    connections off of a bounded queue
+
+    ThreadingMixIn starts a new thread for every connection, so a burst of
+    traffic turns into thousands of threads. With this mixin at most
+    `workers` requests are handled at the same time and at most `queue_size`
+    accepted connections wait for a worker. When the queue is full the
+    overload policy decides what happens: "block" stops accepting new
+    connections until there is room (they wait in the kernel's listen
+    backlog) and "reject" answers the new connection with a 503
+
+    Rejected connections are answered by their own thread so a burst of
+    rejections never slows down accepting connections
+
+    The server keeps metrics about itself, see `.get_stats`
+    """
+    reject_queue_size = 128
+    """How many rejected connections can wait for their 503, if more than
+    this many are waiting the connection is just closed"""
+
+    def __init__(
+        self,
+        *args,
+        workers=8,
+        queue_size=64,
+        overload="block",
+        **kwargs,
+    ):
+        """
+        :keyword workers: int, how many threads handle requests
+        :keyword queue_size: int, how many accepted connections can wait for
+            a worker
+        :keyword overload: str, either "block" or "reject"
+        """
+        if overload not in ("block", "reject"):
+            raise ValueError(f"Unknown overload policy {overload}")
+
+        self.workers = workers
+        self.overload = overload
+        self.request_queue = queue.Queue(maxsize=queue_size)
+        self.reject_queue = queue.Queue(maxsize=self.reject_queue_size)
+        self.worker_threads = []
+        self.pool_shutdown_request = False
+        self.active_workers = 0
+        self.rejected = 0
+        self.stats_lock = Lock()
+
+        # how long a connection waited in the queue and how long it took to
+        # handle it, in seconds
+        self.wait_times = Histogram()
+        self.latencies = Histogram()
+
+        super().__init__(*args, **kwargs)
+
+    @property
+    def queue_depth(self):
+        """How many accepted connections are waiting for a worker"""
+        return self.request_queue.qsize()
+
+    def get_stats(self):
+        """
+        :returns: dict[str, Any]
+        """
+        return {
+            "workers": self.workers,
+            "active_workers": self.active_workers,
+            "queue_depth": self.queue_depth,
+            "queue_size": self.request_queue.maxsize,
+            "rejected": self.rejected,
+            "wait_times": self.wait_times.as_dict(),
+            "latencies": self.latencies.as_dict(),
+        }
+
+    def start_workers(self):
+        """Internal method. Start the worker threads if they aren't running,
+        the last thread answers rejected connections"""
+        if not self.worker_threads:
+            for i in range(self.workers):
+                t = Thread(
+                    target=self.process_request_worker,
+                    name=f"{type(self).__name__}-{i}",
+                )
+                t.daemon = True
+                t.start()
+                self.worker_threads.append(t)
+
+            t = Thread(
+                target=self.reject_request_worker,
+                name=f"{type(self).__name__}-reject",
+            )
+            t.daemon = True
+            t.start()
+            self.reject_thread = t
+
+    def serve_forever(self, poll_interval=0.5):
+        try:
+            super().serve_forever(poll_interval)
+
+        finally:
+            self.pool_shutdown_request = False
+
+    def shutdown(self):
+        # a full queue in "block" mode would otherwise keep serve_forever
+        # from ever noticing it should stop
+        self.pool_shutdown_request = True
+        super().shutdown()
+
+    def process_request(self, request, client_address):
+        """Queue the request for a worker"""
+        self.start_workers()
+        item = (request, client_address, time.monotonic())
+
+        if self.overload == "block":
+            while True:
+                try:
+                    self.request_queue.put(item, timeout=0.1)
+                    break
+
+                except queue.Full:
+                    if self.pool_shutdown_request:
+                        self.shutdown_request(request)
+                        break
+
+        else:
+            try:
+                self.request_queue.put_nowait(item)
+
+            except queue.Full:
+                with self.stats_lock:
+                    self.rejected += 1
+
+                try:
+                    self.reject_queue.put_nowait((request, client_address))
+
+                except queue.Full:
+                    self.shutdown_request(request)
+
+    def reject_request_worker(self):
+        """Internal method. The thread loop that answers rejected
+        connections"""
+        while True:
+            item = self.reject_queue.get()
+            if item is None:
+                break
+
+            self.reject_request(*item)
+
+    def reject_request(self, request, client_address):
+        """Internal method. Answer request with a 503 without handling it"""
+        try:
+            # read what the client sent so closing the socket doesn't reset
+            # the connection before the client reads the response
+            request.settimeout(0.1)
+            request.recv(65536)
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Retry-After: 1\r\n"
+                b"Content-Length: 0\r\n"
+                b"Connection: close\r\n"
+                b"\r\n"
+            )
+
+        except OSError:
+            pass
+
+        finally:
+            self.shutdown_request(request)
+
+    def process_request_worker(self):
+        """Internal method. The worker thread loop"""
+        while True:
+            item = self.request_queue.get()
+            if item is None:
+                break
+
+            request, client_address, queued = item
+            start = time.monotonic()
+            self.wait_times.add(start - queued)
+            with self.stats_lock:
+                self.active_workers += 1
+
+            try:
+                self.finish_request(request, client_address)
+
+            except Exception:
+                self.handle_error(request, client_address)
+
+            finally:
+                self.latencies.add(time.monotonic() - start)
+                with self.stats_lock:
+                    self.active_workers -= 1
+
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        if self.worker_threads:
+            for _ in self.worker_threads:
+                self.request_queue.put(None)
+
+            self.reject_queue.put(None)
+            for t in self.worker_threads + [self.reject_thread]:
+                t.join()
+
+            self.worker_threads = []
+
+
+class ThreadPoolWSGIServer(ThreadPoolMixin, WSGIServer):
+    """A multithreaded WSGIServer with a fixed size thread pool and a
+    bounded queue
+
+    :Example:
+        s = ServerThread(ThreadPoolWSGIServer(
+            wsgipath="/path/to/wsgi.py",
+            workers=16,
+            queue_size=128,
+            overload="reject",
+        ))
+    """
+    pass
+
+
+class PreforkMixin(object):
+    """Serve a BaseServer child from a pool of forked worker processes
+
+    The parent process binds the socket, forks the workers, and then
+    supervises them, restarting any worker that dies until `.shutdown` is
+    called, at which point every worker gets a SIGTERM and finishes the
+    request it is handling before exiting
+
+    Because each worker has its own interpreter CPU bound requests aren't
+    serialized by the GIL so throughput scales with the number of cores
+
+    By default every worker accepts connections from the one listening socket
+    they all inherit from the parent, with `reuse_port=True` each worker gets
+    its own socket bound with SO_REUSEPORT and the kernel balances new
+    connections across them
+
+    A worker that exits soon after it was started is restarted after a
+    delay that doubles with every quick exit, so a worker that crashes on
+    startup doesn't get forked over and over in a tight loop
+
+    Forking a process that has other threads running isn't safe, so the
+    server should be ran from the main thread of a process that has no other
+    threads (ie, ServerThread, which runs the server in a thread of the
+    current process, should only be used for development)
+
+    https://docs.python.org/3/library/os.html#os.fork
+    https://lwn.net/Articles/542629/
+    """
+    restart_delay = 0.1
+    """How many seconds to wait before restarting a worker that exited
+    within `.restart_window` seconds of being started, this doubles with
+    every quick exit"""
+
+    max_restart_delay = 30.0
+    """The most seconds a worker restart will be delayed"""
+
+    restart_window = 5.0
+    """A worker that ran at least this many seconds is restarted right away
+    and its restart delay is reset"""
+
+    def __init__(
+        self,
+        *args,
+        processes=0,
+        reuse_port=False,
+        graceful_timeout=10.0,
+        **kwargs,
+    ):
+        """
+        :keyword processes: int, how many worker processes, defaults to the
+            number of cpus
+        :keyword reuse_port: bool, True if each worker should bind its own
+            socket using SO_REUSEPORT
+        :keyword graceful_timeout: float, how many seconds to wait for
+            workers to finish their requests on shutdown before they are
+            killed
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.reuse_port = reuse_port and hasattr(socket, "SO_REUSEPORT")
+        self.allow_reuse_port = self.reuse_port
+        self.graceful_timeout = graceful_timeout
+
+        # pid -> worker index
+        self.workers = {}
+        # worker index -> (started, restart delay)
+        self.worker_starts = {}
+        # worker index -> when it should be restarted
+        self.worker_restarts = {}
+        self.worker_stopping = False
+        self.prefork_shutdown_request = False
+        self.prefork_shutdown_event = Event()
+        self.prefork_is_shut_down = Event()
+        super().__init__(*args, **kwargs)
+
+    def server_activate(self):
+        self.worker_sockets = []
+        if self.reuse_port:
+            # the parent's socket only reserves the port, it can't listen or
+            # it would get connections that nothing accepts. The worker
+            # sockets are bound here so the server is ready for connections
+            # as soon as it is created, and a restarted worker picks up the
+            # socket (and any connections waiting on it) of the worker it
+            # replaces
+            for _ in range(self.processes):
+                sock = socket.socket(self.address_family, self.socket_type)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                sock.bind(self.server_address)
+                sock.listen(self.request_queue_size)
+                self.worker_sockets.append(sock)
+
+        else:
+            super().server_activate()
+
+    def server_close(self):
+        super().server_close()
+        for sock in self.worker_sockets:
+            sock.close()
+
+    def serve_forever(self, poll_interval=0.5):
+        self.prefork_is_shut_down.clear()
+        self.prefork_shutdown_event.clear()
+
+        handlers = {}
+        if current_thread() is main_thread():
+            for signum in [signal.SIGTERM, signal.SIGINT]:
+                handlers[signum] = signal.signal(
+                    signum,
+                    self.handle_shutdown_signal,
+                )
+
+        try:
+            for index in range(self.processes):
+                self.spawn_worker(index)
+
+            while not self.prefork_shutdown_request:
+                self.reap_workers(restart=True)
+                timeout = poll_interval
+                if self.worker_restarts:
+                    timeout = min(
+                        timeout,
+                        max(
+                            0.0,
+                            min(self.worker_restarts.values())
+                            - time.monotonic()
+                        ),
+                    )
+
+                self.prefork_shutdown_event.wait(timeout)
+
+        finally:
+            self.stop_workers()
+            self.worker_starts = {}
+            self.worker_restarts = {}
+            self.prefork_shutdown_request = False
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+            self.prefork_is_shut_down.set()
+
+    def handle_shutdown_signal(self, signum, frame):
+        self.prefork_shutdown_request = True
+        self.prefork_shutdown_event.set()
+
+    def shutdown(self):
+        self.prefork_shutdown_request = True
+        self.prefork_shutdown_event.set()
+        self.prefork_is_shut_down.wait()
+
+    def spawn_worker(self, index):
+        """Fork a new worker process
+
+        :param index: int, the worker's position in the pool
+        :returns: int, the worker's pid
+        """
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = index
+            _, delay = self.worker_starts.get(index, (0.0, 0.0))
+            self.worker_starts[index] = (time.monotonic(), delay)
+            return pid
+
+        # the worker must never return into the parent's code
+        code = 1
+        try:
+            self.serve_worker(index)
+            code = 0
+
+        except BaseException:
+            logger.exception("Worker %s failed", index)
+
+        finally:
+            os._exit(code)
+
+    def serve_worker(self, index, poll_interval=0.5):
+        """Internal method. Runs in the worker process and handles requests
+        until the worker gets a SIGTERM"""
+        self.workers = {}
+        self.worker_stopping = False
+
+        signal.signal(signal.SIGTERM, self.handle_worker_signal)
+        # the parent handles ctrl-c and tells the workers to stop
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        if self.worker_sockets:
+            self.socket.close()
+            for i, sock in enumerate(self.worker_sockets):
+                if i == index:
+                    self.socket = sock
+
+                else:
+                    sock.close()
+
+        else:
+            # every worker waiting on the shared socket wakes up when a
+            # connection arrives but only one of them gets it, the others
+            # would block in accept() and not notice they were told to stop.
+            # With a non-blocking socket their accept() raises BlockingIOError
+            # which .handle_request treats like any other failed accept and
+            # they go back to waiting
+            self.socket.setblocking(False)
+
+        # .handle_request will wait at most this long for a connection so
+        # the worker will notice it has been told to stop
+        self.timeout = poll_interval
+        while not self.worker_stopping:
+            self.handle_request()
+
+    def handle_worker_signal(self, signum, frame):
+        self.worker_stopping = True
+
+    def reap_workers(self, restart=False):
+        """Internal method. Clean up workers that have exited
+
+        :param restart: bool, True if a replacement should be forked for each
+            worker that exited, see `.restart_delay`
+        :returns: int, how many workers are still running
+        """
+        now = time.monotonic()
+        for pid, index in list(self.workers.items()):
+            try:
+                wpid, status = os.waitpid(pid, os.WNOHANG)
+
+            except ChildProcessError:
+                wpid, status = pid, 0
+
+            if wpid:
+                self.workers.pop(pid)
+                if restart:
+                    started, delay = self.worker_starts.get(index, (now, 0.0))
+                    if now - started < self.restart_window:
+                        delay = min(
+                            delay * 2 if delay else self.restart_delay,
+                            self.max_restart_delay,
+                        )
+
+                    else:
+                        delay = 0.0
+
+                    self.worker_starts[index] = (started, delay)
+                    self.worker_restarts[index] = now + delay
+                    logger.warning(
+                        "Worker %s (pid %s) exited with %s, restarting in %ss",
+                        index,
+                        pid,
+                        os.waitstatus_to_exitcode(status),
+                        delay,
+                    )
+
+        if restart:
+            for index, when in list(self.worker_restarts.items()):
+                if when <= now:
+                    self.worker_restarts.pop(index)
+                    self.spawn_worker(index)
+
+        return len(self.workers)
+
+    def stop_workers(self):
+        """Internal method. SIGTERM all the workers and wait for them to
+        finish, any worker still running after `.graceful_timeout` is
+        killed"""
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+
+            except ProcessLookupError:
+                pass
+
+        stop = time.monotonic() + self.graceful_timeout
+        while self.reap_workers() and time.monotonic() < stop:
+            time.sleep(0.05)
+
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+        self.workers = {}
+
+
+class PreforkWSGIServer(PreforkMixin, WSGIServer):
+    """A WSGIServer that handles requests in multiple processes
+
+    The application is loaded once in the parent and then inherited by every
+    worker
+
+    :Example:
+        s = ServerThread(PreforkWSGIServer(
+            wsgipath="/path/to/wsgi.py",
+            processes=4,
+        ))
+        with s:
+            requests.get(s)
+    """
+    pass
+
+
+class AsyncReader(io.RawIOBase):
+    """Internal class. A sync file-like object over a request whose head was
+    already read by the event loop and whose body is still waiting on the
+    connection
+
+    This is what request handlers running in an executor thread read the
+    request from, it will never read past the request body so the next
+    request on a keep-alive connection is left on the stream
+    """
+    def __init__(self, head, reader, length, loop, body=None):
+        """
+        :param head: bytes, the request line and headers
+        :param reader: asyncio.StreamReader, the connection
+        :param length: int, how many body bytes are on the connection
+        :param loop: asyncio.AbstractEventLoop, the loop reader belongs to
+        :param body: io.IOBase, a body that was already read off of the
+            connection (eg, a decoded chunked body), it is read after head
+        """
+        self.head = memoryview(head)
+        self.reader = reader
+        self.remaining = length
+        self.loop = loop
+        self.body = body
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.head:
+            n = min(len(b), len(self.head))
+            b[:n] = self.head[:n]
+            self.head = self.head[n:]
+            return n
+
+        if self.body:
+            return self.body.readinto(b)
+
+        if self.remaining <= 0:
+            return 0
+
+        data = asyncio.run_coroutine_threadsafe(
+            self.reader.read(min(len(b), self.remaining)),
+            self.loop,
+        ).result()
+
+        n = len(data)
+        b[:n] = data
+        self.remaining = (self.remaining - n) if n else 0
+        return n
+
+    async def discard(self, chunk_size=65536):
+        """Read and throw away whatever body the handler didn't read"""
+        while self.remaining > 0:
+            data = await self.reader.read(min(chunk_size, self.remaining))
+            self.remaining = (self.remaining - len(data)) if data else 0
+
+    def close(self):
+        if self.body:
+            self.body.close()
+
+        super().close()
+
+
+class AsyncWriter(io.RawIOBase):
+    """Internal class. A sync file-like object that writes to an asyncio
+    connection from an executor thread, waiting for the transport to drain
+    so a slow client can't make the server buffer the whole response"""
+    def __init__(self, writer, loop):
+        """
+        :param writer: asyncio.StreamWriter, the connection
+        :param loop: asyncio.AbstractEventLoop, the loop writer belongs to
+        """
+        self.writer = writer
+        self.loop = loop
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        data = bytes(b)
+        asyncio.run_coroutine_threadsafe(
+            self.write_async(data),
+            self.loop,
+        ).result()
+        return len(data)
+
+    async def write_async(self, data):
+        self.writer.write(data)
+        await self.writer.drain()
+
+
+class AsyncConnection(object):
+    """Internal class. This is passed to request handlers in place of the
+    client socket, see AsyncHandlerMixin"""
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+        # the handler will set this when it finishes the request
+        self.close_connection = True
+
+
+class AsyncHandlerMixin(KeepAliveMixin):
+    """Lets a http.server request handler be ran by an AsyncMixin server
+
+    The handler will handle exactly one request read from an AsyncConnection
+    and then tell the server if the connection should be kept alive
+    """
+
+    @cachedproperty(cached="_scope")
+    def scope(self):
+        """The request as an ASGI http connection scope
+
+        https://asgi.readthedocs.io/en/latest/specs/www.html#http-connection-scope
+
+        :returns: dict[str, Any]
+        """
+        path, _, query = self.path.partition("?")
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.4"},
+            "http_version": self.request_version.partition("/")[2],
+            "method": self.command,
+            "scheme": "http",
+            "path": parse.unquote(path),
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": list(HTTPHeaders(self.headers).asgi()),
+            "client": self.client_address,
+            "server": self.server.server_address[:2],
+        }
+
+    def setup(self):
+        self.connection = self.request
+        self.rfile = io.BufferedReader(self.request.rfile)
+        self.wfile = self.request.wfile
+        self.close_connection = True
+
+    def handle(self):
+        # the server owns the connection loop so idle connections don't tie
+        # up a thread
+        self.handle_one_request()
+
+    def finish(self):
+        self.close_files()
+        self.request.close_connection = self.close_connection
+
+    def run_async_callback(self, callback):
+        """Async callbacks are ran on the event loop of the executor thread
+        handling the request, they can't be ran on the server's event loop
+        because reading the body and writing the response wait on it"""
+        return self.server.get_async_runner().run(callback(self))
+
+
+class AsyncMixin(object):
+    """Serve a BaseServer child from an asyncio event loop
+
+    Connections are handled by the event loop, and each request, once its
+    head has arrived, is handed to the server's request handler running in a
+    thread pool, so thousands of idle keep-alive connections only cost a few
+    buffers each and a slow request only ties up one worker
+
+    This works with ServerThread just like the other servers, but
+    `.handle_request` and `.serve_count` aren't supported
+
+    https://docs.python.org/3/library/asyncio-stream.html#asyncio.start_server
+    """
+    request_queue_size = 1024
+    """The listen backlog, TCPServer's default of 5 is way too small for
+    a lot of concurrent connections"""
+
+    keepalive_timeout = 60.0
+    """How many seconds an idle connection is kept open"""
+
+    max_header_size = 65536
+    """The biggest request head (request line and headers) that will be read,
+    bigger requests have their connection closed"""
+
+    max_body_size = None
+    """If set, requests with a bigger body get a 413 response"""
+
+    spool_size = 1048576
+    """A chunked request body is decoded before the handler runs, if it is
+    bigger than this it is moved from memory to a temp file"""
+
+    def __init__(self, *args, max_workers=None, **kwargs):
+        """
+        :keyword max_workers: int, how many threads can handle requests at
+            the same time, defaults to ThreadPoolExecutor's default
+        """
+        self.max_workers = max_workers
+        self.loop = None
+        self.runners = {}
+        self.runners_lock = Lock()
+        self.connections = set()
+        self.async_shutdown_request = False
+        self.async_is_shut_down = Event()
+        super().__init__(*args, **kwargs)
+
+    def serve_forever(self, poll_interval=0.5):
+        self.async_is_shut_down.clear()
+        try:
+            asyncio.run(self.serve_async(poll_interval))
+
+        finally:
+            self.async_shutdown_request = False
+            self.async_is_shut_down.set()
+
+    async def serve_async(self, poll_interval=0.5):
+        """Serve until `.shutdown` is called"""
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=type(self).__name__,
+        )
+        self.shutdown_event = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+        # asyncio will close the socket it serves from when it's done, we
+        # want to keep the original open so the server can be restarted
+        server = await asyncio.start_server(
+            self.handle_connection,
+            sock=self.socket.dup(),
+            limit=self.max_header_size,
+        )
+
+        try:
+            while not self.async_shutdown_request:
+                try:
+                    await asyncio.wait_for(
+                        self.shutdown_event.wait(),
+                        poll_interval,
+                    )
+
+                except TimeoutError:
+                    pass
+
+        finally:
+            self.loop = None
+            server.close()
+            for writer in list(self.connections):
+                writer.close()
+
+            await asyncio.to_thread(self.shutdown_executor)
+
+    def shutdown_executor(self):
+        """Internal method. Wait for the running requests to finish and then
+        close the event loops of the executor threads"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.runners_lock:
+            runners = self.runners
+            self.runners = {}
+
+        for runner in runners.values():
+            runner.close()
+
+    def get_async_runner(self):
+        """Internal method. Return the runner of the current executor thread,
+        each thread gets its own event loop that is reused for every async
+        callback it runs instead of bringing one up for every request
+
+        https://docs.python.org/3/library/asyncio-runner.html#asyncio.Runner
+
+        :returns: asyncio.Runner
+        """
+        thread = current_thread()
+        with self.runners_lock:
+            if thread not in self.runners:
+                self.runners[thread] = asyncio.Runner()
+
+            return self.runners[thread]
+
+    def shutdown(self):
+        self.async_shutdown_request = True
+        if loop := self.loop:
+            try:
+                loop.call_soon_threadsafe(self.shutdown_event.set)
+
+            except RuntimeError:
+                # loop is already closed
+                pass
+
+        self.async_is_shut_down.wait()
+
+    async def handle_connection(self, reader, writer):
+        """Internal method. Read requests off of the connection until the
+        client or a handler closes it"""
+        self.connections.add(writer)
+        client_address = writer.get_extra_info("peername")
+
+        # asyncio only sets this when the socket's proto is IPPROTO_TCP, and
+        # sockets accepted from TCPServer's socket have proto 0. Headers and
+        # body are written separately so without this every small response
+        # waits on the client's delayed ACK
+        try:
+            writer.get_extra_info("socket").setsockopt(
+                socket.IPPROTO_TCP,
+                socket.TCP_NODELAY,
+                1,
+            )
+
+        except (AttributeError, OSError):
+            pass
+
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"),
+                        self.keepalive_timeout,
+                    )
+
+                except (
+                    TimeoutError,
+                    asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError,
+                    ConnectionError,
+                ):
+                    break
+
+                try:
+                    rfile = await self.get_async_reader(head, reader)
+
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self.send_async_error(writer, 400)
+                    break
+
+                except OverflowError:
+                    await self.send_async_error(writer, 413)
+                    break
+
+                connection = AsyncConnection(
+                    rfile,
+                    AsyncWriter(writer, self.loop),
+                )
+                await self.loop.run_in_executor(
+                    self.executor,
+                    self.process_async_request,
+                    connection,
+                    client_address,
+                )
+
+                rfile.close()
+                if connection.close_connection or writer.is_closing():
+                    break
+
+                await rfile.discard()
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    async def get_async_reader(self, head, reader):
+        """Internal method. Figure out how long the request body is
+
+        A chunked body is decoded here into a spooled temp file and the head
+        is rewritten to have a Content-Length so the handler and `.get_body`
+        can read it like any other body
+
+        :param head: bytes, the request line and headers
+        :param reader: asyncio.StreamReader
+        :returns: AsyncReader
+        :raises: ValueError if the body's length is malformed, OverflowError
+            if the body is bigger than `.max_body_size`
+        """
+        headers = HTTPHeaders()
+        lines = head[:-4].split(b"\r\n")
+        for line in lines[1:]:
+            name, sep, value = line.partition(b":")
+            if sep:
+                headers.add_header(
+                    name.decode("iso-8859-1").strip(),
+                    value.decode("iso-8859-1").strip(),
+                )
+
+        if headers.is_chunked():
+            body = await self.get_async_chunked_body(reader)
+            lines = [
+                line for line in lines
+                if not line.lower().startswith(b"transfer-encoding:")
+            ]
+            lines.append(b"Content-Length: %d" % body.tell())
+            body.seek(0)
+            head = b"\r\n".join(lines) + b"\r\n\r\n"
+            return AsyncReader(head, reader, 0, self.loop, body=body)
+
+        length = int(headers.get("Content-Length", 0) or 0)
+        if length < 0:
+            raise ValueError(f"Invalid Content-Length: {length}")
+
+        if self.max_body_size is not None and length > self.max_body_size:
+            raise OverflowError(f"Content-Length {length} is too big")
+
+        return AsyncReader(head, reader, length, self.loop)
+
+    async def get_async_chunked_body(self, reader, chunk_size=65536):
+        """Internal method. Decode a chunked request body
+
+        https://www.rfc-editor.org/rfc/rfc9112#name-chunked-transfer-coding
+
+        :param reader: asyncio.StreamReader, the connection positioned at
+            the first chunk
+        :returns: tempfile.SpooledTemporaryFile, positioned at the end of
+            the decoded body
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        try:
+            length = 0
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                size = int(line.partition(b";")[0].strip(), 16)
+                if size < 0:
+                    raise ValueError(f"Invalid chunk size: {size}")
+
+                if not size:
+                    # ignore any trailer fields
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+
+                length += size
+                if (
+                    self.max_body_size is not None
+                    and length > self.max_body_size
+                ):
+                    raise OverflowError("Chunked body is too big")
+
+                while size:
+                    data = await reader.read(min(size, chunk_size))
+                    if not data:
+                        raise asyncio.IncompleteReadError(b"", size)
+
+                    body.write(data)
+                    size -= len(data)
+
+                if await reader.readexactly(2) != b"\r\n":
+                    raise ValueError("Chunk is missing its CRLF")
+
+        except BaseException:
+            body.close()
+            raise
+
+        return body
+
+    async def send_async_error(self, writer, code):
+        """Internal method. Send a bodyless error response before the
+        connection is closed, this is for requests that can't be handed to
+        the request handler"""
+        status = HTTPStatus(code)
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Length: 0\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+            ).encode("iso-8859-1")
+        )
+        try:
+            await writer.drain()
+
+        except ConnectionError:
+            pass
+
+    def process_async_request(self, connection, client_address):
+        """Internal method. Runs in an executor thread and handles one
+        request with the server's request handler"""
+        try:
+            self.finish_request(connection, client_address)
+
+        except Exception:
+            connection.close_connection = True
+            self.handle_error(connection, client_address)
+
+
+class AsyncPathHandler(AsyncHandlerMixin, PathHandler):
+    pass
+
+
+class AsyncPathServer(AsyncMixin, PathServer):
+    """A PathServer that runs on an asyncio event loop and supports
+    keep-alive connections
+
+    :Example:
+        s = ServerThread(AsyncPathServer("/some/path"))
+        with s:
+            requests.get(s.child("foo.txt"))
+    """
+    handler_class = AsyncPathHandler
+
+
+class AsyncCallbackHandler(AsyncHandlerMixin, CallbackHandler):
+    pass
+
+
+class AsyncCallbackServer(AsyncMixin, CallbackServer):
+    """A CallbackServer that runs on an asyncio event loop and supports
+    keep-alive connections
+
+    Callbacks are ran in a thread pool, async callbacks are ran on an event
+    loop owned by the thread running them. Besides everything CallbackHandler
+    has, the handler passed to the callbacks also has a `.scope` property
+    that contains the request as an ASGI scope
+
+    :Example:
+        async def do_GET(handler):
+            return handler.scope["path"]
+
+        s = ServerThread(AsyncCallbackServer({"GET": do_GET}))
+    """
+    handler_class = AsyncCallbackHandler
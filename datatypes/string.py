@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import base64
 import hashlib
+import hmac
+import io
+import itertools
 import re
 import string
 import binascii
@@ -9,6 +12,14 @@ import secrets
 import textwrap
 import uuid
 import enum
+import functools
+import bisect
+import os
+import time
+import weakref
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 from .compat import *
 from .config.environ import environ
@@ -112,6 +123,22 @@ class ByteString(Bytes, StringMixin):
         """because sometimes you need a vanilla bytes()"""
         return b"" + self
 
+    def chunk_views(self, chunk_size):
+        """Like .chunk() but each chunk is a memoryview into this byte string
+        instead of a copy
+
+        :param chunk_size: int, the size of the chunk
+        :returns: generator[memoryview], yields chunks of the byte string
+            until the end
+        """
+        view = memoryview(self)
+        if chunk_size:
+            for start in range(0, len(view), chunk_size):
+                yield view[start:start + chunk_size]
+
+        else:
+            yield view
+
     def md5(self):
         """32 character md5 hash of string"""
         # http://stackoverflow.com/a/5297483/5006
@@ -122,6 +149,129 @@ class ByteString(Bytes, StringMixin):
         return hashlib.sha256(self).hexdigest()
 
 
+@functools.cache
+def get_width_tables():
+    """Internal function. Build the zero width and wide codepoint range tables
+    the first time they are needed, this uses unicodedata so the tables
+    always match the unicode version of the running python
+
+    A codepoint is zero width if it is a control, format (except the soft
+    hyphen), or combining character, a hangul medial vowel or final
+    consonant, or an emoji skin tone modifier (these always modify the
+    previous emoji). A codepoint is wide if its east asian width is W or F
+
+    https://www.unicode.org/reports/tr11/
+    https://www.cl.cam.ac.uk/~mgk25/ucs/wcwidth.c
+
+    :returns: dict[str, Any], "zero" and "wide" are sorted lists of
+        inclusive (start, stop) codepoint ranges, "zero_starts" and
+        "wide_starts" are the range starts for bisect, and the compiled
+        regexes used by String.display_width and String.graphemes
+    """
+    def is_zero(cp, ch):
+        if 0x1160 <= cp <= 0x11FF or 0x1F3FB <= cp <= 0x1F3FF:
+            return True
+
+        if cp == 0xAD:
+            return False
+
+        return unicodedata.category(ch) in ("Cc", "Cf", "Mn", "Me")
+
+    def add(ranges, cp):
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1][1] = cp
+
+        else:
+            ranges.append([cp, cp])
+
+    zero = []
+    wide = []
+    spacing = []
+    for start, stop in [(0, 0x3FFFF), (0xE0000, 0xE01EF)]:
+        for cp in range(start, stop + 1):
+            ch = chr(cp)
+            if is_zero(cp, ch):
+                add(zero, cp)
+
+            elif unicodedata.east_asian_width(ch) in ("W", "F"):
+                add(wide, cp)
+
+            elif unicodedata.category(ch) == "Mc":
+                add(spacing, cp)
+
+    def charclass(ranges):
+        # re can only turn a character class into a lookup table when all
+        # of its characters are in the BMP, astral ranges are checked one
+        # by one, so they are split out and only checked for astral chars
+        bmp = []
+        astral = []
+        for start, stop in ranges:
+            if start <= 0xFFFF:
+                bmp.append((start, min(stop, 0xFFFF)))
+
+            if stop > 0xFFFF:
+                astral.append((max(start, 0x10000), stop))
+
+        def join(ranges):
+            return "".join(
+                "\\U{:08X}-\\U{:08X}".format(start, stop)
+                for start, stop in ranges
+            )
+
+        if astral:
+            return (
+                f"(?:[{join(bmp)}]"
+                f"|(?=[\\U00010000-\\U0010FFFF])[{join(astral)}])"
+            )
+
+        return f"[{join(bmp)}]"
+
+    zero_class = charclass(zero)
+    extend_class = charclass(sorted(zero + spacing))
+
+    return {
+        "zero": [tuple(r) for r in zero],
+        "wide": [tuple(r) for r in wide],
+        "zero_starts": [r[0] for r in zero],
+        "wide_starts": [r[0] for r in wide],
+        "zero_regex": re.compile(zero_class),
+        "wide_regex": re.compile(charclass(wide)),
+        # the non-ascii character after a zero width joiner (eg, the rest of
+        # a family emoji), it is drawn in the space of the character before
+        "joined_regex": re.compile(r"\u200d([^\x00-\x7F])"),
+        # the character before an emoji presentation selector, it becomes
+        # wide if it wasn't already
+        "emoji_regex": re.compile(r"(?<!\u200d)(.)\ufe0f", re.DOTALL),
+        # a grapheme is a CRLF, a flag, or a character and everything that
+        # extends it (zero width characters, spacing marks, and characters
+        # that were joined with a zero width joiner)
+        "grapheme_regex": re.compile(
+            rf"\r\n|[\U0001F1E6-\U0001F1FF]{{2}}"
+            rf"|.(?:\u200d(?!{zero_class})[^\x00-\x7F]|{extend_class})*",
+            re.DOTALL,
+        ),
+    }
+
+
+def codepoint_width(cp):
+    """Return the display width of a codepoint using bisect over the
+    precomputed range tables
+
+    :param cp: int|str, the codepoint or a one character string
+    :returns: int, 0, 1, or 2
+    """
+    if isinstance(cp, str):
+        cp = ord(cp)
+
+    tables = get_width_tables()
+    for width, name in [(0, "zero"), (2, "wide")]:
+        i = bisect.bisect_right(tables[f"{name}_starts"], cp) - 1
+        if i >= 0 and cp <= tables[name][i][1]:
+            return width
+
+    return 1
+
+
 class String(Str, StringMixin):
     """Wrapper around a unicode string "" to make sure we have a unicode string
     that will work across python versions and handle the most annoying encoding
@@ -323,6 +473,77 @@ class String(Str, StringMixin):
         ret = ret[:-1].rsplit(sep, 1)[0].rstrip()
         return type(self)(ret + postfix)
 
+    def display_width(self):
+        """Return how many columns this string takes up in a terminal
+
+        Wide characters (eg, CJK and most emoji) take 2 columns, combining
+        marks, controls, and the other zero width characters take none, and
+        emoji sequences joined with a zero width joiner (eg, a family emoji)
+        take up the width of their first emoji
+
+        This never creates an object per character, all the counting is done
+        by compiled regexes (see get_width_tables) so it's fast on long
+        strings
+
+        :Example:
+            String("abc").display_width() # 3
+            String("日本").display_width() # 4
+            String("e\u0301").display_width() # 1
+
+        :returns: int
+        """
+        if self.isascii():
+            if self.isprintable():
+                return len(self)
+
+            return len(self) - len(re.findall(r"[\x00-\x1F\x7F]", self))
+
+        tables = get_width_tables()
+        width = len(self)
+        width += tables["wide_regex"].subn("", self)[1]
+        width -= tables["zero_regex"].subn("", self)[1]
+
+        if "\u200d" in self:
+            for m in tables["joined_regex"].finditer(self):
+                width -= codepoint_width(m.group(1))
+
+        if "\ufe0f" in self:
+            for m in tables["emoji_regex"].finditer(self):
+                if codepoint_width(m.group(1)) == 1:
+                    width += 1
+
+        return width
+
+    def graphemes(self):
+        """Iterate the user perceived characters (grapheme clusters) of this
+        string
+
+        A grapheme is a base character and all the combining marks and
+        modifiers that follow it, a whole zero width joiner emoji sequence,
+        a regional indicator pair (a flag), or a CRLF. This is a close
+        approximation of the extended grapheme clusters in UAX #29, not a
+        full implementation
+
+        https://www.unicode.org/reports/tr29/
+
+        :Example:
+            list(String("e\u0301a").graphemes()) # ["e\u0301", "a"]
+
+        :returns: generator[str]
+        """
+        if self.isascii():
+            # only CRLF combines in ascii
+            if "\r\n" in self:
+                for m in re.finditer(r"\r\n|.", self, re.DOTALL):
+                    yield m.group(0)
+
+            else:
+                yield from str(self)
+
+        else:
+            for m in get_width_tables()["grapheme_regex"].finditer(self):
+                yield m.group(0)
+
     def indent(self, indent, count=1):
         """add whitespace to the beginning of each line of val
 
@@ -478,6 +699,37 @@ class String(Str, StringMixin):
         })
 
 
+_conversion_caches = weakref.WeakSet()
+"""Every cache created by cached_conversion, see NamingConvention.clear_cache
+"""
+
+
+def cached_conversion(method):
+    """Decorator for NamingConvention conversion methods that caches the
+    converted value, the cache is bounded and shared by every instance since
+    the same names tend to be converted over and over
+
+    :param method: Callable[[NamingConvention], str]
+    :returns: Callable[[NamingConvention], str], the returned callable also
+        has a .convert(naming_class, name) method that skips creating an
+        instance when the name is already cached
+    """
+    @functools.lru_cache(maxsize=4096)
+    def convert(naming_class, name):
+        return method(naming_class(name))
+
+    _conversion_caches.add(convert)
+
+    @functools.wraps(method)
+    def wrapper(self):
+        return convert(type(self), str(self))
+
+    wrapper.convert = convert
+    wrapper.cache_clear = convert.cache_clear
+    wrapper.cache_info = convert.cache_info
+    return wrapper
+
+
 class NamingConvention(String):
     """Class that makes it easy to handle the different types of names that can
     be defined and passed in.
@@ -550,6 +802,7 @@ class NamingConvention(String):
 
         return ret
 
+    @cached_conversion
     def underscore(self):
         """changes the separators to underscore
 
@@ -558,6 +811,7 @@ class NamingConvention(String):
         """
         return "_".join(self.split())
 
+    @cached_conversion
     def dash(self):
         """changes the separators to dashes
 
@@ -636,6 +890,7 @@ class NamingConvention(String):
     def camelcase(self):
         return self.upper_camelcase()
 
+    @cached_conversion
     def upper_camelcase(self):
         """Convert a string to use camel case (spaces and punctuation removed
         and capital letters)
@@ -686,6 +941,7 @@ class NamingConvention(String):
     def studlycase(self):
         return self.upper_camelcase()
 
+    @cached_conversion
     def lower_camelcase(self):
         """camel case but first letter is lowercase (eg camelCase)
 
@@ -709,6 +965,7 @@ class NamingConvention(String):
         """
         return self.lower_camelcase()
 
+    @cached_conversion
     def snakecase(self):
         """Convert a string to use snake case (lowercase with underscores in
         place of spaces: snake_case)
@@ -768,6 +1025,7 @@ class NamingConvention(String):
     def snake_case(self):
         return self.snakecase()
 
+    @cached_conversion
     def screaming_snakecase(self):
         """snake case but all capital letters instead of lowercase (eg,
         SCREAMING_SNAKE_CASE)
@@ -777,6 +1035,7 @@ class NamingConvention(String):
         """
         return self.snakecase().upper()
 
+    @cached_conversion
     def kebabcase(self):
         """snake case but with dashes instead of underscores (eg kebab-case)
 
@@ -784,6 +1043,7 @@ class NamingConvention(String):
         """
         return self.snakecase().replace("_", "-")
 
+    @cached_conversion
     def screaming_kebabcase(self):
         """snake case but with dashes and all caps (eg SCREAMING-KEBAB-CASE)
         """
@@ -803,6 +1063,75 @@ class NamingConvention(String):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def convert_keys(
+        cls,
+        mapping: Mapping,
+        convention: str = "snakecase",
+        *,
+        recursive: bool = False,
+    ) -> dict:
+        """Convert all the str keys of mapping to convention
+
+        :Example:
+            d = {"fooBar": {"cheBaz": 1}}
+            NamingConvention.convert_keys(d) # {"foo_bar": {"cheBaz": 1}}
+            NamingConvention.convert_keys(d, recursive=True)
+            # {"foo_bar": {"che_baz": 1}}
+
+        :param mapping: Mapping, the keys of this will be converted
+        :param convention: str, the name of the method that will convert each
+            key (eg, "snakecase", "kebabcase", "camelcase")
+        :keyword recursive: bool, True if mappings in the values (including
+            mappings in lists and tuples) should have their keys converted
+            also
+        :returns: dict, a new dict with the converted keys
+        """
+        method = getattr(cls, convention)
+        if convert := getattr(method, "convert", None):
+            convert = functools.partial(convert, cls)
+
+        else:
+            convert = lambda k: method(cls(k))
+
+        if recursive:
+            return cls._convert_value(mapping, convert)
+
+        return {
+            convert(k) if isinstance(k, str) else k: v
+            for k, v in mapping.items()
+        }
+
+    @classmethod
+    def _convert_value(cls, value, convert):
+        """Internal method. Used by .convert_keys to recurse into value"""
+        if isinstance(value, Mapping):
+            ret = {}
+            for k, v in value.items():
+                if isinstance(k, str):
+                    k = convert(k)
+
+                ret[k] = cls._convert_value(v, convert)
+
+            return ret
+
+        elif isinstance(value, (list, tuple)):
+            items = (cls._convert_value(v, convert) for v in value)
+            if hasattr(value, "_fields"):
+                # a namedtuple takes its items as separate arguments
+                return type(value)(*items)
+
+            return type(value)(items)
+
+        return value
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear the shared conversion caches, this includes the caches of
+        conversion methods defined on child classes"""
+        for cache in list(_conversion_caches):
+            cache.cache_clear()
+
     def cli_keyword(self, prefix_char: str = "-") -> str:
         """A keyword command-line flag name
 
@@ -1330,10 +1659,194 @@ class Codepoint(String):
             (ucs >= 0x30000 and ucs <= 0x3fffd)))
 
 
+class HashStream(object):
+    """Hash data that shouldn't be loaded into memory all at once, like big
+    files, the data is read and hashed a chunk at a time
+
+    :Example:
+        hs = HashStream(Filepath("/path/to/big/file"))
+        hs.md5() # same as String(<file contents>).md5()
+
+        # md5 and sha256 while only reading the file once
+        hs.hexdigests("md5", "sha256") # {"md5": "...", "sha256": "..."}
+
+        hs = HashStream(iter([b"foo", b"bar"]))
+        hs.hash(key="...") # same as String("foobar").hash(key="...")
+
+    A file path (including Filepath) or a seekable file object can be hashed
+    as many times as you want, a non-seekable file object or an iterator can
+    only be hashed once, so use .hexdigests() if you need more than one hash
+    of those
+    """
+    def __init__(self, source, chunk_size=1048576, encoding="", errors=""):
+        """
+        :param source: str|os.PathLike|io.IOBase|bytes|Iterable[bytes|str],
+            a str is the path of the file that will be hashed, a file object
+            should be opened in binary mode, otherwise each chunk is hashed
+            in order
+        :param chunk_size: int, how many bytes to read from a file at a time
+        :param encoding: str, used to convert str chunks to bytes
+        :param errors: str, used to convert str chunks to bytes
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.encoding = encoding or environ.ENCODING
+        self.errors = errors or environ.ENCODING_ERRORS
+
+        # every pass over a seekable file object starts from here
+        self.position = None
+        if hasattr(source, "readinto") and source.seekable():
+            self.position = source.tell()
+
+        # True once a source that can't be rewound has been read
+        self.consumed = False
+
+    def chunks(self):
+        """Yield the chunks of source
+
+        Chunks read from a file are views into one reusable buffer, so they
+        are only valid until the next chunk is yielded
+
+        :returns: generator[bytes|memoryview]
+        """
+        source = self.source
+        if isinstance(source, (basestring, os.PathLike)):
+            with open(source, mode="rb") as fp:
+                yield from self.read_chunks(fp)
+
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            yield source
+
+        elif self.consumed:
+            raise ValueError("The source can only be hashed once")
+
+        elif hasattr(source, "readinto"):
+            if self.position is None:
+                self.consumed = True
+
+            else:
+                source.seek(self.position)
+
+            yield from self.read_chunks(source)
+
+        else:
+            if iter(source) is source:
+                self.consumed = True
+
+            for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode(self.encoding, self.errors)
+                yield chunk
+
+    def read_chunks(self, fp):
+        """Internal method. Read fp into a reusable buffer
+
+        :param fp: io.IOBase, a binary file object
+        :returns: generator[memoryview]
+        """
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        while n := fp.readinto(buffer):
+            yield view[:n]
+
+    def update(self, *hashers):
+        """Internal method. Feed all the chunks of source to hashers
+
+        :param *hashers: anything with an update(bytes) method
+        :returns: int, how many bytes were hashed
+        """
+        size = 0
+        for chunk in self.chunks():
+            size += len(chunk)
+            for h in hashers:
+                h.update(chunk)
+
+        return size
+
+    def hexdigests(self, *names, key=None):
+        """Compute multiple hashes with one pass over the data
+
+        :param *names: str, hashlib algorithm names (eg, "md5", "sha256")
+        :keyword key: str|bytes, if passed in then the hashes will be HMACs
+            using this key
+        :returns: dict[str, str], the name keys and the hex digest values
+        """
+        if key is None:
+            hashers = {name: hashlib.new(name) for name in names}
+
+        else:
+            key = ByteString(key, self.encoding, self.errors)
+            hashers = {
+                name: hmac.new(key, digestmod=name) for name in names
+            }
+
+        self.update(*hashers.values())
+        return {name: h.hexdigest() for name, h in hashers.items()}
+
+    def md5(self):
+        """32 character md5 hash of the data"""
+        return self.hexdigests("md5")["md5"]
+
+    def sha256(self):
+        """64 character sha256 hash of the data"""
+        return self.hexdigests("sha256")["sha256"]
+
+    def hmac(self, key, name="sha256"):
+        """Keyed hash of the data
+
+        https://docs.python.org/3/library/hmac.html
+
+        :param key: str|bytes, the secret key
+        :param name: str, the hashlib algorithm
+        :returns: str, the hex digest
+        """
+        return self.hexdigests(name, key=key)[name]
+
+    def hash(self, key="", name="sha256", nonce="", rounds=100000):
+        """The streaming version of String.hash, this returns the same value
+        String.hash would return if it was given all the data
+
+        pbkdf2 uses the data as the HMAC key, and HMAC hashes any key longer
+        than the block size of the hash and uses that digest as the key
+        instead, so the data can be hashed a chunk at a time and only the
+        final digest (or the data itself if it is short) is given to pbkdf2
+
+        https://datatracker.ietf.org/doc/html/rfc2104#section-2
+
+        :param key: str, the key/salt/password for the hash
+        :param name: str, the hash to use
+        :param nonce: str, the nonce to use for the value
+        :param rounds: int, the number of rounds to hash
+        :returns: str, the hex hash
+        """
+        nonce = String(nonce).bytes() if nonce else b""
+        key = String(key).bytes()
+
+        h = hashlib.new(name)
+        head = bytearray()
+        for chunk in itertools.chain([nonce], self.chunks()):
+            h.update(chunk)
+            if len(head) <= h.block_size:
+                head.extend(chunk[:h.block_size + 1 - len(head)])
+
+        if len(head) > h.block_size:
+            password = h.digest()
+
+        else:
+            password = bytes(head)
+
+        r = hashlib.pbkdf2_hmac(name, password, key, rounds)
+        return String(binascii.hexlify(r))
+
+
 class Regex(object):
     """Provides a passthrough interface to the re module to run pattern against
     s
 
+    Compiled patterns are kept in a class wide LRU cache that is sized by
+    CACHE_SIZE, the re module's own cache is small and is easily thrashed when
+    a lot of different patterns are used
+
     :Example:
         r = Regex(r"foo", "foo bar foo")
         r.count() # 2
@@ -1344,42 +1857,112 @@ class Regex(object):
 
     https://docs.python.org/3/library/re.html
     """
+    CACHE_SIZE = 1024
+    """How many compiled patterns will be kept in the cache"""
+
+    _cache = OrderedDict()
+
+    _cache_lock = Lock()
+
+    _cache_hits = 0
+
+    _cache_misses = 0
+
+    @classmethod
+    def compile(cls, pattern, flags=0):
+        """Compile pattern, or return the already compiled pattern from the
+        cache
+
+        :param pattern: str|re.Pattern
+        :param flags: int, the re flags, if pattern is already compiled then
+            these are added to its flags
+        :returns: re.Pattern
+        """
+        if isinstance(pattern, re.Pattern):
+            # re.compile would raise a ValueError for flags with a compiled
+            # pattern, instead the flags are added to the pattern's flags
+            flags |= pattern.flags
+            if flags == pattern.flags:
+                return pattern
+
+            pattern = pattern.pattern
+
+        key = (type(pattern), pattern, flags)
+        with cls._cache_lock:
+            compiled = cls._cache.get(key)
+            if compiled is not None:
+                Regex._cache_hits += 1
+                cls._cache.move_to_end(key)
+                return compiled
+
+        compiled = re.compile(pattern, flags)
+
+        with cls._cache_lock:
+            Regex._cache_misses += 1
+            cls._cache[key] = compiled
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+        return compiled
+
+    @classmethod
+    def cache_info(cls):
+        """Return the statistics of the compiled pattern cache
+
+        :returns: dict[str, int], with keys hits, misses, size, and maxsize
+        """
+        with cls._cache_lock:
+            return {
+                "hits": Regex._cache_hits,
+                "misses": Regex._cache_misses,
+                "size": len(cls._cache),
+                "maxsize": cls.CACHE_SIZE,
+            }
+
+    @classmethod
+    def clear_cache(cls):
+        """Empty the compiled pattern cache and reset its statistics"""
+        with cls._cache_lock:
+            cls._cache.clear()
+            Regex._cache_hits = 0
+            Regex._cache_misses = 0
+
     def __init__(self, pattern, s, flags=0):
         self.pattern = pattern
         self.s = s
         self.flags = flags
 
+    def compiled(self, flags=0):
+        """Return the compiled pattern of this instance
+
+        :param flags: int, these will be added to the instance flags
+        :returns: re.Pattern
+        """
+        return self.compile(self.pattern, flags | self.flags)
+
     def search(self, flags=0):
-        flags |= self.flags
-        return re.search(self.pattern, self.s, flags)
+        return self.compiled(flags).search(self.s)
 
     def match(self, flags=0):
-        flags |= self.flags
-        return re.match(self.pattern, self.s, flags)
+        return self.compiled(flags).match(self.s)
 
     def fullmatch(self, flags=0):
-        flags |= self.flags
-        return re.fullmatch(self.pattern, self.s, flags)
+        return self.compiled(flags).fullmatch(self.s)
 
     def split(self, maxsplit=0, flags=0):
-        flags |= self.flags
-        return re.split(self.pattern, self.s, maxsplit=maxsplit, flags=flags)
+        return self.compiled(flags).split(self.s, maxsplit=maxsplit)
 
     def findall(self, flags=0):
-        flags |= self.flags
-        return re.findall(self.pattern, self.s, flags=flags)
+        return self.compiled(flags).findall(self.s)
 
     def finditer(self, flags=0):
-        flags |= self.flags
-        return re.finditer(self.pattern, self.s, flags=flags)
+        return self.compiled(flags).finditer(self.s)
 
     def sub(self, repl, count=0, flags=0):
-        flags |= self.flags
-        return re.sub(self.pattern, repl, self.s, count=count, flags=flags)
+        return self.compiled(flags).sub(repl, self.s, count=count)
 
     def subn(self, repl, count=0, flags=0):
-        flags |= self.flags
-        return re.subn(self.pattern, repl, self.s, count=count, flags=flags)
+        return self.compiled(flags).subn(repl, self.s, count=count)
 
     def count(self, flags=0):
         return len(self.findall(flags))
@@ -1388,6 +1971,163 @@ class Regex(object):
         return self.count()
 
 
+class MultiRegex(object):
+    """Test one string against many patterns at once
+
+    All the patterns are combined into one alternation where each pattern is
+    wrapped in its own named group, so the string is only scanned once instead
+    of once for each pattern and the name of the group that matched identifies
+    the pattern that won. Like any alternation the leftmost match wins and if
+    more than one pattern matches at the same position the pattern that was
+    added first wins
+
+    The patterns can have their own groups but they can't use numbered
+    backreferences (eg, \\1) since the numbers shift in the combined pattern,
+    use named groups and (?P=name) instead, group names have to be unique
+    across all the patterns
+
+    A compiled pattern keeps its own flags, they are scoped to the pattern
+    with an inline flag group (eg, (?i:...))
+
+    :Example:
+        mr = MultiRegex({
+            "int": r"\\d+",
+            "word": r"[a-z]+",
+        })
+        name, m = mr.search("foo 123")
+        name # "word"
+        m.group(0) # "foo"
+
+        [name for name, m in mr.finditer("foo 123")] # ["word", "int"]
+    """
+    INLINE_FLAGS = {
+        re.IGNORECASE: "i",
+        re.MULTILINE: "m",
+        re.DOTALL: "s",
+        re.VERBOSE: "x",
+        re.ASCII: "a",
+        re.LOCALE: "L",
+    }
+    """The flags that can be set on part of a pattern with an inline flag
+    group, only the first four can also be turned off"""
+
+    def __init__(self, patterns, flags=0):
+        """
+        :param patterns: Mapping[str, str]|Iterable[str], the patterns keyed
+            by the name that will be returned when that pattern matches, if
+            it's a list then the name will be the pattern's index
+        :param flags: int, the re flags for all the patterns
+        """
+        if isinstance(patterns, Mapping):
+            patterns = patterns.items()
+
+        else:
+            patterns = enumerate(patterns)
+
+        self.patterns = {}
+        self.flags = flags
+        self.names = {}
+
+        parts = []
+        for index, (name, pattern) in enumerate(patterns):
+            if isinstance(pattern, re.Pattern):
+                scoped = self.get_scoped_pattern(pattern, flags)
+                pattern = pattern.pattern
+
+            else:
+                scoped = pattern
+
+            self.patterns[name] = pattern
+            group_name = f"_multiregex{index}"
+            parts.append(f"(?P<{group_name}>{scoped})")
+            self.names[group_name] = name
+
+        if not parts:
+            raise ValueError("MultiRegex needs at least one pattern")
+
+        self.regex = Regex.compile("|".join(parts), flags)
+
+        # the outer groups in the combined pattern, lastindex is always one of
+        # these since the outer group closes after any inner groups
+        self.groups = {
+            self.regex.groupindex[group_name]: name
+            for group_name, name in self.names.items()
+        }
+
+    def get_scoped_pattern(self, pattern, flags):
+        """Internal method. Wrap a compiled pattern in an inline flag group so
+        its flags only apply to it in the combined pattern
+
+        :param pattern: re.Pattern
+        :param flags: int, the flags of the combined pattern
+        :returns: str
+        """
+        on = off = ""
+        for flag, letter in self.INLINE_FLAGS.items():
+            if pattern.flags & flag and not flags & flag:
+                on += letter
+
+            elif flags & flag and not pattern.flags & flag:
+                if letter not in "imsx":
+                    raise ValueError(
+                        f"Pattern {pattern.pattern!r} can't turn off flag"
+                        f" {flag!r}"
+                    )
+
+                off += letter
+
+        if on or off:
+            return f"(?{on}{'-' if off else ''}{off}:{pattern.pattern})"
+
+        return pattern.pattern
+
+    def get_name(self, m):
+        """Internal method. Returns the name of the pattern that matched
+
+        :param m: re.Match
+        :returns: Hashable
+        """
+        return self.groups[m.lastindex]
+
+    def get_result(self, m):
+        """Internal method. Returns the name and match tuple, or None"""
+        return None if m is None else (self.get_name(m), m)
+
+    def search(self, s, *args):
+        """Find the first pattern that matches anywhere in s
+
+        :param s: str
+        :param *args: pos and endpos that will be passed to re.Pattern.search
+        :returns: tuple[Hashable, re.Match]|None
+        """
+        return self.get_result(self.regex.search(s, *args))
+
+    def match(self, s, *args):
+        """Find the first pattern that matches at the beginning of s
+
+        :returns: tuple[Hashable, re.Match]|None
+        """
+        return self.get_result(self.regex.match(s, *args))
+
+    def fullmatch(self, s, *args):
+        """Find the first pattern that matches all of s
+
+        :returns: tuple[Hashable, re.Match]|None
+        """
+        return self.get_result(self.regex.fullmatch(s, *args))
+
+    def finditer(self, s, *args):
+        """Find every non-overlapping match of any of the patterns in s
+
+        :returns: Generator[tuple[Hashable, re.Match]]
+        """
+        for m in self.regex.finditer(s, *args):
+            yield self.get_name(m), m
+
+    def __contains__(self, s):
+        return self.regex.search(s) is not None
+
+
 class Base64(String):
     """This exists to normalize base64 encoding between py2 and py3, it assures
     that you always get back a unicode string when you encode or decode and
@@ -1415,6 +2155,147 @@ class Base64(String):
         bd = base64.b64decode(b)
         return String(bd, encoding=encoding)
 
+    @classmethod
+    def encode_chunks(cls, chunks, line_size=0, eol=b"\n"):
+        """Base64 encode chunks of bytes a chunk at a time
+
+        Any bytes that aren't a multiple of 3 are carried over to the next
+        chunk so the encoded chunks can be concatenated into the same value
+        as encoding everything at once
+
+        :param chunks: Iterable[bytes-like]
+        :param line_size: int, if set then the encoded output will be split
+            into lines of this many characters (eg, 76 for MIME), it must be a
+            multiple of 4
+        :param eol: bytes, what each line will end with if line_size is set
+        :returns: generator[bytes], the encoded chunks
+        """
+        if line_size:
+            if line_size % 4:
+                raise ValueError("line_size must be a multiple of 4")
+            group_size = line_size // 4 * 3
+
+        else:
+            group_size = 3
+
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+            size = len(buffer) - (len(buffer) % group_size)
+            if size:
+                yield cls.encode_group(buffer, size, line_size, eol)
+                del buffer[:size]
+
+        if buffer:
+            yield cls.encode_group(buffer, len(buffer), line_size, eol)
+
+    @classmethod
+    def encode_group(cls, buffer, size, line_size, eol):
+        """Internal method. Encode the first size bytes of buffer
+
+        :returns: bytes
+        """
+        with memoryview(buffer) as view:
+            encoded = base64.b64encode(view[:size])
+
+        if line_size:
+            encoded = eol.join(
+                encoded[i:i + line_size]
+                for i in range(0, len(encoded), line_size)
+            ) + eol
+
+        return encoded
+
+    @classmethod
+    def decode_chunks(cls, chunks):
+        """Base64 decode chunks a chunk at a time
+
+        Whitespace (including the line breaks of MIME encoded values) is
+        ignored and any characters that aren't a multiple of 4 are carried
+        over to the next chunk
+
+        :param chunks: Iterable[bytes-like|str], the base64 encoded chunks
+        :returns: generator[bytes], the decoded chunks
+        :raises: binascii.Error, if the chunks contain anything that isn't
+            base64 or whitespace
+        """
+        buffer = bytearray()
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("ascii")
+
+            buffer += chunk
+            buffer = buffer.translate(None, b" \t\r\n\x0b\x0c")
+            size = len(buffer) - (len(buffer) % 4)
+            if size:
+                with memoryview(buffer) as view:
+                    yield base64.b64decode(view[:size], validate=True)
+                del buffer[:size]
+
+        if buffer:
+            # let b64decode complain about the incorrect padding
+            yield base64.b64decode(bytes(buffer), validate=True)
+
+    @classmethod
+    def encode_stream(cls, fp_in, fp_out, chunk_size=1048576, **kwargs):
+        """Base64 encode everything read from fp_in and write it to fp_out
+        without reading all of fp_in into memory
+
+        :Example:
+            with open("attachment.pdf", "rb") as fp_in:
+                with open("attachment.b64", "wb") as fp_out:
+                    Base64.encode_stream(fp_in, fp_out, line_size=76)
+
+        :param fp_in: io.IOBase, a binary file object
+        :param fp_out: io.IOBase, a binary or text file object
+        :param chunk_size: int, how many bytes to read from fp_in at a time
+        :param **kwargs: passed through to .encode_chunks()
+        :returns: int, how many characters were written to fp_out
+        """
+        chunks = cls.read_chunks(fp_in, chunk_size)
+        chunks = cls.encode_chunks(chunks, **kwargs)
+        return cls.write_chunks(fp_out, chunks, encoding="ascii")
+
+    @classmethod
+    def decode_stream(cls, fp_in, fp_out, chunk_size=1048576):
+        """Base64 decode everything read from fp_in and write it to fp_out
+        without reading all of fp_in into memory
+
+        :param fp_in: io.IOBase, a binary or text file object
+        :param fp_out: io.IOBase, a binary file object
+        :param chunk_size: int, how much to read from fp_in at a time
+        :returns: int, how many bytes were written to fp_out
+        """
+        chunks = cls.decode_chunks(cls.read_chunks(fp_in, chunk_size))
+        return cls.write_chunks(fp_out, chunks)
+
+    @classmethod
+    def read_chunks(cls, fp, chunk_size):
+        """Internal method. Yield chunk_size chunks of fp until it is
+        exhausted
+
+        :returns: generator[bytes|str]
+        """
+        while chunk := fp.read(chunk_size):
+            yield chunk
+
+    @classmethod
+    def write_chunks(cls, fp, chunks, encoding=""):
+        """Internal method. Write chunks to fp, if fp is a text file object
+        the chunks are decoded with encoding first
+
+        :returns: int, how many bytes or characters were written
+        """
+        text = isinstance(fp, io.TextIOBase)
+        size = 0
+        for chunk in chunks:
+            if text:
+                chunk = chunk.decode(encoding)
+            fp.write(chunk)
+            size += len(chunk)
+
+        return size
+
 
 class Ascii(String):
     """This is just a convenience class so I can get all punctuation
@@ -1556,6 +2437,124 @@ class Password(String):
         needle = cls._scrypt(password, **pkwargs)
         return needle == haystack
 
+    @classmethod
+    def hash_many(
+        cls,
+        passwords: Iterable[str],
+        *,
+        max_workers: int = 0,
+        **kwargs
+    ) -> list[str]:
+        """Hash all the passwords on a bounded thread pool
+
+        hashlib.scrypt releases the GIL so the passwords really are hashed in
+        parallel, each password gets its own salt
+
+        :param passwords: Iterable[str], the plain text passwords
+        :keyword max_workers: int, how many threads, defaults to the number
+            of cpus
+        :param **kwargs: passed through to .hashpw
+        :returns: list[str], the password hashes in the same order as
+            passwords
+        """
+        return cls._map(
+            lambda password: cls.hashpw(password, **kwargs),
+            passwords,
+            max_workers=max_workers,
+        )
+
+    @classmethod
+    def check_many(
+        cls,
+        pairs: Iterable[tuple[str, str]],
+        *,
+        max_workers: int = 0,
+    ) -> list[bool]:
+        """Check all the (password, hashpw) pairs on a bounded thread pool
+
+        :param pairs: Iterable[tuple[str, str]], the plain text password and
+            the hash from .hashpw it should be compared to, an empty password
+            or hash is never valid
+        :keyword max_workers: int, how many threads, defaults to the number
+            of cpus
+        :returns: list[bool], in the same order as pairs
+        """
+        return cls._map(
+            lambda pair: cls(pair[0]).check(pair[1]),
+            pairs,
+            max_workers=max_workers,
+        )
+
+    @classmethod
+    def _map(
+        cls,
+        callback: Callable,
+        iterable: Iterable,
+        *,
+        max_workers: int = 0,
+    ) -> list:
+        """Internal method. Like ThreadPoolExecutor.map but only a couple
+        items per thread are ever queued, so millions of items don't all
+        become futures (and scrypt buffers) at the same time
+
+        :returns: list, the callback return values in the same order as
+            iterable
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        ret = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for item in iterable:
+                pending.append(executor.submit(callback, item))
+                if len(pending) > max_workers * 2:
+                    ret.append(pending.popleft().result())
+
+            while pending:
+                ret.append(pending.popleft().result())
+
+        return ret
+
+    @classmethod
+    def calibrate(
+        cls,
+        target: float = 0.1,
+        *,
+        r: int = 8,
+        p: int = 1,
+        max_n: int = 1 << 20,
+    ) -> dict[str, int]:
+        """Find the scrypt cost that takes about target seconds to hash a
+        password on this host
+
+        n is doubled until hashing takes longer than target, the largest n
+        that didn't go over is returned, since hardware keeps getting faster
+        this should be rerun every now and again
+
+        :Example:
+            kwargs = Password.calibrate(0.25)
+            pwhash = Password.hashpw("...", **kwargs)
+
+        :param target: float, how many seconds hashing should take
+        :keyword r: int, the scrypt block size
+        :keyword p: int, the scrypt parallelism factor
+        :keyword max_n: int, n will never be bigger than this
+        :returns: dict[str, int], the n, r, and p keywords that can be passed
+            to .hashpw
+        """
+        salt = cls.gensalt()
+        password = cls.gensalt()
+        n = 1 << 10
+        while n < max_n:
+            _, pkwargs = cls._genprefix(salt, n=n << 1, r=r, p=p)
+            start = time.perf_counter()
+            cls._scrypt(password, **pkwargs)
+            if time.perf_counter() - start > target:
+                break
+
+            n <<= 1
+
+        return {"n": n, "r": r, "p": p}
+
     @classmethod
     def gensalt(cls, nbytes: int = 32, **kwargs) -> str:
         """Semi-internal method. Generates nbytes of a random salt
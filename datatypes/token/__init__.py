@@ -4,6 +4,7 @@ from .base import (
     Token,
     Tokenizer,
     Scanner,
+    WindowBuffer,
 )
 from .word import (
     WordTokenizer,
@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 from io import SEEK_SET, SEEK_CUR, SEEK_END
 from contextlib import contextmanager
+import bisect
+import codecs
+import functools
 import io
+import mmap
+import re
 
 from ..compat import *
-from ..string import String
+from ..config.environ import environ
+from ..string import String, Regex
+from ..collections.container import Trie
 
 
 class Token(object):
@@ -47,21 +54,224 @@ class TokenizerABC(io.IOBase):
         raise io.UnsupportedOperation()
 
 
+class WindowBuffer(io.IOBase):
+    """A seekable text stream over bytes that are decoded one window at a
+    time
+
+    This lets a tokenizer scan a memory mapped file (see
+    `Filepath.open_mmap`) or a large bytes instance without decoding all
+    of it into a str and then copying that str into an io.StringIO. Only
+    one decoded window is held in memory, the cursor is a character
+    offset just like io.StringIO so `.tell()` and `.seek()` work the same
+
+    Every window is WINDOW_SIZE bytes and the character offset and decoder
+    state at the start of each window are remembered the first time the
+    window is decoded, so seeking back to a window decodes just that window
+
+    :Example:
+        with Filepath("<PATH>").open_mmap() as m:
+            scanner = Scanner(WindowBuffer(m))
+            line = scanner.readline()
+    """
+    WINDOW_SIZE = 1048576
+    """How many bytes are decoded at a time"""
+
+    def __init__(self, data, encoding="", errors="", window_size=0):
+        """
+        :param data: bytes|bytearray|memoryview|mmap.mmap, the encoded text
+        :param encoding: str, defaults to environ.ENCODING
+        :param errors: str, defaults to environ.ENCODING_ERRORS
+        :param window_size: int, defaults to WINDOW_SIZE
+        """
+        self.data = data
+        self.encoding = encoding or environ.ENCODING
+        self.errors = errors or environ.ENCODING_ERRORS
+        self.window_size = window_size or self.WINDOW_SIZE
+        self.decoder = codecs.getincrementaldecoder(self.encoding)(
+            self.errors
+        )
+
+        self.size = len(data)
+        self.pos = 0
+
+        # the character offset and decoder state at the start of each
+        # window that has been decoded, plus the window after it
+        self.starts = [0]
+        self.states = [self.decoder.getstate()]
+
+        self.index = -1
+        self.window = ""
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def load(self, index):
+        """Internal method. Decode the window at index
+
+        :param index: int, the window, this has to be a window that has
+            been decoded before or the window right after those
+        :returns: str, the decoded window
+        """
+        if index != self.index:
+            start = index * self.window_size
+            stop = start + self.window_size
+
+            self.decoder.setstate(self.states[index])
+            self.window = self.decoder.decode(
+                self.data[start:stop],
+                stop >= self.size,
+            )
+            self.index = index
+
+            if index + 1 == len(self.starts):
+                self.starts.append(self.starts[index] + len(self.window))
+                self.states.append(self.decoder.getstate())
+
+        return self.window
+
+    def locate(self, pos):
+        """Internal method. Find the window that contains the character at
+        pos, decoding windows until it is found
+
+        :param pos: int, a character offset
+        :returns: int, the window index or -1 if pos is at or past the end
+        """
+        starts = self.starts
+        while pos >= starts[-1]:
+            if (len(starts) - 1) * self.window_size >= self.size:
+                break
+
+            self.load(len(starts) - 1)
+
+        index = bisect.bisect_right(starts, pos) - 1
+        return index if index < len(starts) - 1 else -1
+
+    def tell(self):
+        self._checkClosed()
+        return self.pos
+
+    def seek(self, offset, whence=SEEK_SET):
+        """
+        https://docs.python.org/3/library/io.html#io.IOBase.seek
+
+        :param offset: int, the character offset
+        :param whence: int, SEEK_END decodes to the end of the data the
+            first time it is used
+        :returns: int, the new character offset
+        """
+        self._checkClosed()
+        if whence == SEEK_CUR:
+            offset += self.pos
+
+        elif whence == SEEK_END:
+            self.locate(float("inf"))
+            offset += self.starts[-1]
+
+        elif whence != SEEK_SET:
+            raise ValueError(f"Invalid whence ({whence})")
+
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+
+        self.pos = offset
+        return self.pos
+
+    def read(self, size=-1):
+        """
+        https://docs.python.org/3/library/io.html#io.TextIOBase.read
+
+        :param size: int, how many characters to read, -1 reads to the end
+        :returns: str
+        """
+        self._checkClosed()
+        if size is None:
+            size = -1
+
+        parts = []
+        while size != 0:
+            index = self.locate(self.pos)
+            if index < 0:
+                break
+
+            window = self.load(index)
+            i = self.pos - self.starts[index]
+            part = window[i:i + size] if size > 0 else window[i:]
+            parts.append(part)
+            self.pos += len(part)
+            if size > 0:
+                size -= len(part)
+
+        return parts[0] if len(parts) == 1 else "".join(parts)
+
+    def readline(self, size=-1):
+        """
+        https://docs.python.org/3/library/io.html#io.TextIOBase.readline
+
+        :param size: int, the most characters to read, -1 reads to the end
+            of the line
+        :returns: str, the line including the newline
+        """
+        self._checkClosed()
+        if size is None:
+            size = -1
+
+        parts = []
+        while size != 0:
+            index = self.locate(self.pos)
+            if index < 0:
+                break
+
+            window = self.load(index)
+            i = self.pos - self.starts[index]
+            stop = len(window) if size < 0 else min(len(window), i + size)
+            newline = window.find("\n", i, stop)
+            if newline >= 0:
+                stop = newline + 1
+
+            part = window[i:stop]
+            parts.append(part)
+            self.pos += len(part)
+            if size > 0:
+                size -= len(part)
+
+            if newline >= 0:
+                break
+
+        return parts[0] if len(parts) == 1 else "".join(parts)
+
+    def close(self):
+        """Release the window, this doesn't close the data since the data
+        belongs to the caller"""
+        self.window = ""
+        self.index = -1
+        super().close()
+
+
 class BaseTokenizer(TokenizerABC):
     """Basically an io.IOBase wrapper, implementing all the functionality of
     a feature complete io stream
     """
     def __init__(self, buffer):
         """
-        :param buffer: str|io.IOBase, this is the input that will be tokenized,
-            the buffer has to be seekable by default and will be set to
-            `.buffer` using `.set_buffer` so children can customize the buffer
-            there
+        :param buffer: str|bytes|mmap.mmap|io.IOBase, this is the input that
+            will be tokenized, the buffer has to be seekable by default and
+            will be set to `.buffer` using `.set_buffer` so children can
+            customize the buffer there, bytes and memory maps are decoded a
+            window at a time by `WindowBuffer`
         """
         self.set_buffer(buffer)
 
     def set_buffer(self, buffer):
-        if isinstance(buffer, basestring):
+        if isinstance(buffer, (bytes, bytearray, memoryview, mmap.mmap)):
+            buffer = WindowBuffer(buffer)
+
+        elif isinstance(buffer, basestring):
             buffer = io.StringIO(String(buffer))
 
         self.buffer = buffer
@@ -359,6 +569,17 @@ class Tokenizer(BaseTokenizer):
         raise io.UnsupportedOperation()
 
 
+class DelimTrie(Trie):
+    """Internal class. A case sensitive Trie that Scanner uses when it has to
+    search for a lot of delims at once"""
+    def normalize_value(self, value):
+        return value
+
+    def get_first_regex(self, chars):
+        chars = "".join(re.escape(ch) for ch in chars)
+        return Regex.compile(f"[{chars}]") if chars else None
+
+
 class Scanner(BaseTokenizer):
     """Python implementation of an Obj-c Scanner
 
@@ -396,6 +617,21 @@ class Scanner(BaseTokenizer):
     * https://docs.python.org/3/library/io.html#io.StringIO
     * https://docs.python.org/3/library/io.html#io.TextIOWrapper
     """
+    MIN_BLOCK_SIZE = 256
+    """The first block the delim search reads from the buffer, each block
+    after that is twice as big up to BLOCK_SIZE, most delims are close to the
+    cursor so this keeps short reads cheap"""
+
+    BLOCK_SIZE = 65536
+    """The biggest block the delim search will read from the buffer"""
+
+    TRIE_SIZE = 64
+    """When there are more delims than this they are searched for with an
+    Aho-Corasick DelimTrie instead of a regex alternation, the regex checks
+    every delim at every position (in C) while the trie's cost doesn't depend
+    on how many delims there are, so the trie wins once there are a lot of
+    delims"""
+
     def __init__(self, buffer, convert_escaped=False, escape_char="\\"):
         r"""
         :param buffer: str|io.IOBytes
@@ -526,61 +762,133 @@ class Scanner(BaseTokenizer):
 
         return default
 
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _compile_delims(cls, delims):
+        """Internal method. Compile delims so the leftmost delim in a string
+        can be found without checking every delim at every position
+
+        The first delim (in the order they were passed in) that matches at a
+        position wins, same as checking each delim one at a time. A few delims
+        are compiled into one regex alternation, more than TRIE_SIZE delims
+        are added to a DelimTrie so the search doesn't get slower with each
+        delim
+
+        :param delims: tuple[str, ...]
+        :returns: tuple[Callable, Callable]|None, a search(text, pos)
+            callback that returns the (start, delim) tuple of the leftmost
+            delim at or after pos, and a match(text, pos) callback that
+            returns the delim that starts at pos, both return None if there
+            isn't a delim
+        """
+        if not delims:
+            return None
+
+        if len(delims) > cls.TRIE_SIZE:
+            # the cached trie is shared by every tokenizer so it is built
+            # now instead of by whichever thread searches it first
+            trie = DelimTrie(*delims)
+            trie.build()
+            return trie.search, trie.match
+
+        regex = Regex.compile("|".join(re.escape(delim) for delim in delims))
+
+        def search(text, pos):
+            if m := regex.search(text, pos):
+                return m.start(), m.group(0)
+
+        def match(text, pos):
+            if m := regex.match(text, pos):
+                return m.group(0)
+
+        return search, match
+
     def _read_to_delim(self, delims):
         """Internal method. Reads to the found delim in `delims`
 
+        The buffer is read in blocks that are searched for the delims and
+        the escape character all at once (see `._compile_delims`)
+
         :param delims: dict[str, int], the returned value from
             `._normalize_delims`
         :returns: tuple[str, str, int], returns the found stubstring, the
             matched delim, and the length of the matched delim
         """
-        partial = ""
+        escape_char = self.escape_char
 
-        while True:
-            offset = self.tell()
-            char = self.buffer.read(1)
-            delim = ""
-            delim_len = 0
+        # the escape character comes first since an escaped position can't
+        # match a delim
+        search = self._compile_delims(
+            (escape_char, *delims) if escape_char else tuple(delims)
+        )
+        search = search[0] if search else None
+        match = self._compile_delims(tuple(delims))
+        match = match[1] if match else None
+
+        # a match has to have this many characters after its start before
+        # it can be trusted, otherwise a longer delim that was cut off at the
+        # end of the block might have matched instead. An escape needs the
+        # escaped character and the delim that can come right after it
+        size = max(delims.values(), default=0)
+        if escape_char:
+            size += len(escape_char) + 1
+
+        parts = []
+        window = ""
+        offset = self.tell() # the buffer position of window[0]
+        i = 0 # where the search starts in window
+        eof = False
+        block_size = self.MIN_BLOCK_SIZE
 
-            if char == "":
-                # we've reached eof
-                break
+        while True:
+            found = search(window, i) if search else None
+            if found and (eof or found[0] + size <= len(window)):
+                start, delim = found
+                parts.append(window[i:start])
+                i = start + len(delim)
 
-            elif char == self.escape_char:
-                # escaped characters don't count against our delim
+                if delim != escape_char:
+                    self.seek(offset + start)
+                    return "".join(parts), delim, len(delim)
 
                 if not self.convert_escaped:
-                    partial += char
-
-                # record the character and move passed it since it can't
-                # be taken into account when checking the delim because it
-                # is escaped
-                partial += self.buffer.read(1)
-                offset = self.tell()
-                char = self.buffer.read(1)
-
-            found = False
+                    parts.append(delim)
 
-            for delim, delim_len in delims.items():
-                token = char + self.buffer.read(delim_len - 1)
+                # the escaped character
+                parts.append(window[i:i + 1])
+                i += 1
 
-                self.seek(offset)
-                char = self.buffer.read(1)
+                # the character after an escaped character can be a delim but
+                # it is never considered an escape character
+                if match and (delim := match(window, i)):
+                    self.seek(offset + i)
+                    return "".join(parts), delim, len(delim)
 
-                if token == delim:
-                    self.seek(offset)
-                    found = True
-                    break
+                parts.append(window[i:i + 1])
+                i += 1
 
-            if found:
+            elif eof:
+                parts.append(window[i:])
                 break
 
             else:
-                # we are basically re-reading the character so internal
-                # offset will increment
-                partial += char
+                # keep the end of the window that could be the start of a
+                # match and read the next block
+                keep = max(i, len(window) - size)
+                parts.append(window[i:keep])
+                offset += keep
+                window = window[keep:]
+                i = 0
+
+                block = self.buffer.read(block_size)
+                if block:
+                    window += block
+                    block_size = min(block_size * 2, self.BLOCK_SIZE)
 
-        return partial, delim, delim_len
+                else:
+                    eof = True
+
+        return "".join(parts), "", 0
 
     def _read_thru_delim(self, delims):
         """Internal method. Reads through the found delim in `delims`
@@ -614,8 +922,9 @@ class Scanner(BaseTokenizer):
 
     def _read_thru_delims(self, delims):
         """Internal method. Reads through all the found delims in delims,
-        this is basically a wrapper around `._read_thru_delim` and is what
-        is called by `.read_thru`
+        this is the same as calling `._read_thru_delim` until it doesn't find
+        a delim but the buffer is read in blocks, and is what is called by
+        `.read_thru`
 
         :param delims: dict[str, int], the returned value from
             `._normalize_delims`
@@ -623,22 +932,38 @@ class Scanner(BaseTokenizer):
             matched delims (basically a concatenated string of all the matched
             delims, and the length of all the matched delims
         """
-        partial = ""
-        partial_delims = ""
-        partial_delims_len = 0
+        compiled = self._compile_delims(tuple(delims))
+        if not compiled:
+            return "", "", 0
+
+        match = compiled[1]
+        size = max(delims.values())
+
+        window = ""
+        offset = self.tell()
+        i = 0
+        eof = False
+        block_size = self.MIN_BLOCK_SIZE
 
         while True:
-            p, delim, delim_len = self._read_thru_delim(delims)
-            if delim:
-                partial += p
-                partial_delims += delim
-                partial_delims_len += delim_len
-                self.skip(delim_len)
+            if not eof and i + size > len(window):
+                block = self.buffer.read(block_size)
+                if block:
+                    window += block
+                    block_size = min(block_size * 2, self.BLOCK_SIZE)
+                    continue
+
+                eof = True
+
+            if delim := match(window, i):
+                i += len(delim)
 
             else:
                 break
 
-        return partial, partial_delims, partial_delims_len
+        partial = window[:i]
+        self.seek(offset + i)
+        return partial, partial, i
 
     def read_to(self, **kwargs):
         """scans and returns string up to but not including the delim unless
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import bisect
+import io
+import itertools
+import re
 
 from ..compat import *
-from ..string import String
+from ..string import String, Regex
 from .base import Token, Tokenizer
 
 
@@ -39,6 +43,13 @@ class WordToken(Token):
 class WordTokenizer(Tokenizer):
     """Tokenize a string finding tokens that are divided by passed in
     characters
+
+    If the deliminators are a set of characters (instead of a callback) then
+    they are compiled into one regex and the word boundaries are found with
+    finditer and indexed lazily as the tokenizer moves forward, so .next() and
+    .prev() don't have to read the buffer a character at a time. The index
+    needs the whole buffer as a string, so it's read once the first time it's
+    needed
     """
     DEFAULT_CHARS = String.WHITESPACE + String.PUNCTUATION
     """If no deliminators are passed into the constructor then use these"""
@@ -46,9 +57,12 @@ class WordTokenizer(Tokenizer):
     token_class = WordToken
     """The token class this class will use to create Token instances"""
 
+    INDEX_SIZE = 1024
+    """How many words are added to the word boundary index at a time"""
+
     def __init__(self, buffer, chars=None):
         """
-        :param buffer: str|io.IOBase, passed through to parent
+        :param buffer: str|bytes|io.IOBase, passed through to parent
         :param chars: callable|str|set, if a callback, it should have the
             signature: callback(char) and return True if the char is a delim,
             False otherwise. If a string then it is a string of chars that will
@@ -64,6 +78,86 @@ class WordTokenizer(Tokenizer):
 
         super().__init__(buffer)
 
+    def set_buffer(self, buffer):
+        super().set_buffer(buffer)
+        self.reset_index()
+
+    def is_indexed(self):
+        """Return True if the word boundaries can be found with a regex
+
+        A child class that overrides .is_delim_char() can't use the index since
+        there is no way to know what characters it will consider delims. Only
+        an io.StringIO buffer (which is what str input becomes) is indexed
+        since the index needs the whole buffer in memory, any other stream
+        (eg, an open file) is scanned a character at a time
+
+        :returns: bool
+        """
+        return (
+            bool(self.chars)
+            and not callable(self.chars)
+            and type(self).is_delim_char is WordTokenizer.is_delim_char
+            and isinstance(self.buffer, io.StringIO)
+        )
+
+    def reset_index(self):
+        """Internal method. Discard the word boundary index, it will be
+        rebuilt the next time it is needed"""
+        self.indexed = self.is_indexed()
+        self.text = None
+        self.words = None
+        self.starts = []
+        self.stops = []
+
+    def get_text(self):
+        """Internal method. Return the full buffer as a string, this is only
+        called when the buffer is indexed (see .is_indexed)
+
+        :returns: str
+        """
+        if self.text is None:
+            self.text = self.buffer.getvalue()
+
+        return self.text
+
+    def get_regex(self):
+        """Internal method. Return the compiled regex that matches a word
+
+        :returns: re.Pattern
+        """
+        chars = "".join(re.escape(ch) for ch in sorted(self.chars))
+        return Regex.compile(f"[^{chars}]+")
+
+    def index_to(self, pos):
+        """Internal method. Index the word boundaries until the word at or
+        after pos and the word after that are known
+
+        The words are indexed INDEX_SIZE at a time so the cost of extending
+        the index is spread across many calls
+
+        :param pos: int, the cursor position
+        :returns: tuple[list[int], list[int]], the starts and stops of every
+            word found so far
+        """
+        starts = self.starts
+        stops = self.stops
+
+        if self.words is None:
+            self.words = self.get_regex().finditer(self.get_text())
+
+        while self.words and (len(stops) < 2 or stops[-2] <= pos):
+            count = 0
+            for m in itertools.islice(self.words, self.INDEX_SIZE):
+                start, stop = m.span()
+                starts.append(start)
+                stops.append(stop)
+                count += 1
+
+            if count < self.INDEX_SIZE:
+                self.words = ()
+
+        return starts, stops
+
     def is_delim_char(self, ch):
         ret = False
         chars = self.chars
@@ -83,6 +177,9 @@ class WordTokenizer(Tokenizer):
         :returns: int, the cursor position of the start of the left deliminator
             of the current token
         """
+        if self.indexed:
+            return self.tell_indexed_ldelim()
+
         pos = self.buffer.tell()
         ch = self.buffer.read(1)
         if not ch:
@@ -126,11 +223,30 @@ class WordTokenizer(Tokenizer):
 
         return pos
 
+    def tell_indexed_ldelim(self):
+        """Internal method. The word boundary index version of
+        .tell_ldelim()"""
+        pos = self.buffer.tell()
+        if pos >= len(self.get_text()):
+            # EOF, stream is exhausted
+            raise StopIteration()
+
+        starts, stops = self.index_to(pos)
+        i = bisect.bisect_right(stops, pos)
+        if i < len(starts) and starts[i] == 0:
+            # we're in the first word and it has no left deliminator
+            return -1
+
+        return stops[i - 1] if i > 0 else 0
+
     def next(self):
         """Get the next Token
 
         :returns: Token, the next token found in .stream
         """
+        if self.indexed:
+            return self.next_indexed()
+
         ldelim = token = rdelim = None
 
         start = self.tell_ldelim()
@@ -187,6 +303,62 @@ class WordTokenizer(Tokenizer):
 
         return self.normalize(token)
 
+    def next_indexed(self):
+        """Internal method. The word boundary index version of .next(), it
+        returns the same tokens and leaves the cursor in the same place
+        """
+        text = self.get_text()
+        size = len(text)
+        pos = self.buffer.tell()
+        if pos >= size:
+            raise StopIteration()
+
+        starts = self.starts
+        stops = self.stops
+        if len(stops) < 2 or stops[-2] <= pos:
+            self.index_to(pos)
+
+        i = bisect.bisect_right(stops, pos)
+        if i >= len(starts):
+            # we're in the trailing deliminators
+            self.buffer.seek(size)
+            raise StopIteration()
+
+        token_class = self.token_class
+        start = starts[i]
+        stop = stops[i]
+
+        if start > 0:
+            lstart = stops[i - 1] if i > 0 else 0
+            ldelim = token_class(self, text[lstart:start], lstart, start)
+
+        else:
+            ldelim = None
+
+        # like .next() a stop at the end of the buffer is the position of the
+        # last character
+        if stop < size:
+            token = token_class(self, text[start:stop], start, stop)
+
+            rstop = starts[i + 1] if i + 1 < len(starts) else size
+            if rstop == size:
+                rstop -= 1
+                rdelim = token_class(self, text[stop:], stop, rstop)
+
+            else:
+                rdelim = token_class(self, text[stop:rstop], stop, rstop)
+
+            self.buffer.seek(rstop)
+
+        else:
+            token = token_class(self, text[start:], start, size - 1)
+            rdelim = None
+            self.buffer.seek(size)
+
+        token.ldelim = ldelim
+        token.rdelim = rdelim
+        return self.normalize(token)
+
     def prev(self):
         """Returns the previous Token
 
@@ -224,7 +396,7 @@ class StopWordTokenizer(WordTokenizer):
     """Strips stop words from a string"""
 
     # This list comes from Plancast's Formatting.php library (2010-2-4)
-    STOP_WORDS = set([
+    STOP_WORDS = frozenset([
         'a', 'about', 'above', 'after', 'again', 'against', 'all', 'am', 'an',
         'and', 'any', 'are', 'as', 'at', 'be', 'because', 'been', 'before',
         'being', 'below', 'between', 'both', 'but', 'by', 'did', 'do', 'does',
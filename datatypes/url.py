@@ -3,6 +3,13 @@ import re
 import inspect
 from socket import gethostname
 import os
+import hashlib
+import functools
+import itertools
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from threading import Lock
 
 from .compat import *
 from .string import String, ByteString
@@ -80,6 +87,22 @@ class Url(String):
 
     fragment = ""
 
+    DEFAULT_PORTS = {
+        "": 80,
+        "http": 80,
+        "https": 443,
+    }
+    """The scheme -> port mapping of ports that don't need to be in the
+    netloc"""
+
+    CACHE_SIZE = 4096
+    """How many parsed urls are kept, the least recently used parts are
+    dropped once this is reached, set to 0 to turn caching off"""
+
+    _cache = OrderedDict()
+
+    _cache_lock = Lock()
+
     @property
     def root(self):
         """just return scheme://netloc"""
@@ -229,49 +252,13 @@ class Url(String):
         default_scheme = parts.pop("scheme", "")
 
         if urlstring:
-            properties = [
-                "scheme", # 0
-                "netloc", # 1
-                "path", # 2
-                "query", # 3
-                "fragment", # 4
-                "username",
-                "password",
-                "hostname",
-                "port",
-            ]
-
-            has_host = is_url = False
-
-            if is_url := cls.is_url(urlstring):
-                o = parse.urlsplit(String(urlstring))
-
-            else:
-                s = String(urlstring)
-                part = s.split("/", maxsplit=1)[0]
-                has_host = "." in part or ":" in part \
-                    or part.lower().startswith("localhost") \
-                    or part.startswith("127.0.0.1")
-
-                if has_host:
-                    # if we don't have a url but it looks like we have a host
-                    # so let's make it a url by putting // in front of it so it
-                    # will still parse correctly
-                    s = "//{}".format(String(urlstring))
+            urlparts = cls.split(urlstring)
+            query_kwargs = urlparts.pop("query_kwargs", None)
+            parts.update(urlparts)
 
-                o = parse.urlsplit(s)
-
-            for k in properties:
-                v = getattr(o, k)
-                if v:
-                    parts[k] = v
-
-            if is_url:
-                parts["scheme"] = getattr(o, "scheme")
-
-            query = parts.get("query", "")
-            if query:
-                parts["query_kwargs"].update(cls.parse_query(query))
+            if query_kwargs is None:
+                query_kwargs = cls.parse_query(parts.get("query", ""))
+            parts["query_kwargs"].update(query_kwargs)
 
         query = kwargs.pop("query", "")
         if query:
@@ -285,11 +272,7 @@ class Url(String):
         if parts["query_kwargs"]:
             parts["query"] = cls.unparse_query(parts["query_kwargs"])
 
-        ports = kwargs.pop("ports", {
-            "": 80,
-            "http": 80,
-            "https": 443,
-        })
+        ports = kwargs.pop("ports", cls.DEFAULT_PORTS)
 
         for k, v in kwargs.items():
             parts[k] = v
@@ -380,6 +363,153 @@ class Url(String):
 
         return parts
 
+    @classmethod
+    def split(cls, urlstring):
+        """Split urlstring into the components that are actually in it
+
+        The result is cached by urlstring, so urls that are derived from
+        another url (eg, .child(), .parent(), .add(), .base()) only parse the
+        original urlstring once
+
+        :param urlstring: str, the url or url fragment to split
+        :returns: dict, only the components that were found in urlstring,
+            "query_kwargs" will be there if urlstring had a query
+        """
+        return cls.get_cached(
+            ("split", String(urlstring)),
+            cls.parse_urlstring,
+            urlstring,
+        )
+
+    @classmethod
+    def parse_urlstring(cls, urlstring):
+        """Internal method. The uncached .split()"""
+        parts = {}
+        properties = [
+            "scheme", # 0
+            "netloc", # 1
+            "path", # 2
+            "query", # 3
+            "fragment", # 4
+            "username",
+            "password",
+            "hostname",
+            "port",
+        ]
+
+        has_host = is_url = False
+
+        if is_url := cls.is_url(urlstring):
+            o = parse.urlsplit(String(urlstring))
+
+        else:
+            s = String(urlstring)
+            part = s.split("/", maxsplit=1)[0]
+            has_host = "." in part or ":" in part \
+                or part.lower().startswith("localhost") \
+                or part.startswith("127.0.0.1")
+
+            if has_host:
+                # if we don't have a url but it looks like we have a host
+                # so let's make it a url by putting // in front of it so it
+                # will still parse correctly
+                s = "//{}".format(String(urlstring))
+
+            o = parse.urlsplit(s)
+
+        for k in properties:
+            v = getattr(o, k)
+            if v:
+                parts[k] = v
+
+        if is_url:
+            parts["scheme"] = o.scheme
+
+        if query := parts.get("query", ""):
+            parts["query_kwargs"] = cls.parse_query(query)
+
+        return parts
+
+    @classmethod
+    def get_cached(cls, key, callback, *args, **kwargs):
+        """Internal method. Return the parts dict cached at key, callback is
+        called with args and kwargs to create the parts on a cache miss
+
+        :param key: tuple, anything that can't be hashed means the parts
+            won't be cached
+        :param callback: Callable[..., dict]
+        :returns: dict, a copy of the cached parts that is safe to modify
+        """
+        if cls.CACHE_SIZE:
+            try:
+                key = (cls, cls.freeze(key))
+                with cls._cache_lock:
+                    parts = cls._cache[key]
+                    cls._cache.move_to_end(key)
+
+            except KeyError:
+                parts = callback(*args, **kwargs)
+                with cls._cache_lock:
+                    cls._cache[key] = cls.copy_parts(parts)
+                    while len(cls._cache) > cls.CACHE_SIZE:
+                        cls._cache.popitem(last=False)
+
+                return parts
+
+            except TypeError:
+                # something in the key couldn't be hashed
+                pass
+
+            else:
+                return cls.copy_parts(parts)
+
+        return callback(*args, **kwargs)
+
+    @classmethod
+    def clear_cache(cls):
+        """Remove all the cached parsed urls"""
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @classmethod
+    def freeze(cls, value):
+        """Internal method. Convert value into something that can be part of
+        a cache key, the type is kept with each value so things like 1 and
+        "1" or a list and a tuple won't share a key
+
+        :returns: tuple
+        """
+        if isinstance(value, Mapping):
+            return (
+                type(value),
+                tuple((k, cls.freeze(v)) for k, v in value.items()),
+            )
+
+        elif isinstance(value, (list, tuple, set)):
+            return (type(value), tuple(cls.freeze(v) for v in value))
+
+        return (type(value), value)
+
+    @classmethod
+    def copy_parts(cls, parts):
+        """Internal method. Copy parts deep enough that changing a copy won't
+        change the cached parts"""
+        ret = {}
+        for k, v in parts.items():
+            if isinstance(v, dict):
+                ret[k] = {
+                    vk: list(vv) if isinstance(vv, list) else vv
+                    for vk, vv in v.items()
+                }
+
+            elif isinstance(v, list):
+                ret[k] = list(v)
+
+            else:
+                ret[k] = v
+
+        return ret
+
     @classmethod
     def parse_query(cls, query):
         """return name=val&name2=val2 strings into {name: val} dict"""
@@ -526,7 +656,20 @@ class Url(String):
         """
         :keyword hostname: Optional[str] the HOST:PORT or just HOST
         """
-        parts = cls.merge(urlstring, *args, **kwargs)
+        if not args and not kwargs and type(urlstring) is cls:
+            # urlstring was already parsed so we can just use its parts
+            parts = cls.copy_parts(vars(urlstring))
+            parts["urlstring"] = urlstring
+
+        else:
+            parts = cls.get_cached(
+                ("merge", urlstring, args, kwargs),
+                cls.merge,
+                urlstring,
+                *args,
+                **kwargs,
+            )
+
         urlstring = parts.pop("urlstring")
         instance = super().__new__(cls, urlstring)
         for k, v in parts.items():
@@ -840,6 +983,147 @@ class Url(String):
     def full(self):
         """alias of .unsplit()"""
         return self.unsplit()
+
+    def canonical(self):
+        """Return the canonical form of this url, two urls that point to the
+        same resource should have the same canonical form which makes this
+        handy to dedupe urls
+
+        The scheme and hostname are lowercased, the port is dropped if it is
+        the default port for the scheme, the query params are sorted by name,
+        the fragment is removed, and an empty path becomes "/" if there is a
+        hostname
+
+        :Example:
+            u = Url("HTTP://Foo.com:80?b=2&a=1#frag")
+            u.canonical() # http://foo.com/?a=1&b=2
+
+        :returns: str
+        """
+        scheme = self.scheme.lower()
+
+        netloc = hostloc = self.hostname.lower()
+        if self.port and self.port != self.DEFAULT_PORTS.get(scheme, None):
+            hostloc = "{}:{}".format(hostloc, self.port)
+            netloc = hostloc
+
+        if self.username:
+            userinfo = self.username
+            if self.password:
+                userinfo = "{}:{}".format(userinfo, self.password)
+
+            netloc = "{}@{}".format(userinfo, hostloc)
+
+        path = self.path
+        if not path and hostloc:
+            path = "/"
+
+        query = ""
+        if self.query_kwargs:
+            query = self.unparse_query(dict(sorted(self.query_kwargs.items())))
+
+        return parse.urlunsplit((scheme, netloc, path, query, ""))
+
+    @classmethod
+    def canonicalize(cls, urls, **kwargs):
+        """Canonicalize a stream of urls, see .canonical()
+
+        The urls are split into chunks and each chunk is canonicalized in a
+        process pool, only a few chunks are ever in flight at the same time
+        so memory stays bounded no matter how many urls there are
+
+        :Example:
+            with open("urls.txt") as fp:
+                for canonical, digest in Url.canonicalize(fp, hash_size=8):
+                    if digest not in seen:
+                        seen.add(digest)
+                        print(canonical)
+
+        :param urls: Iterable[str]|str|os.PathLike, the urls, one url per line
+            if it's a file object, if it is a str or path then it will be
+            treated as the path of a file with one url per line
+        :keyword chunksize: int, how many urls each process will handle at a
+            time
+        :keyword processes: int, how many processes to use, defaults to the
+            number of cpus, 0 means canonicalize in this process
+        :keyword hash_size: int, if set then a blake2b hexdigest of the
+            canonical url that is hash_size bytes long will be yielded with
+            the canonical url
+        :returns: generator[str|None|tuple[str|None, str|None]], the canonical
+            urls in the same order as urls, None for any url that couldn't be
+            parsed
+        """
+        chunksize = kwargs.get("chunksize", 1000)
+        processes = kwargs.get("processes", os.cpu_count() or 1)
+        hash_size = kwargs.get("hash_size", 0)
+
+        if isinstance(urls, (basestring, os.PathLike)):
+            with open(urls, encoding="utf-8") as fp:
+                yield from cls.canonicalize(fp, **kwargs)
+                return
+
+        urls = iter(urls)
+        chunks = iter(lambda: list(itertools.islice(urls, chunksize)), [])
+
+        if processes:
+            # forking a process that has other threads running isn't safe
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=context,
+            ) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(
+                        cls.canonicalize_chunk,
+                        chunk,
+                        hash_size,
+                    ))
+
+                    if len(pending) > processes * 2:
+                        yield from pending.popleft().result()
+
+                while pending:
+                    yield from pending.popleft().result()
+
+        else:
+            for chunk in chunks:
+                yield from cls.canonicalize_chunk(chunk, hash_size)
+
+    @classmethod
+    def canonicalize_chunk(cls, urls, hash_size=0):
+        """Internal method. Canonicalize a chunk of urls, this runs in the
+        process pool of .canonicalize()
+
+        :param urls: list[str]
+        :param hash_size: int
+        :returns: list
+        """
+        ret = []
+        for url in urls:
+            try:
+                canonical = cls(url.strip()).canonical()
+
+            except ValueError:
+                canonical = None
+
+            if hash_size:
+                digest = None
+                if canonical is not None:
+                    digest = hashlib.blake2b(
+                        canonical.encode("utf-8"),
+                        digest_size=hash_size,
+                    ).hexdigest()
+
+                ret.append((canonical, digest))
+
+            else:
+                ret.append(canonical)
+
+        return ret
 Urlstring = Url
 UrlString = Url
 
@@ -956,6 +1240,11 @@ class SlugWords(StopWordTokenizer):
     https://stackoverflow.com/a/2759009/5006
     """
 
+    DELIM_REGEX = re.compile(
+        "[{}]+".format(re.escape(StopWordTokenizer.DEFAULT_CHARS))
+    )
+    """Matches a run of the default deliminators, used by .split()"""
+
     def normalize(self, token):
         word = token.text
         word = self.NON_ASCII_REGEX.sub("", word)
@@ -964,6 +1253,25 @@ class SlugWords(StopWordTokenizer):
     def is_valid(self, word):
         return word and (word not in self.STOP_WORDS)
 
+    @classmethod
+    def split(cls, text):
+        """Find all the valid slug words in text without tokenizing it
+        character by character, this returns the same words as iterating
+        an instance
+
+        non-ascii characters are never deliminators so they can be stripped
+        from the whole text before it is split and lowercased
+
+        :param text: str
+        :returns: list[str]
+        """
+        text = cls.NON_ASCII_REGEX.sub("", text).lower()
+        stop_words = cls.STOP_WORDS
+        return [
+            word for word in cls.DELIM_REGEX.split(text)
+            if word and word not in stop_words
+        ]
+
 
 class Slug(String):
     """Given a string, convert it into a slug that can be used in a url path
@@ -978,11 +1286,41 @@ class Slug(String):
         :keyword delim: str, default is a hyphen
         :keyword size: int, the max size you want the slug
         """
-        delim = kwargs.get("delim", "-")
-        words = SlugWords(slug)
-        slug = delim.join(words)
-        if size := kwargs.get("size", 0):
+        slug = cls.slugify(
+            String(slug),
+            kwargs.pop("delim", "-"),
+            kwargs.pop("size", 0),
+        )
+        return super().__new__(cls, slug, **kwargs)
+
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def slugify(cls, text, delim="-", size=0):
+        """Internal method. Convert text into a slug string, the most recently
+        used slugs are cached since the same titles tend to get slugified
+        over and over
+
+        :param text: str
+        :param delim: str
+        :param size: int
+        :returns: str
+        """
+        slug = delim.join(SlugWords.split(text))
+        if size:
             slug = String(slug).truncate(size, sep=delim)
 
-        return super().__new__(cls, slug, **kwargs)
+        return slug
+
+    @classmethod
+    def many(cls, slugs, **kwargs):
+        """Convert all slugs into Slug instances
+
+        :Example:
+            Slug.many(["Foo is BAR", "the cHE"]) # ["foo-bar", "che"]
+
+        :param slugs: Iterable[str], the prospective slugs
+        :param **kwargs: passed through to each Slug
+        :returns: list[Slug]
+        """
+        return [cls(slug, **kwargs) for slug in slugs]
 
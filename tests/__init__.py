@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
+from socketserver import ThreadingMixIn
+
 import testdata
 from testdata import TestCase, IsolatedAsyncioTestCase
 
+from datatypes.server import CallbackServer
+
 
 testdata.basic_logging()
 
+
+class ThreadingCallbackServer(ThreadingMixIn, CallbackServer):
+    """A CallbackServer that can handle more than one connection at a time,
+    which keep-alive and concurrent requests need"""
+    pass
@@ -356,6 +356,44 @@ class TrieTest(TestCase):
         self.assertFalse(t.has("zoo"))
         self.assertFalse(t.has("bars"))
 
+    def test_finditer(self):
+        t = Trie("he", "she", "his", "hers")
+        self.assertEqual(
+            [(1, "she"), (2, "he"), (2, "hers")],
+            list(t.finditer("ushers"))
+        )
+        self.assertEqual([(2, "he")], list(t.finditer("ushers", 2, 4)))
+        self.assertEqual([], list(t.finditer("foo bar")))
+
+        # values are lowercased
+        self.assertEqual([(0, "she"), (1, "he")], list(t.finditer("SHE")))
+
+    def test_search(self):
+        t = Trie("abcd", "bc", "b")
+        self.assertEqual((1, "abcd"), t.search("xabcdx"))
+
+        # abcd can't match so the leftmost is bc, which was added before b
+        self.assertEqual((2, "bc"), t.search("xabcx"))
+        self.assertEqual((2, "b"), t.search("xabx"))
+        self.assertEqual((5, "bc"), t.search("xabcxbc", 3))
+        self.assertIsNone(t.search("xyz"))
+
+        t = Trie("b", "bc")
+        self.assertEqual((0, "b"), t.search("bc"))
+        self.assertEqual((0, "bc"), t.search("bc", longest=True))
+
+        # adding a value rebuilds the automaton
+        t.add("xb")
+        self.assertEqual((0, "xb"), t.search("xbc"))
+
+    def test_match(self):
+        t = Trie("foo", "foobar", "f")
+        self.assertEqual("foo", t.match("foobar"))
+        self.assertEqual("foobar", t.match("foobar", longest=True))
+        self.assertEqual("f", t.match("fob"))
+        self.assertEqual("foo", t.match("xfoo", 1))
+        self.assertIsNone(t.match("bar"))
+
 
 class SortedListTest(TestCase):
     def test_storage(self):
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 import email
+import io
+import threading
+import time
+import urllib.request
 
 from datatypes.compat import *
 from datatypes.http import (
@@ -9,12 +13,21 @@ from datatypes.http import (
     HTTPResponse,
     UserAgent,
     Multipart,
+    MultipartEncoder,
+    MultipartDecoder,
+    MemoryHTTPCache,
+    DiskHTTPCache,
+    HTTPRetry,
+    HTTPStats,
+    HTTPTimings,
 )
 from datatypes.string import String, ByteString
 from datatypes.config.environ import environ
+from datatypes.server import CallbackServer, ServerThread
+from datatypes.event import Events
 
 
-from . import TestCase, testdata
+from . import TestCase, testdata, ThreadingCallbackServer
 
 
 class HTTPEnvironTest(TestCase):
@@ -258,6 +271,39 @@ class HTTPHeadersTest(TestCase):
         hs["Content-Type"] = "foo/bar;charset=BooBoo"
         self.assertEqual("foo/bar", hs.get_media_type())
 
+    def test_parsed_cache(self):
+        hs = HTTPHeaders()
+        hs["Content-Type"] = "foo/bar; charset=utf-8"
+        self.assertEqual("foo/bar", hs.get_media_type())
+        self.assertEqual("utf-8", hs.get_content_encoding())
+
+        main, params = hs.parse("content-type")
+        params["charset"] = "changed"
+        self.assertEqual("utf-8", hs.get_params("Content-Type")["charset"])
+
+        hs["content_type"] = "che/baz; charset=latin-1"
+        self.assertEqual("che/baz", hs.get_media_type())
+        self.assertEqual("latin-1", hs.get_content_encoding())
+
+        hs.add_header("Accept", "text/plain;q=0.5")
+        self.assertEqual("text/plain", hs.parse_weighted("Accept")[0][0])
+        hs.add_header("Accept", "text/html")
+        hs.set_header("Accept", "text/html, text/plain;q=0.5")
+        self.assertEqual("text/html", hs.parse_weighted("Accept")[0][0])
+
+        del hs["Content-Type"]
+        self.assertEqual("", hs.get_media_type())
+        self.assertIsNone(hs.get_content_encoding())
+
+    def test_copy_index(self):
+        hs = HTTPHeaders({"foo": "1"})
+        hs2 = hs.copy()
+        hs2["foo"] = "2"
+        hs2["bar"] = "3"
+        self.assertEqual("1", hs["foo"])
+        self.assertFalse("bar" in hs)
+        self.assertEqual("2", hs2["foo"])
+
     def test_get_cookies(self):
         headers = email.message_from_bytes((
             b"Server: SimpleHTTP/0.6 Python/3.10.14"
@@ -444,6 +490,280 @@ class HTTPClientTest(TestCase):
             self.assertTrue("Cookie" in r.request.headers)
 
 
+class HTTPCacheTest(TestCase):
+    def create_cache_server(self, **headers):
+        calls = []
+        def GET(handler):
+            calls.append(handler)
+            etag = headers.get("ETag", "")
+            if etag and handler.headers.get("If-None-Match") == etag:
+                handler.send_response(304)
+                handler.end_headers()
+                return None
+
+            handler.send_response(200)
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.send_header("Content-Type", "text/plain")
+            handler.end_headers()
+            return "GET {}".format(len(calls))
+
+        def POST(handler):
+            return None
+
+        server = self.create_callbackserver({
+            "GET": GET,
+            "POST": POST,
+        })
+        return server, calls
+
+    def test_get_cache_control(self):
+        hs = HTTPHeaders()
+        hs.add_header("Cache-Control", "max-age=60, no-cache")
+        hs.add_header("Cache-Control", "private=\"foo\"")
+        cc = hs.get_cache_control()
+        self.assertEqual("60", cc["max-age"])
+        self.assertTrue(cc["no-cache"])
+        self.assertEqual("foo", cc["private"])
+
+    def test_max_age(self):
+        server, calls = self.create_cache_server(**{
+            "Cache-Control": "max-age=60",
+        })
+
+        with server:
+            c = HTTPClient(server, cache=MemoryHTTPCache())
+            r1 = c.get("/foo")
+            r2 = c.get("/foo")
+            self.assertEqual(1, len(calls))
+            self.assertFalse(r1.cached)
+            self.assertTrue(r2.cached)
+            self.assertEqual(r1.body, r2.body)
+
+            c.get("/bar")
+            self.assertEqual(2, len(calls))
+
+            c.get("/foo", headers={"Cache-Control": "no-cache"})
+            self.assertEqual(3, len(calls))
+
+    def test_no_store(self):
+        server, calls = self.create_cache_server(**{
+            "Cache-Control": "no-store, max-age=60",
+        })
+
+        with server:
+            c = HTTPClient(server, cache=MemoryHTTPCache())
+            c.get("/foo")
+            r = c.get("/foo")
+            self.assertEqual(2, len(calls))
+            self.assertFalse(r.cached)
+
+    def test_etag_304(self):
+        server, calls = self.create_cache_server(**{
+            "Cache-Control": "no-cache",
+            "ETag": "\"1234\"",
+        })
+
+        with server:
+            c = HTTPClient(server, cache=MemoryHTTPCache())
+            r1 = c.get("/foo")
+            r2 = c.get("/foo")
+            self.assertEqual(2, len(calls))
+            self.assertEqual("\"1234\"", calls[1].headers["If-None-Match"])
+            self.assertTrue(r2.cached)
+            self.assertEqual(200, r2.code)
+            self.assertEqual(r1.body, r2.body)
+
+    def test_invalidate(self):
+        server, calls = self.create_cache_server(**{
+            "Cache-Control": "max-age=60",
+        })
+
+        with server:
+            c = HTTPClient(server, cache=MemoryHTTPCache())
+            c.get("/foo")
+            c.post("/foo")
+            r = c.get("/foo")
+            self.assertEqual(2, len(calls))
+            self.assertFalse(r.cached)
+
+    def test_disk(self):
+        server, calls = self.create_cache_server(**{
+            "Cache-Control": "max-age=60",
+        })
+        cachedir = self.create_dir()
+
+        with server:
+            c = HTTPClient(server, cache=DiskHTTPCache(dir=cachedir))
+            c.get("/foo")
+
+            c = HTTPClient(server, cache=DiskHTTPCache(dir=cachedir))
+            r = c.get("/foo")
+            self.assertEqual(1, len(calls))
+            self.assertTrue(r.cached)
+            self.assertEqual("GET 1", r.body)
+
+
+class HTTPRetryTest(TestCase):
+    def test_retry(self):
+        calls = []
+        def GET(handler):
+            calls.append(handler)
+            if len(calls) < 3:
+                handler.code = 503
+                raise RuntimeError()
+            return "GET"
+
+        server = self.create_callbackserver({
+            "GET": GET,
+            "POST": GET,
+        })
+
+        with server:
+            retry = HTTPRetry(3, backoff=0.01)
+            c = HTTPClient(server, retry=retry)
+            r = c.get("/")
+            self.assertEqual(200, r.code)
+            self.assertEqual(3, len(calls))
+            self.assertEqual(2, retry.counters["retries"])
+
+            # POST isn't idempotent so it won't be retried
+            calls[:] = []
+            r = c.post("/")
+            self.assertEqual(503, r.code)
+            self.assertEqual(1, len(calls))
+
+    def test_budget(self):
+        retry = HTTPRetry(3, budget=0.5, budget_burst=1)
+        retry.deposit()
+        self.assertTrue(retry.withdraw())
+        self.assertFalse(retry.withdraw())
+
+        retry.deposit()
+        retry.deposit()
+        self.assertTrue(retry.withdraw())
+        self.assertEqual(2, retry.counters["retries"])
+        self.assertEqual(3, retry.counters["requests"])
+
+    def test_delays(self):
+        retry = HTTPRetry(4, backoff=1, rate=1.0, max_backoff=5)
+        self.assertEqual([1, 2, 4, 5], retry.delays)
+        for attempt in range(4):
+            delay = retry.get_delay(attempt)
+            self.assertLessEqual(delay, retry.delays[attempt])
+
+    def test_hedge(self):
+        calls = []
+        release = threading.Event()
+        def GET(handler):
+            calls.append(handler)
+            if len(calls) == 1:
+                # the first request is slow until the hedge has won
+                release.wait(5)
+            return len(calls)
+
+        server = ServerThread(ThreadingCallbackServer({"GET": GET}))
+
+        with server:
+            retry = HTTPRetry(0, hedge=True, hedge_delay=0.01)
+            with HTTPClient(server, retry=retry) as c:
+                r = c.get("/")
+                release.set()
+                self.assertEqual("2", r.body)
+                self.assertEqual(1, retry.counters["hedges"])
+                self.assertEqual(1, retry.counters["hedges_won"])
+
+            self.assertIsNone(retry.executor)
+
+    def test_get_hedge_delay(self):
+        retry = HTTPRetry(hedge_delay=1.0)
+        self.assertEqual(1.0, retry.get_hedge_delay())
+
+        retry.latencies.extend(range(100))
+        self.assertEqual(95, retry.get_hedge_delay())
+
+
+class HTTPTimingsTest(TestCase):
+    def test_timings(self):
+        server = self.create_callbackserver({
+            "GET": lambda handler: "GET",
+        })
+
+        with server:
+            c = HTTPClient(server)
+            r = c.get("/")
+            t = r.timings
+            self.assertLess(0.0, t.dns)
+            self.assertLess(0.0, t.connect)
+            self.assertLess(0.0, t.wait)
+            self.assertLessEqual(t.ttfb, t.total)
+            self.assertEqual(
+                set(HTTPTimings.phases) | {"ttfb", "total"},
+                set(t.as_dict().keys()),
+            )
+
+            r = c.get("/")
+            host = r.request.host
+            self.assertEqual(2, c.stats.get(host)["total"].count)
+            self.assertEqual(2, c.stats.as_dict()[host]["ttfb"]["count"])
+
+    def test_opener(self):
+        class HeaderHandler(urllib.request.BaseHandler):
+            def http_request(self, req):
+                req.add_unredirected_header("X-Installed", "1")
+                return req
+
+        server = self.create_callbackserver({
+            "GET": lambda handler: handler.headers.get("X-Installed", ""),
+        })
+
+        with server:
+            c = HTTPClient(
+                server,
+                opener=urllib.request.build_opener(HeaderHandler),
+            )
+            r = c.get("/")
+            self.assertEqual("1", r.body)
+            self.assertLess(0.0, r.timings.connect)
+
+            # the client only uses the handlers of the opener it was given
+            r = HTTPClient(server).get("/")
+            self.assertEqual("", r.body)
+
+    def test_events(self):
+        server = self.create_callbackserver({
+            "GET": lambda handler: "GET",
+        })
+
+        events = Events()
+        responses = []
+        events.bind("response", lambda event: responses.append(event))
+        errors = []
+        events.bind("error", lambda event: errors.append(event))
+
+        with server:
+            c = HTTPClient(server, events=events)
+            c.get("/")
+            self.assertEqual(1, len(responses))
+            self.assertEqual(200, responses[0].response.code)
+            self.assertIs(responses[0].response.timings, responses[0].timings)
+
+        c = HTTPClient("http://127.0.0.1:1", events=events)
+        with self.assertRaises(URLError):
+            c.get("/")
+        self.assertEqual(1, len(errors))
+        self.assertLess(0.0, errors[0].timings.total)
+
+    def test_stats(self):
+        stats = HTTPStats()
+        timings = HTTPTimings()
+        timings.wait = 0.1
+        timings.finish()
+        stats.add("example.com", timings)
+        self.assertEqual(1, stats.get("example.com")["wait"].count)
+        self.assertEqual({}, stats.get("foo.com"))
+
+
 class UserAgentTest(TestCase):
     def test_user_agent(self):
         user_agents = [
@@ -577,3 +897,151 @@ class MultipartTest(TestCase):
             continue
         self.assertEqual(2, count)
 
+
+class MultipartEncoderTest(TestCase):
+    def test_encode_decode(self):
+        me = MultipartEncoder("form-data", chunk_size=4)
+        me.add_fields({"foo": "1", "bar": "2"})
+
+        p = self.create_file("this is the file body", ext="txt")
+        me.add_file(p, name="file1")
+
+        with p.open("rb") as fp:
+            me.add_file(fp)
+            body = bytes(me)
+
+        self.assertEqual(len(body), me.length)
+        self.assertEqual(str(len(body)), me.headers["Content-Length"])
+
+        parts = list(Multipart.decode(me.headers, body))
+        self.assertEqual(4, len(parts))
+        self.assertEqual(("foo", "1"), parts[0].get_field())
+        self.assertEqual(p.read_bytes(), parts[2].body)
+        self.assertEqual(p.read_bytes(), parts[3].body)
+
+    def test_chunked(self):
+        class Stream(io.RawIOBase):
+            def __init__(self, data):
+                self.data = io.BytesIO(data)
+
+            def readable(self):
+                return True
+
+            def readinto(self, b):
+                data = self.data.read(len(b))
+                b[:len(data)] = data
+                return len(data)
+
+        me = MultipartEncoder()
+        me.add_file(Stream(b"stream body"), name="file1")
+        self.assertIsNone(me.length)
+        self.assertTrue(me.headers.is_chunked())
+
+        parts = list(Multipart.decode(me.headers, bytes(me)))
+        self.assertEqual(b"stream body", parts[0].body)
+
+    def test_post(self):
+        def POST(handler):
+            return [
+                handler.body["foo"],
+                handler.body["file1"].read().decode(handler.encoding),
+            ]
+
+        server = self.create_callbackserver({
+            "POST": POST,
+        })
+
+        data = "this is the file body"
+        p = self.create_file(data, ext="txt")
+
+        me = MultipartEncoder()
+        me.add_field("foo", "bar")
+        me.add_file(p, name="file1")
+
+        with server:
+            c = HTTPClient(server)
+            res = c.post(server, me)
+            self.assertEqual(["bar", data], res.body)
+
+
+class MultipartDecoderTest(TestCase):
+    def test_decode_crlf(self):
+        me = MultipartEncoder()
+        me.add_fields({"foo": "1", "bar": "2"})
+        me.add_part("application/octet-stream", b"\r\n--\r\n" * 10)
+        body = bytes(me)
+
+        for chunk_size in [1, 7, 64, 1024]:
+            md = MultipartDecoder(
+                me.headers,
+                io.BytesIO(b"preamble\r\n" + body + b"epilogue"),
+                chunk_size=chunk_size,
+            )
+            parts = list(md)
+            self.assertEqual(3, len(parts))
+            self.assertEqual(("foo", "1"), parts[0].get_field())
+            self.assertEqual(("bar", "2"), parts[1].get_field())
+            self.assertEqual(b"\r\n--\r\n" * 10, parts[2].body)
+
+    def test_decode_lf(self):
+        me = Multipart.encode("form-data")
+        me.add_field("foo", "1")
+        p = self.create_file("this is the file body", ext="txt")
+        me.add_file(p, name="file1")
+
+        md = MultipartDecoder(me.headers, io.BytesIO(me.body), chunk_size=5)
+        parts = list(md)
+        self.assertEqual(2, len(parts))
+        self.assertEqual(("foo", "1"), parts[0].get_field())
+
+        name, fp = parts[1].get_field()
+        self.assertEqual("file1", name)
+        self.assertEqual(p.read_bytes(), fp.read())
+        self.assertEqual(p.basename, fp.filename)
+
+    def test_spool(self):
+        data = testdata.get_ascii(1000).encode()
+        me = MultipartEncoder()
+        me.add_part("application/octet-stream", data)
+        me.add_part("application/octet-stream", b"small")
+        body = bytes(me)
+
+        md = MultipartDecoder(
+            me.headers,
+            io.BytesIO(body + b"more data"),
+            length=len(body),
+            chunk_size=64,
+            spool_size=100,
+        )
+        parts = list(md)
+        self.assertIsNotNone(parts[0].path)
+        self.assertEqual(data, parts[0].body)
+        self.assertEqual(data, parts[0].path.read_bytes())
+        self.assertIsNone(parts[1].path)
+        self.assertEqual(b"small", parts[1].body)
+
+    def test_spool_close(self):
+        me = MultipartEncoder()
+        me.add_part("application/octet-stream", testdata.get_ascii(1000))
+        body = bytes(me)
+
+        md = MultipartDecoder(me.headers, io.BytesIO(body), spool_size=100)
+        with md:
+            parts = list(md)
+            path = parts[0].path
+            fp = parts[0].get_file()
+            self.assertTrue(path.exists())
+
+        self.assertTrue(fp.closed)
+        self.assertFalse(path.exists())
+        self.assertFalse(path.parent.exists())
+        self.assertEqual([], md.parts)
+
+    def test_truncated(self):
+        me = MultipartEncoder()
+        me.add_field("foo", "1")
+        body = bytes(me)
+
+        md = MultipartDecoder(me.headers, io.BytesIO(body[:-10]))
+        with self.assertRaises(IOError):
+            list(md)
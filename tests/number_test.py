@@ -5,6 +5,7 @@ from datatypes.number import (
     Integer,
     Shorten,
     Exponential,
+    Histogram,
     Hex,
     #Binary,
     Boolean,
@@ -134,6 +135,35 @@ class ExponentialTest(TestCase):
         self.assertEqual(0.25, exp.rate)
 
 
+class HistogramTest(TestCase):
+    def test_percentile(self):
+        h = Histogram([1, 2, 4, 8])
+        self.assertEqual(0.0, h.percentile(50))
+
+        for v in range(1, 11):
+            h.add(v)
+
+        self.assertEqual(10, len(h))
+        self.assertEqual(5.5, h.mean())
+        self.assertEqual(8, h.percentile(50))
+        self.assertEqual(10, h.percentile(99))
+        self.assertEqual(1, h.percentile(1))
+        self.assertEqual([1, 1, 2, 4, 2], [c for b, c in h.buckets()])
+
+    def test_update(self):
+        h1 = Histogram()
+        h1.add(0.1)
+        h2 = Histogram()
+        h2.add(0.3)
+        h1.update(h2)
+        self.assertEqual(2, h1.count)
+        self.assertEqual(0.1, h1.min)
+        self.assertEqual(0.3, h1.max)
+
+        with self.assertRaises(ValueError):
+            h1.update(Histogram([1, 2]))
+
+
 class BooleanTest(TestCase):
     def test_true(self):
         self.assertTrue(Boolean(True))
@@ -1182,6 +1182,16 @@ class FilepathTest(_PathTestCase):
         r = src.cp(target, recursive=True)
         self.assertEqual("che", r.basename)
 
+    def test_open_mmap(self):
+        p = TempFilepath()
+        with p.open_mmap() as m:
+            self.assertEqual(b"", m)
+
+        p.write_text("foo bar")
+        with p.open_mmap() as m:
+            self.assertEqual(7, len(m))
+            self.assertEqual(b"bar", m[4:])
+
     def test_flock(self):
         one = TempFilepath()
         two = Filepath(one)
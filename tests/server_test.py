@@ -1,15 +1,31 @@
 # -*- coding: utf-8 -*-
+import http.client
+import json
+import gzip
+import os
+import time
+import threading
+import socket
+import subprocess
+import sys
+from contextlib import contextmanager
 
 from datatypes.compat import *
 from datatypes.config.environ import environ
 from datatypes.url import Url
+from datatypes.path import Filepath
+from datatypes.http import MultipartDecoder, MultipartEncoder
 from datatypes.server import (
     ServerThread,
     PathServer,
     CallbackServer,
     WSGIServer,
+    PreforkWSGIServer,
+    ThreadPoolWSGIServer,
+    AsyncPathServer,
+    AsyncCallbackServer,
 )
-from . import TestCase, testdata
+from . import TestCase, testdata, ThreadingCallbackServer
 
 
 class ServerTestCase(TestCase):
@@ -64,6 +80,113 @@ class PathServerTest(ServerTestCase):
             res = testdata.fetch(s.child(path="bar.txt"))
             self.assertEqual("bar", res.text)
 
+    def test_range(self):
+        path = testdata.create_files({
+            "foo.txt": "0123456789",
+        })
+
+        with self.create_server(path) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+
+            conn.request("GET", "/foo.txt", headers={"Range": "bytes=2-4"})
+            res = conn.getresponse()
+            self.assertEqual(206, res.status)
+            self.assertEqual("bytes 2-4/10", res.headers["Content-Range"])
+            self.assertEqual(b"234", res.read())
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={"Range": "bytes=-3"})
+            res = conn.getresponse()
+            self.assertEqual(b"789", res.read())
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={"Range": "bytes=8-"})
+            res = conn.getresponse()
+            self.assertEqual(b"89", res.read())
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={"Range": "bytes=20-"})
+            res = conn.getresponse()
+            self.assertEqual(416, res.status)
+            self.assertEqual("bytes */10", res.headers["Content-Range"])
+            res.read()
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={
+                "Range": "bytes=2-4",
+                "If-Range": "\"bogus\"",
+            })
+            res = conn.getresponse()
+            self.assertEqual(200, res.status)
+            self.assertEqual(b"0123456789", res.read())
+            conn.close()
+
+    def test_etag(self):
+        path = testdata.create_files({
+            "foo.txt": "foo",
+        })
+
+        with self.create_server(path) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+
+            conn.request("GET", "/foo.txt")
+            res = conn.getresponse()
+            res.read()
+            etag = res.headers["ETag"]
+            last_modified = res.headers["Last-Modified"]
+            self.assertTrue(etag)
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={"If-None-Match": etag})
+            res = conn.getresponse()
+            self.assertEqual(304, res.status)
+            self.assertEqual(etag, res.headers["ETag"])
+            res.read()
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={
+                "If-Modified-Since": last_modified,
+            })
+            res = conn.getresponse()
+            self.assertEqual(304, res.status)
+            res.read()
+            conn.close()
+
+            conn.request("GET", "/foo.txt", headers={
+                "If-None-Match": "\"bogus\"",
+                "If-Modified-Since": last_modified,
+            })
+            res = conn.getresponse()
+            self.assertEqual(200, res.status)
+            self.assertEqual(b"foo", res.read())
+            conn.close()
+
+    def test_gzip(self):
+        path = testdata.create_files({
+            "foo.txt": "foo",
+        })
+        gzbody = gzip.compress(b"foo")
+        path.child_file("foo.txt.gz").write_bytes(gzbody)
+
+        with self.create_server(path) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+
+            conn.request("GET", "/foo.txt", headers={
+                "Accept-Encoding": "br;q=1.0, gzip;q=0.8",
+            })
+            res = conn.getresponse()
+            self.assertEqual("gzip", res.headers["Content-Encoding"])
+            self.assertEqual("Accept-Encoding", res.headers["Vary"])
+            self.assertTrue(res.headers["Content-Type"].startswith("text/"))
+            self.assertEqual(gzbody, res.read())
+            conn.close()
+
+            conn.request("GET", "/foo.txt")
+            res = conn.getresponse()
+            self.assertIsNone(res.headers["Content-Encoding"])
+            self.assertEqual(b"foo", res.read())
+            conn.close()
+
     def test_server_encoding(self):
         """Moved from testdata on 1-24-2023"""
         name = testdata.get_filename(ext="txt")
@@ -91,6 +214,9 @@ class CallbackServerTest(ServerTestCase):
 
     server_class = CallbackServer
 
+    persistent = False
+    """True if the server keeps connections open between requests"""
+
     def test_crud(self):
         s = self.create_server({
             "GET": lambda *args, **kwargs: "GET",
@@ -137,6 +263,34 @@ class CallbackServerTest(ServerTestCase):
             res = testdata.fetch(s.child(path="/foo/bar/head"), method="HEAD")
             self.assertEqual(400, res.status_code)
 
+    def test_multipart_spool(self):
+        paths = []
+        def do_POST(handler):
+            fp = handler.body["file1"]
+            paths.append(Filepath(fp.name))
+            self.assertTrue(paths[0].exists())
+            return fp.read() == p.read_bytes()
+
+        size = MultipartDecoder.spool_size + 1
+        p = self.create_file(testdata.get_ascii(size))
+        me = MultipartEncoder()
+        me.add_file(p, name="file1")
+
+        with self.create_server({"POST": do_POST}) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            conn.request("POST", "/", body=bytes(me), headers=me.headers)
+            res = conn.getresponse()
+            self.assertEqual(b"True", res.read())
+            conn.close()
+
+            # the spooled file is removed after the response is sent
+            for _ in range(100):
+                if not paths[0].exists():
+                    break
+                time.sleep(0.01)
+
+            self.assertFalse(paths[0].exists())
+
     def test_multi_start_stop(self):
         s = self.create_server({
             "GET": lambda handler: "get"
@@ -169,6 +323,107 @@ class CallbackServerTest(ServerTestCase):
             self.assertEqual("", rh.body)
             self.assertNotEqual(rg.body, rh.body)
 
+    def test_persistent_connection(self):
+        def do_GET(handler):
+            return handler.client_address[1]
+
+        with self.create_server({"GET": do_GET}) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            ports = set()
+            for _ in range(3):
+                conn.request("GET", "/")
+                res = conn.getresponse()
+                self.assertEqual(200, res.status)
+                self.assertIsNotNone(res.headers["Content-Length"])
+                ports.add(res.read())
+
+            if not self.persistent:
+                # one idle connection would block every other client
+                self.assertEqual("close", res.headers["Connection"])
+                self.assertEqual(3, len(ports))
+                conn.close()
+                return
+
+            self.assertIsNone(res.headers["Connection"])
+            self.assertEqual(1, len(ports))
+
+            # a body the callback never reads is discarded
+            conn.request("GET", "/", body="ignored")
+            res = conn.getresponse()
+            self.assertEqual(ports.pop(), res.read())
+            conn.close()
+
+    def test_persistent_body(self):
+        def do_POST(handler):
+            return {"query": handler.query, "body": handler.body}
+
+        with self.create_server({"POST": do_POST}) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            for i in range(3):
+                conn.request(
+                    "POST",
+                    f"/?bar={i}",
+                    body=f"foo={i}",
+                    headers={
+                        "Content-Type": "application/x-www-form-urlencoded",
+                    },
+                )
+                res = conn.getresponse()
+                self.assertEqual(
+                    {"query": {"bar": str(i)}, "body": {"foo": str(i)}},
+                    json.loads(res.read()),
+                )
+            conn.close()
+
+    def test_stream(self):
+        def do_GET(handler):
+            yield "foo"
+            yield b"bar"
+            yield ""
+            yield 1
+
+        def do_POST(handler):
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/event-stream")
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.end_headers()
+            for i in range(3):
+                yield f"data: {i}\n\n"
+
+        def do_PUT(handler):
+            return iter([b"foo", b"bar"])
+
+        with self.create_server({
+            "GET": do_GET,
+            "POST": do_POST,
+            "PUT": do_PUT,
+        }) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+
+            conn.request("GET", "/")
+            res = conn.getresponse()
+            self.assertEqual("chunked", res.headers["Transfer-Encoding"])
+            self.assertEqual(b"foobar1", res.read())
+
+            conn.request("POST", "/")
+            res = conn.getresponse()
+            self.assertEqual("text/event-stream", res.headers["Content-Type"])
+            self.assertEqual(
+                [b"data: 0\n", b"\n", b"data: 1\n", b"\n"],
+                [res.readline() for _ in range(4)],
+            )
+            res.read()
+
+            conn.request("PUT", "/")
+            res = conn.getresponse()
+            self.assertEqual(b"foobar", res.read())
+
+            conn.request("HEAD", "/")
+            res = conn.getresponse()
+            self.assertEqual(b"", res.read())
+            self.assertEqual(200, res.status)
+            conn.close()
+
     def test_async(self):
         """
         https://github.com/Jaymon/datatypes/issues/82
@@ -186,6 +441,175 @@ class CallbackServerTest(ServerTestCase):
             self.assertEqual("1", res.body)
 
 
+class ThreadingCallbackServerTest(CallbackServerTest):
+
+    server_class = ThreadingCallbackServer
+
+    persistent = True
+
+
+class AsyncPathServerTest(PathServerTest):
+
+    server_class = AsyncPathServer
+
+    def test_keep_alive(self):
+        path = testdata.create_files({
+            "foo.txt": "foo",
+            "bar.txt": "bar",
+        })
+
+        with self.create_server(path) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            for name in ["foo", "bar", "foo"]:
+                conn.request("GET", f"/{name}.txt")
+                res = conn.getresponse()
+                self.assertEqual(name, res.read().decode())
+
+            self.assertEqual(1, len(s.server.connections))
+            conn.close()
+
+
+class AsyncCallbackServerTest(CallbackServerTest):
+
+    server_class = AsyncCallbackServer
+
+    persistent = True
+
+    def test_keep_alive(self):
+        def do_POST(handler):
+            return handler.body
+
+        with self.create_server({"POST": do_POST, "GET": do_POST}) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            for i in range(3):
+                conn.request(
+                    "POST",
+                    "/",
+                    body=f"foo={i}",
+                    headers={
+                        "Content-Type": "application/x-www-form-urlencoded",
+                    },
+                )
+                res = conn.getresponse()
+                self.assertEqual({"foo": str(i)}, json.loads(res.read()))
+
+            # a body the callback never reads is discarded
+            conn.request("GET", "/", body="ignored")
+            res = conn.getresponse()
+            self.assertEqual(200, res.status)
+            res.read()
+
+            # chunked request body
+            conn.request(
+                "POST",
+                "/",
+                body=iter([b"foo=", b"che"]),
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                },
+            )
+            res = conn.getresponse()
+            self.assertEqual({"foo": "che"}, json.loads(res.read()))
+            conn.close()
+
+    def test_async_body(self):
+        async def do_POST(handler):
+            body = json.dumps(handler.body).encode()
+            handler.send_response(201)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", len(body))
+            handler.end_headers()
+            handler.wfile.write(body)
+
+        with self.create_server({"POST": do_POST}) as s:
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            for i in range(2):
+                conn.request(
+                    "POST",
+                    "/",
+                    body=f"foo={i}",
+                    headers={
+                        "Content-Type": "application/x-www-form-urlencoded",
+                    },
+                )
+                res = conn.getresponse()
+                self.assertEqual(201, res.status)
+                self.assertEqual({"foo": str(i)}, json.loads(res.read()))
+
+            conn.close()
+
+    def test_chunked_body(self):
+        def do_POST(handler):
+            return handler.body
+
+        with self.create_server({"POST": do_POST}) as s:
+            s.server.spool_size = 4
+            conn = http.client.HTTPConnection(s.hostname, s.port)
+            conn.request(
+                "POST",
+                "/",
+                body=iter([b"foo=", b"bar", b"&che=", b"baz"]),
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                },
+            )
+            res = conn.getresponse()
+            self.assertEqual(
+                {"foo": "bar", "che": "baz"},
+                json.loads(res.read()),
+            )
+            conn.close()
+
+    def test_bad_body_length(self):
+        def do_POST(handler):
+            return handler.body
+
+        def fetch(s, request):
+            with socket.create_connection((s.hostname, s.port)) as sock:
+                sock.sendall(request)
+                return sock.makefile("rb").readline()
+
+        with self.create_server({"POST": do_POST}) as s:
+            r = fetch(
+                s,
+                b"POST / HTTP/1.1\r\nHost: localhost\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\nzz\r\nfoo\r\n0\r\n\r\n"
+            )
+            self.assertTrue(r.startswith(b"HTTP/1.1 400"))
+
+            r = fetch(
+                s,
+                b"POST / HTTP/1.1\r\nHost: localhost\r\n"
+                b"Content-Length: foo\r\n\r\n"
+            )
+            self.assertTrue(r.startswith(b"HTTP/1.1 400"))
+
+            s.server.max_body_size = 2
+            r = fetch(
+                s,
+                b"POST / HTTP/1.1\r\nHost: localhost\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\n3\r\nfoo\r\n0\r\n\r\n"
+            )
+            self.assertTrue(r.startswith(b"HTTP/1.1 413"))
+
+    def test_idle_connections(self):
+        async def do_GET(handler):
+            return handler.scope["path"]
+
+        with self.create_server({"GET": do_GET}) as s:
+            socks = []
+            for _ in range(200):
+                socks.append(
+                    socket.create_connection((s.hostname, s.port)),
+                )
+
+            r = testdata.fetch(s.child(path="/foo%20bar"))
+            self.assertEqual("/foo bar", r.body)
+
+            for sock in socks:
+                sock.close()
+
+
 class WSGIServerTest(ServerTestCase):
 
     server_class = WSGIServer
@@ -202,3 +626,237 @@ class WSGIServerTest(ServerTestCase):
             self.assertEqual(200, r.code)
             self.assertEqual("GET", r.text)
 
+
+
+class PreforkWSGIServerTest(ServerTestCase):
+    """Forking from a process that has other threads running isn't safe, so
+    these servers are ran from the main thread of their own process"""
+
+    @contextmanager
+    def create_pid_server(self, **kwargs):
+        wsgipath = testdata.create_file([
+            "import os",
+            "",
+            "def application(environ, start_response):",
+            "    if environ['PATH_INFO'] == '/crash':",
+            "        os._exit(1)",
+            "",
+            "    start_response('200 OK', [])",
+            "    return [f'{os.getpid()} {os.getppid()}'.encode()]",
+        ], path="wsgi.py")
+
+        script = "\n".join([
+            "import signal",
+            "from datatypes.server import PreforkWSGIServer",
+            f"s = PreforkWSGIServer(wsgipath={str(wsgipath)!r}, **{kwargs!r})",
+            "print(s.get_url(), flush=True)",
+            "s.serve_forever(poll_interval=0.1)",
+            "s.server_close()",
+            "print(signal.getsignal(signal.SIGTERM) is signal.SIG_DFL)",
+        ])
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                env.get("PYTHONPATH", ""),
+            ])
+        )
+        proc = subprocess.Popen(
+            [sys.executable, "-c", script],
+            stdout=subprocess.PIPE,
+            env=env,
+            text=True,
+        )
+        try:
+            url = proc.stdout.readline().strip()
+            self.assertTrue(url)
+            yield proc, url
+
+        finally:
+            proc.terminate()
+            self.stdout = proc.communicate(timeout=30)[0]
+
+    def fetch_pids(self, url):
+        r = testdata.fetch(url)
+        return tuple(map(int, r.text.split()))
+
+    def test_workers(self):
+        with self.create_pid_server(processes=2) as (proc, url):
+            pids = set()
+            for _ in range(10):
+                pid, ppid = self.fetch_pids(url)
+                self.assertEqual(proc.pid, ppid)
+                pids.add(pid)
+
+            self.assertNotIn(proc.pid, pids)
+
+        self.assertEqual(0, proc.returncode)
+        # the original signal handlers were put back
+        self.assertEqual("True", self.stdout.strip())
+
+    def test_restart(self):
+        with self.create_pid_server(processes=1) as (proc, url):
+            pid, _ = self.fetch_pids(url)
+
+            with self.assertRaises(Exception):
+                testdata.fetch(url + "/crash")
+
+            for _ in range(50):
+                try:
+                    pid2, ppid = self.fetch_pids(url)
+                    break
+
+                except Exception:
+                    time.sleep(0.1)
+
+            self.assertNotEqual(pid, pid2)
+            self.assertEqual(proc.pid, ppid)
+
+    def test_reuse_port(self):
+        with self.create_pid_server(processes=2, reuse_port=True) as (
+            proc,
+            url,
+        ):
+            _, ppid = self.fetch_pids(url)
+            self.assertEqual(proc.pid, ppid)
+
+    def test_restart_delay(self):
+        s = PreforkWSGIServer(application=lambda *args: [])
+        try:
+            # our own pid isn't a child so it looks like an exited worker
+            delays = []
+            s.worker_starts[0] = (time.monotonic(), 0.0)
+            for _ in range(3):
+                s.workers = {os.getpid(): 0}
+                self.assertEqual(0, s.reap_workers(restart=True))
+                delays.append(s.worker_starts[0][1])
+
+            self.assertEqual([0.1, 0.2, 0.4], delays)
+            self.assertIn(0, s.worker_restarts)
+
+        finally:
+            s.server_close()
+
+
+class ThreadPoolWSGIServerTest(WSGIServerTest):
+
+    server_class = ThreadPoolWSGIServer
+
+    def create_blocking_server(self, **kwargs):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+
+        def application(environ, start_response):
+            started.release()
+            release.wait(5)
+            start_response("200 OK", [])
+            return [b"done"]
+
+        s = self.create_server(application=application, **kwargs)
+        return s, started, release
+
+    def fetch_codes(self, s, count):
+        codes = []
+        def fetch():
+            conn = http.client.HTTPConnection(s.hostname, s.port, timeout=10)
+            try:
+                conn.request("GET", "/")
+                codes.append(conn.getresponse().status)
+
+            except OSError:
+                codes.append(0)
+
+            finally:
+                conn.close()
+
+        threads = [threading.Thread(target=fetch) for _ in range(count)]
+        for t in threads:
+            t.start()
+
+        return codes, threads
+
+    def test_reject(self):
+        s, started, release = self.create_blocking_server(
+            workers=1,
+            queue_size=1,
+            overload="reject",
+        )
+
+        with s:
+            codes, threads = self.fetch_codes(s, 1)
+            self.assertTrue(started.acquire(timeout=5))
+
+            codes2, threads2 = self.fetch_codes(s, 3)
+            for _ in range(50):
+                if s.server.rejected >= 2:
+                    break
+                time.sleep(0.1)
+
+            stats = s.server.get_stats()
+            self.assertEqual(1, stats["active_workers"])
+            self.assertEqual(1, stats["queue_depth"])
+            self.assertEqual(2, stats["rejected"])
+
+            release.set()
+            for t in threads + threads2:
+                t.join()
+
+            self.assertEqual([200, 200, 503, 503], sorted(codes + codes2))
+            for _ in range(50):
+                if s.server.latencies.count == 2:
+                    break
+                time.sleep(0.1)
+
+            self.assertEqual(2, s.server.latencies.count)
+            self.assertEqual(2, s.server.wait_times.count)
+
+    def test_block(self):
+        s, started, release = self.create_blocking_server(
+            workers=2,
+            queue_size=1,
+        )
+
+        with s:
+            codes, threads = self.fetch_codes(s, 5)
+            self.assertTrue(started.acquire(timeout=5))
+            release.set()
+            for t in threads:
+                t.join()
+
+            self.assertEqual([200] * 5, codes)
+            self.assertEqual(0, s.server.get_stats()["rejected"])
+
+    def test_block_shutdown(self):
+        s, started, release = self.create_blocking_server(
+            workers=1,
+            queue_size=1,
+        )
+
+        s.start()
+        try:
+            codes, threads = self.fetch_codes(s, 1)
+            self.assertTrue(started.acquire(timeout=5))
+
+            # one waits in the queue and the other blocks serve_forever
+            codes2, threads2 = self.fetch_codes(s, 2)
+            for _ in range(50):
+                if s.server.queue_depth == 1:
+                    break
+                time.sleep(0.1)
+            time.sleep(0.2)
+
+            start = time.monotonic()
+            s.stop()
+            self.assertLess(time.monotonic() - start, 2)
+
+        finally:
+            release.set()
+            for t in threads + threads2:
+                t.join()
+
+            s.server.server_close()
+
+    def test_overload(self):
+        with self.assertRaises(ValueError):
+            ThreadPoolWSGIServer(application=None, overload="bogus")
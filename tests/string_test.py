@@ -1,4 +1,13 @@
 # -*- coding: utf-8 -*-
+import re
+import hmac
+import hashlib
+import io
+import base64
+import binascii
+import collections
+import os
+
 from datatypes.compat import *
 from datatypes.string import (
     String,
@@ -7,8 +16,12 @@ from datatypes.string import (
     Character,
     Codepoint,
     NamingConvention,
+    cached_conversion,
     EnglishWord,
     Password,
+    HashStream,
+    Regex,
+    MultiRegex,
 )
 
 from . import TestCase, testdata
@@ -27,6 +40,48 @@ class Base64Test(TestCase):
         self.assertNotEqual(b, s2)
         self.assertEqual(s, s2)
 
+    def test_stream(self):
+        b = ByteString(self.get_words(1000))
+
+        for chunk_size in [1, 2, 3, 4, 5, 1024]:
+            encoded = io.BytesIO()
+            Base64.encode_stream(io.BytesIO(b), encoded, chunk_size)
+            self.assertEqual(base64.b64encode(b), encoded.getvalue())
+
+            decoded = io.BytesIO()
+            encoded.seek(0)
+            Base64.decode_stream(encoded, decoded, chunk_size)
+            self.assertEqual(b, decoded.getvalue())
+
+        encoded = io.BytesIO()
+        Base64.encode_stream(io.BytesIO(b), encoded, 100, line_size=76)
+        self.assertEqual(base64.encodebytes(b), encoded.getvalue())
+
+        decoded = io.BytesIO()
+        encoded.seek(0)
+        Base64.decode_stream(encoded, decoded, 100)
+        self.assertEqual(b, decoded.getvalue())
+
+        encoded = io.StringIO()
+        Base64.encode_stream(io.BytesIO(b"foo"), encoded)
+        self.assertEqual("Zm9v", encoded.getvalue())
+
+        with self.assertRaises(ValueError):
+            list(Base64.encode_chunks([b"foo"], line_size=10))
+
+    def test_chunks(self):
+        chunks = Base64.encode_chunks(ByteString("foobar").chunk_views(4))
+        self.assertEqual(b"Zm9vYmFy", b"".join(chunks))
+
+        chunks = Base64.decode_chunks(["Zm9", "vYm", "Fy"])
+        self.assertEqual(b"foobar", b"".join(chunks))
+
+        with self.assertRaises(binascii.Error):
+            list(Base64.decode_chunks(["Zm9vY"]))
+
+        with self.assertRaises(binascii.Error):
+            list(Base64.decode_chunks(["Zm9v!!!!"]))
+
 
 class StringTest(TestCase):
     def test_xmlescape(self):
@@ -199,6 +254,32 @@ class StringTest(TestCase):
         s = String("urn:uuid:5730e1fb-647d-4c7b-8f0d-04e70dc1682b")
         self.assertEqual("5730e1fb-647d-4c7b-8f0d-04e70dc1682b", str(s.uuid()))
 
+    def test_display_width(self):
+        ts = [
+            ("abc", 3),
+            ("a\tb", 2),
+            ("\u65e5\u672c", 4), # CJK
+            ("e\u0301", 1), # combining acute accent
+            ("\U0001F468\u200d\U0001F469\u200d\U0001F467", 2), # family
+            ("\u2764\ufe0f", 2), # red heart
+            ("\U0001F1FA\U0001F1F8", 2), # flag
+            ("\U0001F44D\U0001F3FD", 2), # thumbs up with skin tone
+            ("\uff46\uff55\uff4c\uff4c", 8), # fullwidth
+        ]
+        for v, width in ts:
+            self.assertEqual(width, String(v).display_width(), ascii(v))
+
+    def test_graphemes(self):
+        family = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+        s = String(f"e\u0301a{family}\U0001F1FA\U0001F1F8\r\nb")
+        self.assertEqual(
+            ["e\u0301", "a", family, "\U0001F1FA\U0001F1F8", "\r\n", "b"],
+            list(s.graphemes()),
+        )
+
+        s = String("foo\r\nbar")
+        self.assertEqual(7, len(list(s.graphemes())))
+
 
 class NamingConventionTest(TestCase):
     def test_camelcase(self):
@@ -303,6 +384,61 @@ class NamingConventionTest(TestCase):
         self.assertEqual("f", s.cli_dest())
         self.assertEqual("F", s.cli_metavar())
 
+    def test_cache(self):
+        NamingConvention.clear_cache()
+        NamingConvention("FooBar").snakecase()
+        NamingConvention("FooBar").snakecase()
+        info = NamingConvention.snakecase.cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(1, info.misses)
+
+        class DashConvention(NamingConvention):
+            def snakecase(self):
+                return super().snakecase().replace("_", "-")
+
+        self.assertEqual("foo-bar", DashConvention("FooBar").snakecase())
+        self.assertEqual("foo_bar", NamingConvention("FooBar").snakecase())
+
+        class UpperConvention(NamingConvention):
+            @cached_conversion
+            def upper_snakecase(self):
+                return self.snakecase().upper()
+
+        s = UpperConvention("FooBar")
+        self.assertEqual("FOO_BAR", s.upper_snakecase())
+
+        NamingConvention.clear_cache()
+        info = NamingConvention.snakecase.cache_info()
+        self.assertEqual(0, info.currsize)
+        info = UpperConvention.upper_snakecase.cache_info()
+        self.assertEqual(0, info.currsize)
+
+    def test_convert_keys(self):
+        d = {
+            "fooBar": {"cheBaz": [{"bamBoo": 1}, 2]},
+            1: "one",
+        }
+
+        r = NamingConvention.convert_keys(d)
+        self.assertEqual({"foo_bar": d["fooBar"], 1: "one"}, r)
+
+        r = NamingConvention.convert_keys(d, "kebabcase", recursive=True)
+        self.assertEqual(
+            {"foo-bar": {"che-baz": [{"bam-boo": 1}, 2]}, 1: "one"},
+            r,
+        )
+
+        r = NamingConvention.convert_keys({"foo_bar": 1}, "camelCase")
+        self.assertEqual({"fooBar": 1}, r)
+
+        Point = collections.namedtuple("Point", ["x", "y"])
+        r = NamingConvention.convert_keys(
+            {"fooBar": Point({"cheBaz": 1}, 2)},
+            recursive=True,
+        )
+        self.assertEqual({"foo_bar": Point({"che_baz": 1}, 2)}, r)
+        self.assertIsInstance(r["foo_bar"], Point)
+
 
 class EnglishWordTest(TestCase):
     def test_syllables(self):
@@ -402,6 +538,21 @@ class ByteStringTest(TestCase):
         s = ByteString(su)
         self.assertEqual(su, s.unicode())
 
+    def test_chunk_views(self):
+        s = ByteString("foobarche")
+
+        chunks = list(s.chunk_views(4))
+        self.assertEqual(3, len(chunks))
+        self.assertTrue(isinstance(chunks[0], memoryview))
+        self.assertEqual([b"foob", b"arch", b"e"], [bytes(c) for c in chunks])
+        self.assertEqual(
+            [bytes(c) for c in s.chunk(4)],
+            [bytes(c) for c in chunks],
+        )
+
+        chunks = list(s.chunk_views(0))
+        self.assertEqual([b"foobarche"], [bytes(c) for c in chunks])
+
 
 class CharacterTest(TestCase):
     """
@@ -545,6 +696,172 @@ class CodepointTest(TestCase):
         self.assertEqual("200D", c.hex)
 
 
+class RegexTest(TestCase):
+    def test_cache(self):
+        Regex.clear_cache()
+
+        pattern = r"f[o]+"
+        self.assertEqual(2, Regex(pattern, "foo bar foo").count())
+        self.assertEqual(1, Regex(pattern, "fooo").count())
+        info = Regex.cache_info()
+        self.assertEqual(1, info["misses"])
+        self.assertEqual(1, info["hits"])
+        self.assertEqual(1, info["size"])
+
+        r = Regex(pattern, "FOO", re.I)
+        self.assertEqual("FOO", r.search().group(0))
+        self.assertEqual(2, Regex.cache_info()["size"])
+
+        compiled = re.compile(pattern)
+        self.assertIs(compiled, Regex.compile(compiled))
+        self.assertEqual(re.I, Regex.compile(compiled, re.I).flags & re.I)
+
+        # the compiled pattern's own flags are kept
+        compiled = re.compile(pattern, re.M)
+        self.assertIs(compiled, Regex.compile(compiled, re.M))
+        flags = Regex.compile(compiled, re.I).flags
+        self.assertEqual(re.I | re.M, flags & (re.I | re.M))
+
+        Regex.clear_cache()
+        self.assertEqual(0, Regex.cache_info()["size"])
+
+    def test_cache_size(self):
+        Regex.clear_cache()
+        cache_size = Regex.CACHE_SIZE
+        Regex.CACHE_SIZE = 2
+        try:
+            Regex.compile("a")
+            Regex.compile("b")
+            Regex.compile("a")
+            Regex.compile("c")
+            self.assertEqual(2, Regex.cache_info()["size"])
+
+            # b was the least recently used so it was evicted
+            Regex.compile("a")
+            Regex.compile("b")
+            info = Regex.cache_info()
+            self.assertEqual(2, info["hits"])
+            self.assertEqual(4, info["misses"])
+
+        finally:
+            Regex.CACHE_SIZE = cache_size
+            Regex.clear_cache()
+
+    def test_multi(self):
+        mr = MultiRegex({
+            "int": r"\d+",
+            "word": r"[a-z]+",
+            "pair": r"(?P<key>\w+)=(?P<value>\w+)",
+        })
+
+        name, m = mr.search("foo 123")
+        self.assertEqual("word", name)
+        self.assertEqual("foo", m.group(0))
+
+        name, m = mr.search("!! 123")
+        self.assertEqual("int", name)
+
+        self.assertIsNone(mr.search("!!"))
+        self.assertIsNone(mr.match(" foo"))
+        self.assertFalse("!!" in mr)
+        self.assertTrue("foo" in mr)
+
+        # word fails the fullmatch so the alternation falls through to pair
+        name, m = mr.fullmatch("foo=bar")
+        self.assertEqual("pair", name)
+        self.assertEqual("bar", m.group("value"))
+
+        # word comes before pair so it wins at the same position
+        names = [name for name, m in mr.finditer("foo 12 a=b")]
+        self.assertEqual(["word", "int", "word", "word"], names)
+
+        mr = MultiRegex([r"ab", r"a(b)?"])
+        self.assertEqual(0, mr.match("ab")[0])
+        self.assertEqual(1, mr.match("ac")[0])
+
+        with self.assertRaises(ValueError):
+            MultiRegex([])
+
+    def test_multi_compiled(self):
+        mr = MultiRegex([
+            re.compile(r"foo", re.I),
+            re.compile(r"bar.", re.S),
+            r"che",
+        ])
+        self.assertEqual(0, mr.match("FOO")[0])
+        self.assertEqual(1, mr.match("bar\n")[0])
+        self.assertIsNone(mr.match("CHE"))
+
+        mr = MultiRegex([re.compile(r"foo"), r"bar"], re.I)
+        self.assertIsNone(mr.match("FOO"))
+        self.assertEqual(1, mr.match("BAR")[0])
+
+
+class HashStreamTest(TestCase):
+    def test_hexdigests(self):
+        s = String(self.get_words(100))
+        fp = self.create_file(s)
+        hs = HashStream(fp, chunk_size=16)
+        self.assertEqual(s.md5(), hs.md5())
+        self.assertEqual(s.sha256(), hs.sha256())
+
+        hds = hs.hexdigests("md5", "sha256")
+        self.assertEqual({"md5": s.md5(), "sha256": s.sha256()}, hds)
+
+        hs = HashStream(iter(s.chunk(7)))
+        self.assertEqual(hds, hs.hexdigests("md5", "sha256"))
+
+        with fp.open("rb") as f:
+            self.assertEqual(s.md5(), HashStream(f).md5())
+
+    def test_file_object(self):
+        s = String(self.get_words(100))
+        fp = self.create_file(s)
+        with fp.open("rb") as f:
+            hs = HashStream(f, chunk_size=16)
+            self.assertEqual(s.md5(), hs.md5())
+            self.assertEqual(s.sha256(), hs.sha256())
+
+            # the file is hashed from where it was when the stream was created
+            f.seek(10)
+            hs = HashStream(f)
+            md5 = hashlib.md5(s.bytes()[10:]).hexdigest()
+            self.assertEqual(md5, hs.md5())
+            self.assertEqual(md5, hs.md5())
+
+        r, w = os.pipe()
+        os.write(w, s.bytes())
+        os.close(w)
+        with open(r, "rb") as f:
+            hs = HashStream(f)
+            self.assertEqual(s.md5(), hs.md5())
+            with self.assertRaises(ValueError):
+                hs.md5()
+
+        hs = HashStream(iter(s.chunk(7)))
+        self.assertEqual(s.md5(), hs.md5())
+        with self.assertRaises(ValueError):
+            hs.md5()
+
+    def test_hmac(self):
+        s = String(self.get_words(100))
+        hs = HashStream(s.chunk(10))
+        self.assertEqual(
+            hmac.new(b"foo", s.bytes(), "sha256").hexdigest(),
+            hs.hmac("foo"),
+        )
+
+    def test_hash(self):
+        for size in [0, 1, 63, 64, 65, 128, 129, 1000]:
+            s = String("x" * size)
+            for name in ["sha256", "sha512"]:
+                hs = HashStream(s.chunk(7))
+                self.assertEqual(
+                    s.hash(key="foo", name=name, nonce="bar", rounds=10),
+                    hs.hash(key="foo", name=name, nonce="bar", rounds=10),
+                )
+
+
 class PasswordTest(TestCase):
     def test_gensalt(self):
         salt = Password.gensalt()
@@ -628,3 +945,27 @@ class PasswordTest(TestCase):
         with self.assertRaises(ValueError):
             pw2.check("", error_class=ValueError)
 
+    def test_hash_many_check_many(self):
+        pws = [self.get_string() for _ in range(5)]
+        phs = Password.hash_many(pws, max_workers=2)
+        self.assertEqual(5, len(phs))
+        for pw, ph in zip(pws, phs):
+            self.assertTrue(Password.checkpw(pw, ph))
+
+        rs = Password.check_many(zip(pws, reversed(phs)), max_workers=2)
+        self.assertEqual([False, False, True, False, False], rs)
+
+        rs = Password.check_many([(pws[0], phs[0]), ("", phs[0])])
+        self.assertEqual([True, False], rs)
+
+    def test_calibrate(self):
+        kwargs = Password.calibrate(0.0, max_n=1 << 12)
+        self.assertEqual({"n": 1024, "r": 8, "p": 1}, kwargs)
+
+        kwargs = Password.calibrate(10.0, max_n=1 << 12)
+        self.assertEqual(1 << 12, kwargs["n"])
+
+        ph = Password.hashpw("foo", **kwargs)
+        self.assertTrue(ph.startswith("s$1000$8$1$"))
+        self.assertTrue(Password.checkpw("foo", ph))
+
@@ -4,6 +4,7 @@ from datatypes.compat import *
 from datatypes.string import String
 from datatypes.token.base import (
     Scanner,
+    WindowBuffer,
 )
 from datatypes.token.word import (
     WordTokenizer,
@@ -367,6 +368,65 @@ class WordTokenizerTest(TestCase):
         t = self.create_instance(s)
         self.assertEqual(3, len(list(t)))
 
+    def test_indexed(self):
+        text = " foo, bar.  che\nbaz-boo "
+        chars = " ,.-\n"
+
+        t = self.create_instance(text, chars)
+        self.assertTrue(t.is_indexed())
+
+        # a callback is checked a character at a time
+        t2 = self.create_instance(text, lambda ch: ch in set(chars))
+        self.assertFalse(t2.is_indexed())
+
+        # a file is streamed instead of read into memory
+        with testdata.create_file(text).open("r") as fp:
+            t3 = self.create_instance(fp, chars)
+            self.assertFalse(t3.is_indexed())
+            self.assertEqual(
+                ["foo", "bar", "che", "baz", "boo"],
+                [w.text for w in t3],
+            )
+
+        def tokens(t):
+            return [
+                (
+                    (w.text, w.start, w.stop),
+                    (w.ldelim.text, w.ldelim.start, w.ldelim.stop),
+                    (w.rdelim.text, w.rdelim.start, w.rdelim.stop),
+                ) for w in t
+            ]
+
+        self.assertEqual(tokens(t2), tokens(t))
+        self.assertEqual(5, len(tokens(t)))
+
+        for pos in range(len(text)):
+            t.stream.seek(pos)
+            t2.stream.seek(pos)
+            self.assertEqual(t2.tell_ldelim(), t.tell_ldelim())
+
+            t.stream.seek(pos)
+            t2.stream.seek(pos)
+            if pos < len(text) - 1:
+                self.assertEqual(t2.next().text, t.next().text)
+                self.assertEqual(t2.stream.tell(), t.stream.tell())
+                self.assertEqual(t2.prev().text, t.prev().text)
+                self.assertEqual(t2.stream.tell(), t.stream.tell())
+
+    def test_indexed_prev_single_char(self):
+        t = self.create_instance("a bc")
+        t.seek(1)
+        self.assertEqual("a", t.prev().text)
+
+        t = self.create_instance("a")
+        self.assertEqual("a", t.next().text)
+        self.assertEqual("a", t.prev().text)
+
+    def test_window_buffer(self):
+        t = self.create_instance("foo bar che".encode("utf-8"))
+        self.assertFalse(t.indexed)
+        self.assertEqual(["foo", "bar", "che"], [w.text for w in t])
+
 
 class StopWordTokenizerTest(TestCase):
     tokenizer_class = StopWordTokenizer
@@ -571,6 +631,112 @@ class ScannerTest(TestCase):
         self.assertEqual("*/", t[1])
         self.assertEqual(3, s.tell())
 
+    def test__read_to_delim_blocks(self):
+        s = self.create_instance("foo bar [[che]] baz")
+        s.MIN_BLOCK_SIZE = 1
+        s.BLOCK_SIZE = 2
+
+        # the first matching delim in order wins, not the longest
+        partial, delim, delim_len = s._read_to_delim({"[": 1, "[[": 2})
+        self.assertEqual("foo bar ", partial)
+        self.assertEqual("[", delim)
+        self.assertEqual(8, s.tell())
+
+        partial, delim, delim_len = s._read_to_delim({"]": 1, "]]": 2})
+        self.assertEqual("[[che", partial)
+        self.assertEqual("]", delim)
+        self.assertEqual(13, s.tell())
+
+        partial, delim, delim_len = s._read_to_delim({"[[": 2})
+        self.assertEqual("]] baz", partial)
+        self.assertEqual("", delim)
+        self.assertEqual(0, delim_len)
+        self.assertEqual(19, s.tell())
+
+    def test__read_to_delim_escaped_blocks(self):
+        s = self.create_instance(r"foo \]] bar]] che")
+        s.MIN_BLOCK_SIZE = 1
+        s.BLOCK_SIZE = 1
+        partial, delim, delim_len = s._read_to_delim({"]]": 2})
+        self.assertEqual(r"foo \]] bar", partial)
+        self.assertEqual(11, s.tell())
+
+        s = self.create_instance(r"foo \]] bar]] che", convert_escaped=True)
+        s.MIN_BLOCK_SIZE = 1
+        partial, delim, delim_len = s._read_to_delim({"]]": 2})
+        self.assertEqual(r"foo ]] bar", partial)
+        self.assertEqual(11, s.tell())
+
+    def test_read_thru_blocks(self):
+        s = self.create_instance("ababab abc")
+        s.MIN_BLOCK_SIZE = 1
+        s.BLOCK_SIZE = 2
+        self.assertEqual("ababab", s.read_thru(delims=["ab", "a"]))
+        self.assertEqual(6, s.tell())
+        self.assertEqual(" ", s.read_thru(whitespace=True))
+        self.assertEqual("ab", s.read_thru(delims=["ab"]))
+        self.assertEqual("", s.read_thru(delims=["ab"]))
+        self.assertEqual(9, s.tell())
+
+    def test_read_to_trie(self):
+        class TrieScanner(Scanner):
+            TRIE_SIZE = 1
+
+        delims = ["[[", "{{", "{%", "<!--"]
+        s = TrieScanner(r"foo \{{ bar {%che%} [[baz]] <!-- -->")
+        self.assertEqual(r"foo \{{ bar ", s.read_to(delims=delims))
+        self.assertEqual("{%", s.read_thru(delims=delims))
+        self.assertEqual("che%} ", s.read_to(delims=delims))
+        self.assertEqual(
+            "[[baz]]",
+            s.read_between(start_delim="[[", stop_delims=["]]", "}}"])
+        )
+        self.assertEqual(" <!--", s.read_to(delims=delims, include=True))
+
+        # the first delim wins, not the longest
+        s = TrieScanner("foo <!-- bar")
+        self.assertEqual("foo ", s.read_to(delims=["<", "<!--"]))
+        self.assertEqual(4, s.tell())
+
+        # the cached trie is shared so it's built before it's returned
+        search, match = TrieScanner._compile_delims(("[[", "]]"))
+        trie = search.__self__
+        self.assertIs(trie, trie.fail)
+        self.assertIsNotNone(trie.first_regex)
+
+    def test_window_buffer(self):
+        text = "foo \u00e9 bar\nche \U0001F600 baz\n"
+        s = Scanner(WindowBuffer(text.encode("utf-8"), window_size=3))
+        self.assertEqual("foo ", s.read_to(delim="\u00e9"))
+        self.assertEqual("\u00e9", s.peek())
+        with self.assertRaises(ValueError):
+            with s.transaction():
+                s.read_to(delim="\n")
+                raise ValueError()
+
+        self.assertEqual(4, s.tell())
+        self.assertEqual("\u00e9 bar\n", s.readline())
+        self.assertEqual(
+            "che \U0001F600",
+            s.read_to(delim=" baz", include_delim=False)
+        )
+        s.seek(0)
+        self.assertEqual(text, s.read())
+
+        s = Scanner(text.encode("utf-8"))
+        self.assertTrue(isinstance(s.buffer, WindowBuffer))
+        self.assertEqual(len(text), s.seek(0, 2))
+
+    def test_window_buffer_mmap(self):
+        p = testdata.create_file("foo bar\nche baz\n" * 100)
+        with p.open_mmap() as m:
+            s = Scanner(WindowBuffer(m, window_size=10))
+            lines = list(s)
+            self.assertEqual(200, len(lines))
+            self.assertEqual("foo bar\n", lines[0])
+
+            s.buffer.close()
+
     def test__read_thru_delim_1(self):
         s = self.create_instance("foobar")
 